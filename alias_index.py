@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Generated alias index: every way the book may name a food -> its food ID.
+
+Aliases used to be hand-typed in three places (FOOD_KEYWORDS,
+ingredient_mappings and the special cases in load_foods()) and disagreed.
+Here they are generated from each data/foods/*.json:
+
+    name        "Adzuki Beans (Aduki Beans)" -> adzuki beans, aduki beans
+    id / stem   apple-cider-vinegar -> apple cider vinegar (food-188-millet -> millet)
+    number      singular and plural of the last word (chickpea/chickpeas, berry/berries)
+    UK/US       courgette/zucchini, aubergine/eggplant, rocket/arugula, ... (UK_US)
+
+The hand tables (now in curated_aliases.py) are still read, but only add
+aliases nothing generated (e.g. 'dark leafy greens' -> kale) and only for
+IDs that exist; where they disagree with a generated alias the generated
+one wins and the clash is listed by `python alias_index.py conflicts`.
+
+The index is stored in .cache/index/aliases.json with each food file's
+aliases keyed by its (mtime, size), so a rebuild regenerates only the food
+files that changed and re-merges. Its `hash` identifies the merged table
+(downstream caches are keyed on it).
+
+Usage:
+    from alias_index import load_alias_index
+
+    index = load_alias_index()
+    index.aliases['zucchini']     # 'zucchini-courgette'
+    index.food_ids                # every food ID
+    index.hash
+
+CLI:
+    python alias_index.py build [--rebuild]
+    python alias_index.py lookup courgettes
+    python alias_index.py conflicts
+"""
+import hashlib
+import json
+import re
+import sys
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from page_cache import BASE_DIR, _atomic_write
+from page_store import STORE_DIR
+
+# === CONFIGURATION ===
+FOODS_DIR = BASE_DIR / 'data' / 'foods'
+ALIAS_FILE = STORE_DIR / 'aliases.json'
+ALIAS_VERSION = 1
+
+# UK name <-> US name, singular; swapped as whole words in either direction
+UK_US = [
+    ('courgette', 'zucchini'), ('aubergine', 'eggplant'), ('rocket', 'arugula'),
+    ('coriander', 'cilantro'), ('spring onion', 'scallion'), ('chickpea', 'garbanzo bean'),
+    ('beetroot', 'beet'), ('mange tout', 'snow pea'), ('broad bean', 'fava bean'),
+    ('haricot bean', 'navy bean'), ('butter bean', 'lima bean'), ('black-eyed bean', 'black-eyed pea'),
+    ('treacle', 'molasses'), ('chilli', 'chili'), ('swede', 'rutabaga'), ('sweetcorn', 'corn'),
+    ('cornflour', 'cornstarch'), ('wholemeal', 'whole wheat'), ('pak choi', 'bok choy'),
+    ('rapeseed', 'canola'), ('icing sugar', 'powdered sugar'),
+]
+
+# Plurals the suffix rules get wrong
+PLURALS = {'chilli': 'chillies', 'tomato': 'tomatoes', 'potato': 'potatoes', 'mango': 'mangoes',
+           'zucchini': 'zucchini', 'edamame': 'edamame', 'tempeh': 'tempeh', 'miso': 'miso'}
+
+# Words that qualify a food rather than name it ("Basil (Fresh)", "Barley (Whole Grain)")
+QUALIFIERS = {'fresh', 'dried', 'ground', 'raw', 'whole', 'grain', 'cooked', 'frozen', 'sweet', 'dark',
+              'unsweetened', 'soft', 'all', 'types', 'type', 'large', 'small', 'intact', 'pure'}
+# Food names that are everyday words in recipe text rather than the food entry
+IGNORED_NAME_TERMS = {'water', 'raw vegetables', 'fresh herbs', 'fasted state'}
+
+# Alias kinds, strongest first: on a clash the lower rank wins
+RANKS = {'id': 0, 'name': 1, 'synonym': 2, 'number': 3, 'uk-us': 4}
+
+_FOOD_ID_PREFIX_RE = re.compile(r'^food-\d+-')
+_SERIAL_ID_RE = re.compile(r'^food-\d+$')
+_WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+def normalize_alias(text: str) -> str:
+    """Lowercase words joined by single spaces ('Black-Eyed  Peas' -> 'black eyed peas')."""
+    return ' '.join(_WORD_RE.findall(text.lower()))
+
+
+def ascii_fold(text: str) -> str:
+    """'jalapeño' -> 'jalapeno'."""
+    return unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+
+
+def number_variants(alias: str) -> List[str]:
+    """The alias with its last word singular and plural."""
+    from food_matcher import fold
+
+    head, _, last = alias.rpartition(' ')
+    stem = fold(last)
+    if stem in PLURALS:
+        plural = PLURALS[stem]
+    elif stem.endswith('y') and len(stem) > 3 and stem[-2] not in 'aeiou':
+        plural = stem[:-1] + 'ies'
+    elif stem.endswith(('ch', 'sh', 'x')):
+        plural = stem + 'es'
+    elif stem.endswith('s'):
+        plural = stem
+    else:
+        plural = stem + 's'
+    prefix = f'{head} ' if head else ''
+    return [prefix + form for form in dict.fromkeys((stem, plural)) if form != last]
+
+
+def _uk_us_pairs() -> List[Tuple[re.Pattern, str]]:
+    pairs = []
+    for uk, us in UK_US:
+        uk, us = normalize_alias(uk), normalize_alias(us)
+        pairs.append((re.compile(rf'\b{re.escape(uk)}\b'), us))
+        pairs.append((re.compile(rf'\b{re.escape(us)}\b'), uk))
+    return pairs
+
+
+_UK_US_PAIRS = _uk_us_pairs()
+
+
+def uk_us_variants(alias: str) -> List[str]:
+    """The alias with UK words swapped for US words and vice versa (singular forms)."""
+    from food_matcher import fold
+
+    variants = [pattern.sub(replacement, alias) for pattern, replacement in _UK_US_PAIRS if pattern.search(alias)]
+    # 'zucchini courgettes' (an ID naming both) would become 'courgette courgettes'
+    return [v for v in variants if len({fold(w) for w in v.split()}) == len(v.split())]
+
+
+def name_terms(food_id: str, name: str) -> List[Tuple[str, str]]:
+    """(term, kind) for one food's name, its '/' and bracketed synonyms and its ID."""
+    base, _, bracket = name.partition('(')
+    parts = [p for p in base.split('/') if p.strip()]
+    terms = [(part, 'name' if i == 0 else 'synonym') for i, part in enumerate(parts)]
+    for part in re.split(r'[/,]', bracket.rstrip(')')):
+        words = part.lower().split()
+        # "(Aduki Beans)" names the food; "(Fresh)", "(Dark/Sweet)" or "(Fresh or Frozen)" qualify it
+        if len(words) >= 2 and not any(ch.isdigit() for ch in part) and not set(words) <= QUALIFIERS \
+                and not {'or', 'and', 'from', '&'} & set(words):
+            terms.append((part, 'synonym'))
+
+    words = _FOOD_ID_PREFIX_RE.sub('', food_id).split('-')
+    while len(words) > 1 and words[-1] in QUALIFIERS:
+        words.pop()
+    terms.append((' '.join(words), 'id'))
+    return terms
+
+
+def generate_aliases(food_id: str, data: Dict) -> Dict[str, str]:
+    """{alias: kind} for one food file."""
+    aliases: Dict[str, str] = {}
+
+    def add(alias: str, kind: str):
+        alias = normalize_alias(alias)
+        if alias and alias not in IGNORED_NAME_TERMS and (alias not in aliases or RANKS[kind] < RANKS[aliases[alias]]):
+            aliases[alias] = kind
+
+    # Some files carry a bare serial ID ("food-132"); the stem is the real ID
+    ids = dict.fromkeys([food_id] + ([data['id']] if data.get('id') and not _SERIAL_ID_RE.match(data['id']) else []))
+    base = []
+    for fid in ids:
+        base.extend(name_terms(fid, data.get('name', '')))
+    for term, kind in base:
+        add(term, kind)
+        add(ascii_fold(term), kind)
+
+    for alias, kind in list(aliases.items()):
+        for variant in number_variants(alias):
+            add(variant, 'number')
+    # Swap on singular and plural spellings alike, then pluralize the swaps
+    for alias in list(aliases):
+        for variant in uk_us_variants(alias):
+            add(variant, 'uk-us')
+            for plural in number_variants(normalize_alias(variant)):
+                add(plural, 'uk-us')
+    return aliases
+
+
+def curated_aliases() -> List[Tuple[str, str]]:
+    """The hand-typed tables, strongest first: INGREDIENT_MAPPINGS, then FOOD_KEYWORDS."""
+    from curated_aliases import FOOD_KEYWORDS, INGREDIENT_MAPPINGS
+
+    return list(INGREDIENT_MAPPINGS.items()) + list(FOOD_KEYWORDS.items())
+
+
+def merge(generated: Dict[str, Dict[str, str]], curated: Iterable[Tuple[str, str]]) -> Dict:
+    """Resolve every alias to one food ID; returns {'aliases', 'kinds', 'conflicts'}."""
+    best: Dict[str, Tuple[Tuple, str, str]] = {}
+    conflicts: List[Dict] = []
+    for food_id in sorted(generated):
+        for alias, kind in generated[food_id].items():
+            # Strongest kind, then the food whose ID is the alias, then the shorter ID
+            key = (RANKS[kind], _FOOD_ID_PREFIX_RE.sub('', food_id).replace('-', ' ') != alias, len(food_id), food_id)
+            if alias in best and best[alias][0] <= key:
+                if best[alias][1] != food_id and RANKS[kind] <= RANKS['name']:
+                    conflicts.append({'alias': alias, 'kept': best[alias][1], 'dropped': food_id, 'source': kind})
+                continue
+            if alias in best and RANKS[best[alias][2]] <= RANKS['name']:
+                conflicts.append({'alias': alias, 'kept': food_id, 'dropped': best[alias][1], 'source': best[alias][2]})
+            best[alias] = (key, food_id, kind)
+
+    aliases = {alias: food_id for alias, (_, food_id, _) in best.items()}
+    kinds = {alias: kind for alias, (_, _, kind) in best.items()}
+    for alias, food_id in curated:
+        alias = normalize_alias(alias)
+        if alias in aliases:
+            if aliases[alias] != food_id:
+                conflicts.append({'alias': alias, 'kept': aliases[alias], 'dropped': food_id, 'source': 'curated'})
+        elif food_id in generated:
+            aliases[alias] = food_id
+            kinds[alias] = 'curated'
+        else:
+            conflicts.append({'alias': alias, 'kept': None, 'dropped': food_id, 'source': 'curated'})
+    conflicts = list({(c['alias'], c['dropped']): c for c in conflicts}.values())
+    return {'aliases': dict(sorted(aliases.items())), 'kinds': kinds, 'conflicts': conflicts}
+
+
+class AliasIndex:
+    """Merged {alias: food_id} table plus provenance."""
+
+    def __init__(self, data: Dict):
+        self.aliases: Dict[str, str] = data['aliases']
+        self.kinds: Dict[str, str] = data['kinds']
+        self.conflicts: List[Dict] = data['conflicts']
+        self.food_ids: List[str] = sorted(data['files'])
+        self.hash: str = data['hash']
+
+    def __len__(self) -> int:
+        return len(self.aliases)
+
+    def lookup(self, text: str) -> Optional[str]:
+        """Food ID for an exact alias ('Courgettes' -> 'zucchini-courgette')."""
+        return self.aliases.get(normalize_alias(text)) or self.aliases.get(normalize_alias(ascii_fold(text)))
+
+    def aliases_of(self, food_id: str) -> List[str]:
+        return [alias for alias, fid in self.aliases.items() if fid == food_id]
+
+
+def _curated_hash(curated: List[Tuple[str, str]]) -> str:
+    return hashlib.sha256(json.dumps(curated).encode('utf-8')).hexdigest()
+
+
+def build_alias_index(rebuild: bool = False, foods_dir: Path = FOODS_DIR, alias_file: Path = ALIAS_FILE) -> AliasIndex:
+    """Load the stored index, regenerating only changed food files (all with `rebuild`)."""
+    cached: Dict = {}
+    if not rebuild and alias_file.exists():
+        try:
+            with open(alias_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached.get('version') != ALIAS_VERSION:
+                cached = {}
+        except (OSError, ValueError):
+            cached = {}
+
+    old_files = cached.get('files', {})
+    files = {}
+    regenerated = 0
+    for food_file in sorted(foods_dir.glob('*.json')):
+        stat = food_file.stat()
+        entry = old_files.get(food_file.stem)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            files[food_file.stem] = entry
+            continue
+        with open(food_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        files[food_file.stem] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                                 'aliases': generate_aliases(food_file.stem, data)}
+        regenerated += 1
+
+    curated = curated_aliases()
+    curated_hash = _curated_hash(curated)
+    if cached and not regenerated and files.keys() == old_files.keys() and cached.get('curated_hash') == curated_hash:
+        return AliasIndex(cached)
+
+    merged = merge({stem: entry['aliases'] for stem, entry in files.items()}, curated)
+    digest = hashlib.sha256(json.dumps(merged['aliases'], sort_keys=True).encode('utf-8')).hexdigest()
+    data = {'version': ALIAS_VERSION, 'hash': digest, 'curated_hash': curated_hash, 'files': files, **merged}
+    alias_file.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(alias_file, json.dumps(data, indent=1, ensure_ascii=False))
+
+    removed = len(old_files.keys() - files.keys())
+    print(f'alias index: {regenerated} food files regenerated, {removed} removed, '
+          f'{len(merged["aliases"])} aliases -> {alias_file}', file=sys.stderr)
+    return AliasIndex(data)
+
+
+_loaded: Optional[AliasIndex] = None
+
+
+def load_alias_index(rebuild: bool = False) -> AliasIndex:
+    """The alias index, checked against data/foods once per process."""
+    global _loaded
+    if _loaded is None or rebuild:
+        _loaded = build_alias_index(rebuild)
+    return _loaded
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generated food alias index')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='update the stored index (only changed food files)')
+    build.add_argument('--rebuild', action='store_true', help='regenerate every food file')
+    lookup = sub.add_parser('lookup', help='resolve aliases to food IDs')
+    lookup.add_argument('aliases', nargs='+')
+    show = sub.add_parser('show', help='list the aliases of a food')
+    show.add_argument('food_id')
+    sub.add_parser('conflicts', help='aliases claimed by more than one food or table')
+    args = parser.parse_args(argv)
+
+    index = load_alias_index(rebuild=getattr(args, 'rebuild', False))
+    if args.command == 'build':
+        kinds: Dict[str, int] = {}
+        for kind in index.kinds.values():
+            kinds[kind] = kinds.get(kind, 0) + 1
+        print(f'{len(index)} aliases for {len(index.food_ids)} foods (hash {index.hash[:12]})')
+        for kind, count in sorted(kinds.items(), key=lambda item: -item[1]):
+            print(f'  {kind:8s} {count:5d}')
+    elif args.command == 'lookup':
+        for alias in args.aliases:
+            food_id = index.lookup(alias)
+            kind = index.kinds.get(normalize_alias(alias), '')
+            print(f'{alias!r:30s} -> {food_id or "-"} {f"({kind})" if kind else ""}')
+    elif args.command == 'show':
+        for alias in index.aliases_of(args.food_id):
+            print(f'{alias:40s} {index.kinds[alias]}')
+    else:
+        for c in index.conflicts:
+            kept = c['kept'] or '(unknown ID)'
+            print(f"{c['alias']!r:30s} kept {kept:30s} dropped {c['dropped']} [{c['source']}]")
+        print(f'{len(index.conflicts)} conflicts')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,39 +1,15 @@
 #!/usr/bin/env python3
 """Analyze pages 321-386 to identify NEW foods not already in database."""
 
-import json
-import os
 import re
-from pathlib import Path
+
+from corpus import load_corpus
+from food_store import load_food_store
 
 # Load existing foods
 def get_existing_foods():
     """Get set of existing food names from data/foods/."""
-    existing = set()
-    foods_dir = Path("data/foods")
-
-    if foods_dir.exists():
-        for filepath in foods_dir.glob("*.json"):
-            # Extract food name from filename
-            name = filepath.stem.replace('-', ' ')
-            existing.add(name.lower())
-
-            # Also load the JSON to get alternate names
-            try:
-                with open(filepath, 'r') as f:
-                    data = json.load(f)
-                    if 'name' in data:
-                        existing.add(data['name'].lower())
-            except:
-                pass
-
-    return existing
-
-# Read extracted text
-def read_extracted_text():
-    """Read the extracted pages text."""
-    with open("pages_321_386_content.txt", 'r') as f:
-        return f.read()
+    return set(load_food_store().names())
 
 # Main analysis
 existing_foods = get_existing_foods()
@@ -42,7 +18,10 @@ print("\nSample existing foods:")
 for food in sorted(list(existing_foods))[:10]:
     print(f"  - {food}")
 
-content = read_extracted_text()
+# Pages 321-386 by page number, from the canonical corpus
+corpus = load_corpus()
+page_sections = {page: corpus[page] for page in range(321, 387) if page in corpus}
+content = '\n'.join(page_sections.values())
 
 # Identify sections in pages 321-386
 print("\n" + "="*80)
@@ -63,23 +42,6 @@ food_indicators = [
     r"(?:fresh|dried|raw|roasted|cooked|ground)\s+([a-z][a-z\s\-]+?)(?:\s|,|$)",
 ]
 
-# Extract page ranges and their content
-page_sections = {}
-current_page = None
-current_content = []
-
-for line in content.split('\n'):
-    if line.startswith("PAGE "):
-        if current_page:
-            page_sections[current_page] = '\n'.join(current_content)
-        current_page = int(line.replace("PAGE ", "").strip())
-        current_content = []
-    else:
-        current_content.append(line)
-
-if current_page:
-    page_sections[current_page] = '\n'.join(current_content)
-
 print(f"\nPages extracted: {sorted(page_sections.keys())}")
 
 # Analyze content by sections
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Daily Dozen and 21 Tweaks inference as bitmask operations.
+
+determine_daily_dozen() / determine_tweaks() in extract_all_recipes_120_200.py
+and calculate_daily_dozen() / extract_tweaks() in parse_recipes_201_270.py
+each ran `in` checks on every food's category list for every recipe, and the
+two scripts disagreed on names ('cruciferous' vs 'cruciferous-vegetables',
+'nuts-seeds' vs 'nuts-and-seeds', 'vegetables' vs 'other-vegetables').
+
+Now the rules are one declarative table per checklist (DAILY_DOZEN_RULES,
+TWEAK_RULES below). Each rule names the output and what triggers it: any
+of some food categories, any of some food IDs, or any food ID containing
+a fragment. At compile time:
+
+    categories  -> one bit each; every food gets a category mask
+    each rule   -> a category mask and a set of food IDs
+    each food   -> an output mask: bit i set when rule i fires for that food
+
+A recipe's coverage is then the OR of its foods' output masks - one dict
+lookup and one OR per food, with no list scans - and coverage_all() does it
+for every recipe in one pass. Output names come from the tables, in table
+order, so both scripts now emit the same vocabulary.
+
+Usage:
+    from category_rules import daily_dozen_coverage, tweak_coverage
+
+    daily_dozen_coverage(['kale', 'chickpeas'])     # ['beans', 'cruciferous-vegetables', 'greens', ...]
+    tweak_coverage(['cumin', 'lentils-brown-puy'], name='Breakfast Dal')
+
+    python category_rules.py kale chickpeas turmeric
+    python category_rules.py --corpus        # every segmented recipe, with timings
+"""
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Rule(NamedTuple):
+    output: str
+    categories: Tuple[str, ...] = ()
+    foods: Tuple[str, ...] = ()
+    id_contains: Tuple[str, ...] = ()
+    # Recipe-level: fires when the recipe name contains any of these
+    name_contains: Tuple[str, ...] = ()
+    # A food that already gives this output does not also give this rule's
+    unless: str = ''
+
+
+# === CONFIGURATION ===
+DAILY_DOZEN_RULES = [
+    Rule('beans', categories=('rich-in-legumes', 'legumes', 'beans', 'beans-legumes')),
+    Rule('berries', categories=('berries',), id_contains=('berries',)),
+    Rule('other-fruits', categories=('rich-in-fruits', 'fruits'), unless='berries'),
+    Rule('cruciferous-vegetables', categories=('cruciferous',)),
+    Rule('greens', categories=('greens', 'rich-in-greens')),
+    Rule('other-vegetables', categories=('rich-in-vegetables', 'vegetables')),
+    Rule('flaxseeds', id_contains=('flaxseed',)),
+    Rule('nuts-and-seeds', categories=('nuts-and-seeds', 'nuts-seeds', 'nuts', 'seeds')),
+    Rule('herbs-and-spices', categories=('herbs-and-spices', 'herbs-spices', 'herbs', 'spices')),
+    Rule('whole-grains', categories=('whole-grains', 'rich-in-whole-grains', 'intact-whole-grains')),
+    Rule('beverages', categories=('beverages',)),
+]
+
+TWEAK_RULES = [
+    Rule('preload-vegetables', foods=('rocket-arugula', 'romaine-lettuce', 'round-lettuce-butterhead', 'cucumber')),
+    Rule('negative-calorie-foods', categories=('negative-calorie',), foods=('negative-calorie-foods',)),
+    Rule('vinegar', categories=('vinegar',), id_contains=('vinegar',)),
+    Rule('cumin', foods=('cumin', 'nigella-seeds-black-cumin')),
+    Rule('spices', categories=('weight-loss-booster',)),
+    Rule('anti-inflammatory', foods=('turmeric', 'ginger', 'ginger-ground', 'garlic', 'cauliflower', 'broccoli', 'kale')),
+    Rule('fiber', categories=('high-fiber', 'fiber-rich'), id_contains=('beans', 'lentil')),
+    Rule('deflour', categories=('intact-whole-grains',), id_contains=('groat', 'whole-grain', 'quinoa')),
+    Rule('meal-timing-breakfast', name_contains=('breakfast',)),
+]
+
+
+class RuleSet:
+    """A rules table compiled against the food store's categories and IDs."""
+
+    def __init__(self, rules: Sequence[Rule], foods: Dict[str, Sequence[str]]):
+        """`foods`: {food_id: categories}."""
+        self.rules = list(rules)
+        self.outputs = [rule.output for rule in self.rules]
+        self.bit_of = {output: 1 << i for i, output in enumerate(self.outputs)}
+
+        # Category -> bit, over every category any food has
+        self.category_bits: Dict[str, int] = {}
+        for categories in foods.values():
+            for category in categories:
+                self.category_bits.setdefault(category, 1 << len(self.category_bits))
+        self.category_masks = {food_id: self._category_mask(categories) for food_id, categories in foods.items()}
+
+        rule_masks = [self._category_mask(rule.categories) for rule in self.rules]
+        rule_foods = [{food_id for food_id in foods
+                       if food_id in rule.foods or any(part in food_id for part in rule.id_contains)}
+                      for rule in self.rules]
+
+        # Food -> output mask, computed once; a recipe is then an OR over its foods
+        self.food_outputs: Dict[str, int] = {}
+        for food_id, mask in self.category_masks.items():
+            out = 0
+            for i, rule in enumerate(self.rules):
+                if mask & rule_masks[i] or food_id in rule_foods[i]:
+                    out |= 1 << i
+            for i, rule in enumerate(self.rules):
+                if rule.unless and out & self.bit_of[rule.unless]:
+                    out &= ~(1 << i)
+            if out:
+                self.food_outputs[food_id] = out
+
+        self._name_rules = [(1 << i, rule.name_contains) for i, rule in enumerate(self.rules) if rule.name_contains]
+
+    def _category_mask(self, categories: Iterable[str]) -> int:
+        mask = 0
+        for category in categories:
+            mask |= self.category_bits.get(category, 0)
+        return mask
+
+    def mask(self, food_ids: Iterable[str], name: str = '') -> int:
+        """Output mask for a recipe's foods (and name, for recipe-level rules)."""
+        outputs = self.food_outputs
+        out = 0
+        for food_id in food_ids:
+            out |= outputs.get(food_id, 0)
+        if name and self._name_rules:
+            name = name.lower()
+            for bit, parts in self._name_rules:
+                if any(part in name for part in parts):
+                    out |= bit
+        return out
+
+    def labels(self, mask: int) -> List[str]:
+        """Output names set in `mask`, in table order."""
+        return [output for i, output in enumerate(self.outputs) if mask >> i & 1]
+
+    def coverage(self, food_ids: Iterable[str], name: str = '') -> List[str]:
+        return self.labels(self.mask(food_ids, name))
+
+    def coverage_all(self, recipes: Iterable[Tuple[Iterable[str], str]]) -> List[int]:
+        """Output masks for many (food IDs, name) recipes in one pass.
+
+        Plain ints on purpose: a NumPy version (gather each food's mask,
+        bitwise_or.at per recipe) measured ~1.5x slower at 81 and at 8100
+        recipes, because the per-food dict lookup dominates either way.
+        """
+        mask = self.mask
+        return [mask(food_ids, name) for food_ids, name in recipes]
+
+
+def _store_categories() -> Dict[str, Sequence[str]]:
+    from food_store import load_food_store
+
+    return {food_id: food.categories for food_id, food in load_food_store().items()}
+
+
+@lru_cache(maxsize=1)
+def daily_dozen_rules() -> RuleSet:
+    return RuleSet(DAILY_DOZEN_RULES, _store_categories())
+
+
+@lru_cache(maxsize=1)
+def tweak_rules() -> RuleSet:
+    return RuleSet(TWEAK_RULES, _store_categories())
+
+
+def daily_dozen_coverage(food_ids: Iterable[str]) -> List[str]:
+    """Daily Dozen categories covered by these foods."""
+    return daily_dozen_rules().coverage(food_ids)
+
+
+def tweak_coverage(food_ids: Iterable[str], name: str = '') -> List[str]:
+    """21 Tweaks a recipe with these foods (and this name) incorporates."""
+    return tweak_rules().coverage(food_ids, name)
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Daily Dozen / 21 Tweaks coverage from the rules tables')
+    parser.add_argument('foods', nargs='*', help='food IDs')
+    parser.add_argument('--corpus', action='store_true', help='score every recipe in the book in one pass')
+    args = parser.parse_args(argv)
+
+    if args.foods:
+        print('daily dozen:', ', '.join(daily_dozen_coverage(args.foods)) or '-')
+        print('tweaks:     ', ', '.join(tweak_coverage(args.foods)) or '-')
+    if not args.corpus:
+        if not args.foods:
+            parser.print_help()
+        return
+
+    from match_memo import default_memo
+    from recipe_segmenter import segment_book
+
+    memo = default_memo()
+    recipes = [({food_id for line in span.ingredients for food_id in memo.foods(line)}, span.name)
+               for span in segment_book()]
+    dd, tw = daily_dozen_rules(), tweak_rules()
+
+    start = time.perf_counter()
+    dd_masks = dd.coverage_all(recipes)
+    tw_masks = tw.coverage_all(recipes)
+    elapsed = time.perf_counter() - start
+
+    print(f'{len(recipes)} recipes scored in {elapsed * 1000:.2f} ms', file=sys.stderr)
+    for rules, masks in ((dd, dd_masks), (tw, tw_masks)):
+        for i, output in enumerate(rules.outputs):
+            count = sum(1 for mask in masks if mask >> i & 1)
+            print(f'  {output:24s} {count:4d}')
+        print()
+    memo.close()
+
+
+if __name__ == '__main__':
+    main()
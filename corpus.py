@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Canonical page corpus merged from every PAGE N dump in the repo.
+
+The dumps overlap (pages_187_230.txt and pages_201_270.txt both hold 201-230),
+use different separators, and some only hold excerpts of a page
+(target_foods_extraction.txt). The ingest here reads each dump once, dedupes
+page variants by content hash, keeps the best variant of every page, fills
+pages no dump has from the PDF page cache when the PDF is available, and
+writes a single page store plus a manifest of where each page came from:
+
+    .cache/index/corpus.pstore    page texts (see page_store.py)
+    .cache/index/corpus.json      per page: source, sha256, variants; gaps
+
+The manifest also records each dump's (mtime, size) and whether the PDF
+filled the gaps. The corpus is rebuilt automatically when a dump is added,
+removed, renamed or changed (any stamp differs, older mtimes included), or
+when pages are missing and a PDF has turned up since the last build.
+
+Usage:
+    from corpus import load_corpus
+
+    corpus = load_corpus()        # PageStore: {page_number: text}
+    corpus[201]
+
+CLI:
+    python corpus.py build [--no-pdf] [--export corpus.txt]
+    python corpus.py report
+"""
+import glob
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional
+
+from page_cache import BASE_DIR, _atomic_write, find_pdf
+from page_store import STORE_DIR, PageStore, write_store
+from pdf_backend import text_quality
+
+# === CONFIGURATION ===
+CORPUS_FILE = STORE_DIR / 'corpus.pstore'
+MANIFEST_FILE = STORE_DIR / 'corpus.json'
+FIRST_PAGE = 1
+LAST_PAGE = 386
+
+
+def dump_files() -> List[str]:
+    """Every .txt file in the repo root that parses as a PAGE N dump."""
+    from parallel_extract import DUMP_HEADER_RE
+
+    files = []
+    for path in sorted(glob.glob(str(BASE_DIR / '*.txt'))):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            if DUMP_HEADER_RE.search(f.read()):
+                files.append(path)
+    return files
+
+
+def dump_stamps(files: List[str]) -> Dict[str, List[int]]:
+    """{dump name: [mtime_ns, size]} for the given dump files."""
+    stamps = {}
+    for path in files:
+        stat = os.stat(path)
+        stamps[os.path.basename(path)] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def page_score(text: str) -> float:
+    """Readable characters on a page: longer, cleaner variants score higher."""
+    return len(text.strip()) * text_quality(text)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def ingest(files: List[str]) -> Dict[int, Dict[str, Dict]]:
+    """{page: {sha256: {'text', 'sources'}}} - each distinct variant once."""
+    from parallel_extract import read_dump
+
+    variants: Dict[int, Dict[str, Dict]] = {}
+    for path in files:
+        for page_num, text in read_dump(path).items():
+            entry = variants.setdefault(page_num, {}).setdefault(_sha256(text), {'text': text, 'sources': []})
+            entry['sources'].append(os.path.basename(path))
+    return variants
+
+
+def merge(variants: Dict[int, Dict[str, Dict]]) -> Dict[int, Dict]:
+    """Pick the highest-scoring variant of each page (ties go to the first dump)."""
+    merged = {}
+    for page_num, by_hash in variants.items():
+        digest, best = max(by_hash.items(), key=lambda item: page_score(item[1]['text']))
+        merged[page_num] = {
+            'text': best['text'],
+            'sha256': digest,
+            'source': best['sources'][0],
+            'variants': {h: v['sources'] for h, v in by_hash.items()},
+        }
+    return merged
+
+
+def fill_from_pdf(merged: Dict[int, Dict], pages: List[int], pdf_path, backend: Optional[str] = None):
+    """Decode the pages no dump has (through the shared page cache)."""
+    from page_cache import PageCache
+
+    with PageCache(pdf_path, backend) as cache:
+        page_count = cache.page_count()
+        for page_num in pages:
+            if page_num <= page_count:
+                text = cache.text(page_num - 1)
+                merged[page_num] = {'text': text, 'sha256': _sha256(text),
+                                    'source': f'pdf:{cache.backend}', 'variants': {}}
+
+
+def build_corpus(use_pdf: bool = True, files: Optional[List[str]] = None) -> Dict:
+    """Ingest, merge and write the corpus; returns the manifest."""
+    files = dump_files() if files is None else files
+    merged = merge(ingest(files))
+
+    missing = [p for p in range(FIRST_PAGE, LAST_PAGE + 1) if p not in merged]
+    pdf_path = find_pdf() if use_pdf else None
+    if missing and pdf_path:
+        fill_from_pdf(merged, missing, pdf_path)
+
+    write_store(CORPUS_FILE, {p: entry['text'] for p, entry in merged.items()})
+    manifest = {
+        'dumps': [os.path.basename(f) for f in files],
+        'stamps': dump_stamps(files),
+        'pdf': pdf_path,
+        'pages': {str(p): {k: v for k, v in entry.items() if k != 'text'} for p, entry in sorted(merged.items())},
+        'gaps': [p for p in range(FIRST_PAGE, LAST_PAGE + 1) if p not in merged],
+    }
+    _atomic_write(MANIFEST_FILE, json.dumps(manifest, indent=2))
+    return manifest
+
+
+def _stale() -> bool:
+    if not CORPUS_FILE.exists():
+        return True
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return True
+    if manifest.get('stamps') != dump_stamps(dump_files()):
+        return True
+    return bool(manifest.get('gaps')) and not manifest.get('pdf') and find_pdf() is not None
+
+
+def load_corpus(rebuild: bool = False) -> PageStore:
+    """The canonical corpus as a PageStore, (re)built when missing or stale."""
+    if rebuild or _stale():
+        build_corpus()
+    return PageStore(CORPUS_FILE)
+
+
+def load_manifest() -> Dict:
+    if _stale():
+        build_corpus()
+    with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Canonical page corpus merged from the PAGE N dumps')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='ingest every dump and write the corpus')
+    build.add_argument('--no-pdf', action='store_true', help='do not fill missing pages from the PDF')
+    build.add_argument('--export', help='also write the corpus as a PAGE N text dump')
+    sub.add_parser('report', help='show sources, conflicts and gaps')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        manifest = build_corpus(use_pdf=not args.no_pdf)
+        print(f"Corpus: {len(manifest['pages'])} pages from {len(manifest['dumps'])} dumps, "
+              f"{len(manifest['gaps'])} gaps -> {CORPUS_FILE}", file=sys.stderr)
+        if args.export:
+            from page_store import export_dump
+
+            with PageStore(CORPUS_FILE) as corpus:
+                export_dump(corpus, args.export)
+            print(f'Text saved to {args.export}', file=sys.stderr)
+        return
+
+    manifest = load_manifest()
+    sources: Dict[str, int] = {}
+    for entry in manifest['pages'].values():
+        sources[entry['source']] = sources.get(entry['source'], 0) + 1
+    print(f"{len(manifest['pages'])} pages, {len(manifest['gaps'])} gaps")
+    for source, count in sorted(sources.items(), key=lambda item: -item[1]):
+        print(f'  {count:4d} pages from {source}')
+
+    conflicts = {p: e for p, e in manifest['pages'].items() if len(e['variants']) > 1}
+    print(f'{len(conflicts)} pages with differing variants:')
+    for page_num, entry in conflicts.items():
+        others = sorted({s for h, srcs in entry['variants'].items() if h != entry['sha256'] for s in srcs})
+        print(f"  page {page_num}: kept {entry['source']} over {', '.join(others)}")
+    if manifest['gaps']:
+        print(f"gaps: {manifest['gaps']}")
+
+
+if __name__ == '__main__':
+    main()
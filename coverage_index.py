@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Daily Dozen coverage index: which recipes fill today's remaining gaps?
+
+Every recipe gets a Daily Dozen mask over the category_rules.py outputs
+(11 bits): the categories its file declares (`daily_dozen` /
+`daily_dozen_coverage`, list or {category: servings}, in any of the
+spellings the extraction passes used) OR'd with what its foods cover
+according to the rules. Recipes with the same mask are interchangeable for
+coverage, so the index is keyed by mask: ~50 distinct masks for the current
+recipes.
+
+A day-state is the OR of the chosen meals' masks - one of 2^11 values - so
+the ranking for every possible state is precomputed up front:
+
+    gain[state, m] = popcount(mask[m] & ~state)      via a popcount table
+    ranked[state]  = every mask index, most new categories first
+
+A suggestion is then a row lookup, a batch of day-states is one fancy-index
+of `ranked`, and greedy set cover ("fill the gaps in at most n meals") walks
+ranked[state][0] until nothing is left to gain. Meal filters go through
+recipe_store.meal_types() ('Dinner' also takes 'main dish' and 'lunch'
+recipes) and get their own table, built on first use.
+
+Per-recipe masks are kept in .cache/index/coverage_index.pkl and recomputed
+when a recipe file, the food data, the alias index or the rules change.
+
+Usage:
+    from coverage_index import load_coverage_index
+
+    index = load_coverage_index()
+    index.suggest(['recipe-064', 'recipe-041'], k=5)        # [(recipe IDs, categories added), ...]
+    index.fill_gaps(['recipe-064'], max_meals=2, meal_types=('dinner',))
+    index.suggest_batch(day_masks, k=3)                     # N x k mask-group indexes
+
+    python coverage_index.py suggest recipe-064 recipe-041 [-k 5] [--meal dinner]
+    python coverage_index.py fill recipe-064 [--meals 2] [--meal lunch --meal dinner]
+    python coverage_index.py stats [--benchmark]
+"""
+import hashlib
+import pickle
+import sys
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+from page_cache import _atomic_pickle
+from page_store import STORE_DIR
+
+# === CONFIGURATION ===
+INDEX_FILE = STORE_DIR / 'coverage_index.pkl'
+INDEX_VERSION = 1
+DECLARED_FIELDS = ('daily_dozen', 'daily_dozen_coverage')
+# Spellings found in recipe files -> category_rules outputs
+LABEL_ALIASES = {
+    'herbs_spices': 'herbs-and-spices',
+    'other_veg': 'other-vegetables',
+    'vegetables': 'other-vegetables',
+    'cruciferous': 'cruciferous-vegetables',
+    'whole_grains': 'whole-grains',
+    'nuts_seeds': 'nuts-and-seeds',
+    'other_fruits': 'other-fruits',
+}
+
+
+def declared_labels(data: Dict) -> List[str]:
+    """Daily Dozen categories a recipe file declares, as category_rules outputs."""
+    labels = []
+    for field in DECLARED_FIELDS:
+        value = data.get(field)
+        if isinstance(value, dict):
+            value = [key for key, servings in value.items() if servings]
+        if isinstance(value, list):
+            for label in value:
+                if isinstance(label, str):
+                    label = label.strip().lower()
+                    labels.append(LABEL_ALIASES.get(label, label))
+    return list(dict.fromkeys(labels))
+
+
+def recipe_mask(recipe, rules) -> Tuple[int, Tuple[str, ...]]:
+    """(declared | food-derived Daily Dozen mask, declared labels the rules do not know)."""
+    mask, unknown = rules.mask(recipe.foods), []
+    for label in declared_labels(recipe.data):
+        bit = rules.bit_of.get(label)
+        if bit is None:
+            unknown.append(label)
+        else:
+            mask |= bit
+    return mask, tuple(unknown)
+
+
+class CoverageIndex:
+    """Recipes grouped by Daily Dozen mask, with rankings for every day-state."""
+
+    def __init__(self, outputs: List[str], recipe_ids: List[str], names: List[str],
+                 meal_types: List[str], masks: List[int], digest: str = ''):
+        import numpy as np
+
+        self.outputs = outputs
+        self.full = (1 << len(outputs)) - 1
+        self.recipe_ids = recipe_ids
+        self.names = names
+        self.meal_types = meal_types
+        self.masks = masks
+        self.digest = digest
+        self.index = {recipe_id: r for r, recipe_id in enumerate(recipe_ids)}
+        self.popcount = np.array([bin(state).count('1') for state in range(self.full + 1)], dtype=np.uint8)
+        self._tables: Dict[Optional[FrozenSet[str]], Tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    def labels(self, mask: int) -> List[str]:
+        return [output for i, output in enumerate(self.outputs) if mask >> i & 1]
+
+    def state(self, recipe_ids: Iterable[str]) -> int:
+        """Day-state (OR of masks) for the chosen recipes; unknown IDs raise KeyError."""
+        state = 0
+        for recipe_id in recipe_ids:
+            state |= self.masks[self.index[recipe_id]]
+        return state
+
+    def table(self, meal_types: Optional[Iterable[str]] = None):
+        """(group masks, recipes per group, ranked groups per state, gains) for a meal filter."""
+        from recipe_store import meal_types as accepted_meal_types
+
+        key = accepted_meal_types(meal_types)
+        if key not in self._tables:
+            import numpy as np
+
+            groups: Dict[int, List[int]] = {}
+            for r, mask in enumerate(self.masks):
+                if mask and (key is None or self.meal_types[r] in key):
+                    groups.setdefault(mask, []).append(r)
+            # Wider masks first, so equal gains prefer the recipe covering more overall
+            group_masks = np.array(sorted(groups, key=lambda m: (-bin(m).count('1'), m)), dtype=np.uint16)
+            members = [groups[int(m)] for m in group_masks]
+            states = np.arange(self.full + 1, dtype=np.uint16)
+            gains = self.popcount[group_masks[None, :] & ~states[:, None] & self.full]
+            # All groups per state: skipping excluded or already-picked recipes may go past any top-k
+            ranked = np.argsort(-gains.astype(np.int16), axis=1, kind='stable').astype(np.int16)
+            self._tables[key] = (group_masks, members, ranked, np.take_along_axis(gains, ranked, axis=1))
+        return self._tables[key]
+
+    def suggest_state(self, state: int, k: int = 5, meal_types=None,
+                      exclude: Sequence[str] = ()) -> List[Tuple[List[str], List[str]]]:
+        """Best groups for one day-state: [(recipe IDs, categories they add)], gain > 0 only."""
+        group_masks, members, ranked, gains = self.table(meal_types)
+        skip = {self.index[r] for r in exclude if r in self.index}
+        found = []
+        for g, gain in zip(ranked[state].tolist(), gains[state].tolist()):
+            if gain == 0 or len(found) == k:
+                break
+            recipes = [self.recipe_ids[r] for r in members[g] if r not in skip]
+            if recipes:
+                found.append((recipes, self.labels(int(group_masks[g]) & ~state)))
+        return found
+
+    def suggest(self, chosen: Sequence[str], k: int = 5, meal_types=None) -> List[Tuple[List[str], List[str]]]:
+        """Recipes covering the most Daily Dozen categories today's chosen meals leave open."""
+        return self.suggest_state(self.state(chosen), k, meal_types, exclude=chosen)
+
+    def suggest_batch(self, states, k: int = 3, meal_types=None):
+        """(group indexes, gains), both N x k, for an array of day-states."""
+        import numpy as np
+
+        _, _, ranked, gains = self.table(meal_types)
+        states = np.asarray(states, dtype=np.intp) & self.full
+        return ranked[states, :k], gains[states, :k]
+
+    def fill_gaps(self, chosen: Sequence[str], max_meals: int = 2,
+                  meal_types=None) -> Tuple[List[str], List[str]]:
+        """Greedy set cover: (recipes added, categories still missing)."""
+        group_masks, members, ranked, gains = self.table(meal_types)
+        state, picked = self.state(chosen), list(chosen)
+        added = []
+        while len(added) < max_meals and state != self.full:
+            best = None
+            for g, gain in zip(ranked[state].tolist(), gains[state].tolist()):
+                if gain == 0:
+                    break
+                recipe = next((self.recipe_ids[r] for r in members[g] if self.recipe_ids[r] not in picked), None)
+                if recipe:
+                    best = (recipe, int(group_masks[g]))
+                    break
+            if best is None:
+                break
+            added.append(best[0])
+            picked.append(best[0])
+            state |= best[1]
+        return added, self.labels(self.full & ~state)
+
+    def save(self, index_file=INDEX_FILE) -> None:
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_pickle(index_file, (INDEX_VERSION, self.digest, self.outputs, self.recipe_ids, self.names,
+                                    self.meal_types, self.masks))
+
+
+def _source_digest(store, alias_hash: str, rules, recipes_dir) -> str:
+    """Hash of the rules, food categories, alias index and recipe file stamps."""
+    from recipe_store import recipes_digest
+
+    digest = hashlib.sha256(alias_hash.encode('ascii'))
+    digest.update(repr(rules.rules).encode('utf-8'))
+    for food_id, food in sorted(store.items()):
+        digest.update(f'{food_id}\0{food.name}\0{",".join(food.categories)}\n'.encode('utf-8'))
+    digest.update(recipes_digest(recipes_dir).encode('ascii'))
+    return digest.hexdigest()
+
+
+_loaded: Optional[CoverageIndex] = None
+
+
+def load_coverage_index(rebuild: bool = False, index_file=INDEX_FILE) -> CoverageIndex:
+    """The stored index, checked against its sources once per process."""
+    global _loaded
+    if _loaded is not None and not rebuild:
+        return _loaded
+
+    from alias_index import load_alias_index
+    from category_rules import daily_dozen_rules
+    from food_store import load_food_store
+    from recipe_store import RECIPES_DIR, load_recipes
+
+    rules = daily_dozen_rules()
+    digest = _source_digest(load_food_store(), load_alias_index().hash, rules, RECIPES_DIR)
+
+    if not rebuild and index_file.exists():
+        try:
+            with open(index_file, 'rb') as f:
+                version, stored_digest, *state = pickle.load(f)
+            if version == INDEX_VERSION and stored_digest == digest:
+                _loaded = CoverageIndex(*state, digest=digest)
+                return _loaded
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            pass
+
+    recipes = load_recipes()
+    masks = []
+    for recipe in recipes:
+        mask, unknown = recipe_mask(recipe, rules)
+        if unknown:
+            print(f'coverage index: {recipe.id}: unknown Daily Dozen labels {", ".join(unknown)}', file=sys.stderr)
+        masks.append(mask)
+    _loaded = CoverageIndex(list(rules.outputs), [r.id for r in recipes], [r.name for r in recipes],
+                            [r.meal_type for r in recipes], masks, digest)
+    _loaded.save(index_file)
+    print(f'coverage index: {len(recipes)} recipes, {len(set(masks))} distinct masks -> {index_file}',
+          file=sys.stderr)
+    return _loaded
+
+
+def benchmark(index: CoverageIndex, batch: int = 10000, repeat: int = 1000) -> None:
+    import numpy as np
+
+    start = time.perf_counter()
+    index._tables.clear()
+    index.table()
+    print(f'state table: {(time.perf_counter() - start) * 1000:.2f} ms')
+    chosen = index.recipe_ids[:2]
+    for label, fn in (('suggest', lambda: index.suggest(chosen, 5)),
+                      ('fill_gaps', lambda: index.fill_gaps(chosen[:1], 3))):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        print(f'{label}: {(time.perf_counter() - start) / repeat * 1e6:.1f} us')
+    states = np.random.default_rng(0).integers(0, index.full + 1, size=batch)
+    start = time.perf_counter()
+    index.suggest_batch(states, 3)
+    elapsed = time.perf_counter() - start
+    print(f'suggest_batch: {batch} states in {elapsed * 1000:.2f} ms ({elapsed / batch * 1e9:.0f} ns/state)')
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Recipes that fill Daily Dozen gaps')
+    sub = parser.add_subparsers(dest='command', required=True)
+    suggest = sub.add_parser('suggest', help='recipes covering the most remaining categories')
+    suggest.add_argument('recipes', nargs='*', help="today's chosen recipe IDs")
+    suggest.add_argument('-k', type=int, default=5)
+    fill = sub.add_parser('fill', help='greedy set cover of the remaining categories')
+    fill.add_argument('recipes', nargs='*', help="today's chosen recipe IDs")
+    fill.add_argument('--meals', type=int, default=2, help='meals to add at most (default: %(default)s)')
+    for command in (suggest, fill):
+        command.add_argument('--meal', action='append', help='only recipes served at this meal (repeatable)')
+    stats = sub.add_parser('stats', help='index summary')
+    stats.add_argument('--benchmark', action='store_true')
+    for command in (suggest, fill, stats):
+        command.add_argument('--rebuild', action='store_true')
+    args = parser.parse_args(argv)
+
+    try:
+        index = load_coverage_index(rebuild=args.rebuild)
+    except ImportError as e:
+        print(f'Error: {e} (the coverage index needs NumPy)', file=sys.stderr)
+        return 1
+    if args.command == 'stats':
+        print(f'{len(index)} recipes, {len(set(index.masks))} distinct masks over {len(index.outputs)} categories')
+        for i, output in enumerate(index.outputs):
+            print(f'  {output:24s} {sum(1 for m in index.masks if m >> i & 1):4d}')
+        if args.benchmark:
+            benchmark(index)
+        return 0
+
+    unknown = [r for r in args.recipes if r not in index.index]
+    if unknown:
+        sys.exit(f'Unknown recipes: {", ".join(unknown)}')
+    state = index.state(args.recipes)
+    print(f'Covered ({bin(state).count("1")}/{len(index.outputs)}): {", ".join(index.labels(state)) or "-"}')
+    if args.command == 'suggest':
+        for recipes, adds in index.suggest(args.recipes, args.k, args.meal):
+            names = '; '.join(f'{r} {index.names[index.index[r]][:40]}' for r in recipes[:3])
+            more = f' (+{len(recipes) - 3} more)' if len(recipes) > 3 else ''
+            print(f'  +{len(adds)} {", ".join(adds)}\n      {names}{more}')
+    else:
+        added, missing = index.fill_gaps(args.recipes, args.meals, args.meal)
+        for recipe_id in added:
+            print(f'  add {recipe_id}  {index.names[index.index[recipe_id]]}')
+        print(f'Still missing: {", ".join(missing) or "nothing"}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
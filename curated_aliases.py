@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Hand-typed alias tables: ingredient wording -> food ID.
+
+FOOD_KEYWORDS came from extract_all_recipes_120_200.py and
+INGREDIENT_MAPPINGS from parse_recipes_201_270.py. alias_index.py merges
+them into the generated index and food_matcher.py benchmarks the old scans
+over them; keeping them here means neither imports an extraction script.
+
+Usage:
+    from curated_aliases import FOOD_KEYWORDS, INGREDIENT_MAPPINGS
+"""
+
+FOOD_KEYWORDS = {
+    'kale': 'kale', 'cavolo nero': 'cavolo-nero', 'beans': 'beans-legumes',
+    'cannellini': 'white-beans-cannellini', 'white beans': 'white-beans-cannellini',
+    'chickpeas': 'chickpeas', 'black beans': 'black-beans', 'lentils': 'lentils-brown-puy',
+    'mushroom': 'portobello-mushrooms', 'portobello': 'portobello-mushrooms',
+    'shiitake': 'mushrooms-shiitake', 'garlic': 'garlic', 'onion': 'onions',
+    'turmeric': 'turmeric', 'ginger': 'ginger', 'vinegar': 'vinegar-all-types',
+    'balsamic vinegar': 'vinegar-all-types', 'apple cider vinegar': 'vinegar-all-types',
+    'red wine vinegar': 'vinegar-all-types', 'white balsamic vinegar': 'vinegar-all-types',
+    'nutritional yeast': 'nutritional-yeast', 'flaxseed': 'flaxseeds-ground',
+    'ground flaxseed': 'flaxseeds-ground', 'chia seed': 'chia-seeds',
+    'cauliflower': 'cauliflower', 'broccoli': 'broccoli', 'asparagus': 'asparagus',
+    'sweet potato': 'sweet-potatoes', 'carrot': 'carrots', 'tomato': 'tomatoes-all-types',
+    'cherry tomato': 'cherry-tomatoes', 'bell pepper': 'bell-peppers',
+    'red pepper': 'bell-peppers-raw', 'courgette': 'zucchini-courgette',
+    'basil': 'fresh-herbs', 'parsley': 'fresh-herbs', 'coriander': 'fresh-herbs',
+    'rosemary': 'fresh-herbs', 'sage': 'fresh-herbs', 'rocket': 'greens-low-oxalate',
+    'spinach': 'spinach', 'avocado': 'avocado', 'lemon': 'lemon', 'pumpkin': 'pumpkin',
+    'quinoa': 'quinoa', 'oats': 'oat-groats-whole-intact-oats',
+    'rolled oats': 'oat-groats-whole-intact-oats', 'barley': 'pot-barley-groats',
+    'green beans': 'green-beans', 'peanut': 'peanuts', 'peanut butter': 'peanuts',
+    'walnut': 'walnuts', 'almond': 'almonds', 'cashew': 'cashews',
+    'pistachio': 'pistachios', 'brazil nut': 'brazil-nuts', 'pumpkin seed': 'pumpkin-seeds',
+    'cucumber': 'cucumber', 'celery': 'celery', 'bean sprout': 'bean-sprouts',
+    'tempeh': 'tempeh', 'miso': 'miso', 'cabbage': 'cabbage',
+    'napa cabbage': 'napa-cabbage', 'brussels sprout': 'brussels-sprouts',
+    'bok choy': 'bok-choy', 'collard': 'collard-greens', 'mustard green': 'mustard-greens',
+    'parsnip': 'parsnips', 'potato': 'potatoes-white', 'beetroot': 'beets-beetroot',
+    'beet': 'beets-beetroot', 'artichoke': 'artichokes', 'black pepper': 'black-pepper',
+    'cayenne': 'cayenne-pepper', 'red pepper flakes': 'crushed-red-pepper-flakes',
+    'cumin': 'cumin', 'cinnamon': 'cinnamon', 'oregano': 'oregano-dried',
+    'nigella seed': 'nigella-seeds-black-cumin', 'garlic powder': 'garlic-powder',
+    'onion powder': 'onion-powder', 'paprika': 'smoked-paprika',
+    'smoked paprika': 'smoked-paprika', 'spaghetti squash': 'spaghetti-squash',
+    'butternut squash': 'butternut-squash', 'summer squash': 'summer-squash',
+    'yellow squash': 'summer-squash', 'zucchini': 'zucchini-courgette',
+    'lettuce': 'lettuce', 'edamame': 'edamame', 'peas': 'peas',
+    'green peas': 'peas', 'snow peas': 'mange-tout-snow-peas',
+    'mange tout': 'mange-tout-snow-peas', 'lima beans': 'lima-beans',
+    'pinto beans': 'pinto-beans', 'navy beans': 'navy-beans',
+    'adzuki beans': 'adzuki-beans', 'mung beans': 'mung-beans',
+    'black-eyed peas': 'black-eyed-peas'
+}
+
+INGREDIENT_MAPPINGS = {
+    'chickpeas': 'chickpeas',
+    'chickpea': 'chickpeas',
+    'kale': 'kale',
+    'dark leafy greens': 'kale',
+    'carrots': 'carrots',
+    'carrot': 'carrots',
+    'cumin': 'cumin',
+    'tomatoes': 'cherry-tomatoes',
+    'cherry tomatoes': 'cherry-tomatoes',
+    'sweet potato': 'sweet-potatoes',
+    'sweet potatoes': 'sweet-potatoes',
+    'onion': 'onions',
+    'red onion': 'onions',
+    'garlic': 'garlic',
+    'black pepper': 'black-pepper',
+    'cranberries': 'cranberries-dried',
+    'celery': 'celery',
+    'lentils': 'lentils-brown-puy',
+    'brown lentils': 'lentils-brown-puy',
+    'black lentils': 'lentils-black-beluga',
+    'mushrooms': 'mushrooms-white',
+    'tempeh': 'tempeh',
+    'white beans': 'white-beans-cannellini',
+    'black beans': 'black-beans',
+    'peas': 'peas',
+    'parsley': 'parsley-fresh',
+    'fresh parsley': 'parsley-fresh',
+    'broccoli': 'broccoli',
+    'barley': 'barley',
+    'oats': 'oat-groats-whole-intact-oats',
+    'rye': 'rye-berries-whole',
+    'kabocha squash': 'kabocha-squash',
+    'butternut squash': 'butternut-squash',
+    'collards': 'collard-greens',
+    'miso': 'miso',
+    'nutritional yeast': 'nutritional-yeast',
+    'apple cider vinegar': 'apple-cider-vinegar',
+    'coriander': 'coriander-ground',
+    'ground coriander': 'coriander-ground',
+    'smoked paprika': 'smoked-paprika',
+    'sage': 'sage-dried',
+    'thyme': 'thyme-dried',
+    'rosemary': 'rosemary-dried',
+    'black-eyed beans': 'black-eyed-peas',
+    'beetroot': 'beetroot',
+    'beets': 'beetroot',
+    'red beans': 'red-beans-kidney',
+    'kidney beans': 'red-beans-kidney',
+}
@@ -1,46 +1,28 @@
 #!/usr/bin/env python3
 import sys
-import glob
 
-pdf_files = glob.glob('/Users/dragan/Documents/how-not-to-diet/*.pdf')
-pdf_path = pdf_files[0] if pdf_files else None
+from page_cache import find_pdf
+from page_stream import PageStream
+from section_map import section_pages
+
+pdf_path = find_pdf()
 
 if not pdf_path:
     print("No PDF found!", file=sys.stderr)
     sys.exit(1)
 
 try:
-    import PyPDF2
-
-    with open(pdf_path, 'rb') as file:
-        pdf = PyPDF2.PdfReader(file)
-        total_pages = len(pdf.pages)
-        print(f'Total pages: {total_pages}', file=sys.stderr)
+    # Extract the 21 Tweaks section (pages from the section map)
+    stream = PageStream(pdf_path, pages=section_pages('21 tweaks', pdf_path=pdf_path))
+    print(f'Total pages: {stream.page_count}', file=sys.stderr)
 
-        # Extract pages 15-30 for detailed 21 Tweaks content
-        for i in range(15, min(35, total_pages)):
-            text = pdf.pages[i].extract_text()
+    for page_num, text in stream:
+        if text:
             print(f'\n{"="*80}')
-            print(f'PAGE {i+1}')
+            print(f'PAGE {page_num}')
             print("="*80)
             print(text)
 
-except ImportError:
-    try:
-        import pdfplumber
-
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            print(f'Total pages: {total_pages}', file=sys.stderr)
-
-            for i in range(15, min(35, total_pages)):
-                text = pdf.pages[i].extract_text()
-                if text:
-                    print(f'\n{"="*80}')
-                    print(f'PAGE {i+1}')
-                    print("="*80)
-                    print(text)
-
-    except ImportError:
-        print("Error: Neither PyPDF2 nor pdfplumber is installed", file=sys.stderr)
-        sys.exit(1)
+except ImportError as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
@@ -1,49 +1,32 @@
 #!/usr/bin/env python3
 import sys
-import glob
-import json
 
-pdf_files = glob.glob('/Users/dragan/Documents/how-not-to-diet/*.pdf')
-pdf_path = pdf_files[0] if pdf_files else None
+from page_cache import find_pdf
+from parallel_extract import extract_pages
 
-if not pdf_path:
-    print("No PDF found!", file=sys.stderr)
-    sys.exit(1)
 
-try:
-    import PyPDF2
+def main():
+    pdf_path = find_pdf()
 
-    with open(pdf_path, 'rb') as file:
-        pdf = PyPDF2.PdfReader(file)
-        total_pages = len(pdf.pages)
-        print(f'Total pages: {total_pages}', file=sys.stderr)
+    if not pdf_path:
+        print("No PDF found!", file=sys.stderr)
+        sys.exit(1)
 
+    try:
         # Extract pages 1-80 which likely contain the intro and food sections
-        for i in range(min(80, total_pages)):
-            text = pdf.pages[i].extract_text()
+        text_by_page = extract_pages(pdf_path, 1, 80)
+
+        for page_num, text in text_by_page.items():
             if text:
                 print(f'\n{"="*80}')
-                print(f'PAGE {i+1}')
+                print(f'PAGE {page_num}')
                 print("="*80)
                 print(text[:4000])  # Limit each page to 4000 chars
 
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    try:
-        import pdfplumber
-
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            print(f'Total pages: {total_pages}', file=sys.stderr)
-
-            for i in range(min(80, total_pages)):
-                text = pdf.pages[i].extract_text()
-                if text:
-                    print(f'\n{"="*80}')
-                    print(f'PAGE {i+1}')
-                    print("="*80)
-                    print(text[:4000])
-
-    except ImportError:
-        print("Error: Neither PyPDF2 nor pdfplumber is installed", file=sys.stderr)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
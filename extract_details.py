@@ -1,11 +1,11 @@
 #!/usr/bin/env python3
-import PyPDF2
-import glob
 import re
 
+from page_cache import find_pdf
+from page_stream import stream_pages
+
 # Get PDF path
-pdf_files = glob.glob("*Cookbook*.pdf")
-pdf_path = [f for f in pdf_files if 'Cookbook' in f and not f.startswith('.')][0]
+pdf_path = find_pdf()
 
 # Items to extract with their key pages
 items = {
@@ -18,57 +18,50 @@ items = {
     'molasses': [378],
     'nutritional yeast': [21, 24, 32, 33],
     'mustard': [88, 153, 154, 186],
-    'tomato paste': list(range(40, 200)),  # Search broadly
-    'date sugar': list(range(1, 386)),  # Search entire book
-    'umeboshi': list(range(1, 386)),
-    'natto': list(range(1, 386)),
-    'dulse': list(range(1, 386)),
-    'wakame': list(range(1, 386)),
+    'tomato paste': range(40, 200),  # Search broadly
+    'date sugar': range(1, 386),  # Search entire book
+    'umeboshi': range(1, 386),
+    'natto': range(1, 386),
+    'dulse': range(1, 386),
+    'wakame': range(1, 386),
 }
 
-with open(pdf_path, 'rb') as file:
-    pdf_reader = PyPDF2.PdfReader(file)
-
-    for item_name, pages in items.items():
-        print(f"\n{'='*80}")
-        print(f"{item_name.upper()}")
-        print(f"{'='*80}")
+for item_name, pages in items.items():
+    print(f"\n{'='*80}")
+    print(f"{item_name.upper()}")
+    print(f"{'='*80}")
 
-        found_pages = []
-        contexts = []
+    found_pages = []
+    contexts = []
 
-        for page_num in pages[:50]:  # Limit to first 50 pages to search
-            try:
-                page = pdf_reader.pages[page_num - 1]
-                text = page.extract_text()
-                text_lower = text.lower()
+    # Pages are decoded lazily; stop as soon as 5 contexts are collected
+    for page_num, text in stream_pages(pdf_path, pages[:50], 'pypdf2'):  # Limit to first 50 pages to search
+        text_lower = text.lower()
 
-                if item_name.lower() in text_lower:
-                    if page_num not in found_pages:
-                        found_pages.append(page_num)
+        if item_name.lower() in text_lower:
+            if page_num not in found_pages:
+                found_pages.append(page_num)
 
-                        # Extract context
-                        lines = text.split('\n')
-                        for i, line in enumerate(lines):
-                            if item_name.lower() in line.lower():
-                                # Get surrounding lines
-                                start = max(0, i - 2)
-                                end = min(len(lines), i + 3)
-                                context = '\n'.join(lines[start:end])
-                                contexts.append((page_num, context))
-                                if len(contexts) >= 5:
-                                    break
+                # Extract context
+                lines = text.split('\n')
+                for i, line in enumerate(lines):
+                    if item_name.lower() in line.lower():
+                        # Get surrounding lines
+                        start = max(0, i - 2)
+                        end = min(len(lines), i + 3)
+                        context = '\n'.join(lines[start:end])
+                        contexts.append((page_num, context))
+                        if len(contexts) >= 5:
+                            break
 
-                if len(contexts) >= 5:
-                    break
-            except:
-                continue
+        if len(contexts) >= 5:
+            break
 
-        if found_pages:
-            print(f"Found on pages: {found_pages[:10]}")
-            print(f"\nContexts:")
-            for page_num, context in contexts[:5]:
-                print(f"\n--- Page {page_num} ---")
-                print(context[:500])
-        else:
-            print("Not found in searched pages")
+    if found_pages:
+        print(f"Found on pages: {found_pages[:10]}")
+        print(f"\nContexts:")
+        for page_num, context in contexts[:5]:
+            print(f"\n--- Page {page_num} ---")
+            print(context[:500])
+    else:
+        print("Not found in searched pages")
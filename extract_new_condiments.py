@@ -1,9 +1,8 @@
 #!/usr/bin/env python3
-import PyPDF2
-import glob
+from page_cache import find_pdf
+from page_stream import stream_pages
 
-pdf_files = glob.glob('*Cookbook*.pdf')
-pdf_path = [f for f in pdf_files if 'Cookbook' in f and not f.startswith('.')][0]
+pdf_path = find_pdf()
 
 # Items to extract with their pages
 items_to_extract = {
@@ -17,36 +16,26 @@ items_to_extract = {
     'kombu': [341, 342, 343],
 }
 
-with open(pdf_path, 'rb') as file:
-    reader = PyPDF2.PdfReader(file)
-
-    for item, pages in items_to_extract.items():
-        print(f"\n{'='*80}")
-        print(f"{item.upper()}")
-        print(f"{'='*80}\n")
-
-        contexts = []
-        for page_num in pages[:8]:
-            try:
-                page = reader.pages[page_num - 1]
-                text = page.extract_text()
-
-                # Find lines containing the item
-                lines = text.split('\n')
-                for i, line in enumerate(lines):
-                    if item.lower() in line.lower():
-                        # Get context
-                        start = max(0, i - 1)
-                        end = min(len(lines), i + 2)
-                        context = '\n'.join(lines[start:end])
-                        print(f"Page {page_num}:")
-                        print(context)
-                        print()
-                        contexts.append(page_num)
-                        break
-
-            except Exception as e:
-                print(f"Error on page {page_num}: {e}")
-
-        print(f"Total pages found: {contexts}")
-        print()
+for item, pages in items_to_extract.items():
+    print(f"\n{'='*80}")
+    print(f"{item.upper()}")
+    print(f"{'='*80}\n")
+
+    contexts = []
+    for page_num, text in stream_pages(pdf_path, pages[:8], 'pypdf2'):
+        # Find lines containing the item
+        lines = text.split('\n')
+        for i, line in enumerate(lines):
+            if item.lower() in line.lower():
+                # Get context
+                start = max(0, i - 1)
+                end = min(len(lines), i + 2)
+                context = '\n'.join(lines[start:end])
+                print(f"Page {page_num}:")
+                print(context)
+                print()
+                contexts.append(page_num)
+                break
+
+    print(f"Total pages found: {contexts}")
+    print()
@@ -1,10 +1,9 @@
-import PyPDF2
 import sys
-import glob
 
-pdf_files = glob.glob('/Users/dragan/Documents/how-not-to-diet/*.pdf')
-pdf_files = [f for f in pdf_files if not f.endswith('.pdf') or 'Anna' in f]
-pdf_path = pdf_files[0] if pdf_files else None
+from page_cache import find_pdf
+from page_stream import PageStream
+
+pdf_path = find_pdf()
 
 if not pdf_path:
     print("No PDF found!", file=sys.stderr)
@@ -13,17 +12,13 @@ if not pdf_path:
 print(f"Using PDF: {pdf_path}", file=sys.stderr)
 
 try:
-    with open(pdf_path, 'rb') as file:
-        reader = PyPDF2.PdfReader(file)
-        print(f'Total pages: {len(reader.pages)}')
+    # Extract pages 187-230
+    stream = PageStream(pdf_path, pages=range(187, 231), backend='pypdf2')
+    print(f'Total pages: {stream.page_count}')
 
-        # Extract pages 187-230 (0-indexed: 186-229)
-        for page_num in range(186, 230):
-            if page_num < len(reader.pages):
-                page = reader.pages[page_num]
-                text = page.extract_text()
-                print(f'\n=== PAGE {page_num + 1} ===')
-                print(text)
+    for page_num, text in stream:
+        print(f'\n=== PAGE {page_num} ===')
+        print(text)
 except Exception as e:
     print(f'Error: {e}')
     sys.exit(1)
@@ -1,54 +1,32 @@
 #!/usr/bin/env python3
 import sys
-import glob
 
-pdf_files = glob.glob('/Users/dragan/Documents/how-not-to-diet/*.pdf')
-pdf_path = pdf_files[0] if pdf_files else None
+from page_cache import find_pdf
+from parallel_extract import extract_pages
 
-if not pdf_path:
-    print("No PDF found!", file=sys.stderr)
-    sys.exit(1)
 
-try:
-    import PyPDF2
+def main():
+    pdf_path = find_pdf()
 
-    with open(pdf_path, 'rb') as file:
-        pdf = PyPDF2.PdfReader(file)
-        total_pages = len(pdf.pages)
-        print(f'Total pages: {total_pages}', file=sys.stderr)
+    if not pdf_path:
+        print("No PDF found!", file=sys.stderr)
+        sys.exit(1)
 
+    try:
         # Extract pages 271-320
-        start_page = 270  # 0-indexed, so page 271 is index 270
-        end_page = min(320, total_pages)
+        text_by_page = extract_pages(pdf_path, 271, 320)
 
-        for i in range(start_page, end_page):
-            text = pdf.pages[i].extract_text()
+        for page_num, text in text_by_page.items():
             if text:
                 print(f'\n{"="*80}')
-                print(f'PAGE {i+1}')
+                print(f'PAGE {page_num}')
                 print("="*80)
                 print(text)
 
-except Exception as e:
-    print(f"Error with PyPDF2: {e}", file=sys.stderr)
-    try:
-        import pdfplumber
-
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            print(f'Total pages: {total_pages}', file=sys.stderr)
-
-            start_page = 270
-            end_page = min(320, total_pages)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-            for i in range(start_page, end_page):
-                text = pdf.pages[i].extract_text()
-                if text:
-                    print(f'\n{"="*80}')
-                    print(f'PAGE {i+1}')
-                    print("="*80)
-                    print(text)
 
-    except ImportError:
-        print("Error: Neither PyPDF2 nor pdfplumber is installed", file=sys.stderr)
-        sys.exit(1)
+if __name__ == '__main__':
+    main()
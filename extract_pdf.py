@@ -1,41 +1,26 @@
 #!/usr/bin/env python3
 import sys
 
-import glob
-pdf_files = glob.glob('/Users/dragan/Documents/how-not-to-diet/*.pdf')
-pdf_path = pdf_files[0] if pdf_files else None
+from page_cache import find_pdf
+from page_stream import PageStream
+from section_map import section_pages
+
+pdf_path = find_pdf()
 
 if not pdf_path:
     print("No PDF found!", file=sys.stderr)
     sys.exit(1)
 
 try:
-    import PyPDF2
-
-    with open(pdf_path, 'rb') as file:
-        pdf = PyPDF2.PdfReader(file)
-        print(f'Total pages: {len(pdf.pages)}', file=sys.stderr)
-
-        # Extract first 80 pages to find the sections
-        for i in range(min(80, len(pdf.pages))):
-            text = pdf.pages[i].extract_text()
-            if text and ('low glycemic' in text.lower() or 'calorie density' in text.lower() or 'ingredients for the ideal' in text.lower()):
-                print(f'\n=== PAGE {i+1} ===')
-                print(text[:3000])
+    # The diet-building sections are in the introduction and the Daily Dozen chapter
+    stream = PageStream(pdf_path, pages=section_pages('introduction', 'daily dozen', pdf_path=pdf_path))
+    print(f'Total pages: {stream.page_count}', file=sys.stderr)
 
-except ImportError:
-    try:
-        import pdfplumber
+    for page_num, text in stream:
+        if text and ('low glycemic' in text.lower() or 'calorie density' in text.lower() or 'ingredients for the ideal' in text.lower()):
+            print(f'\n=== PAGE {page_num} ===')
+            print(text[:3000])
 
-        with pdfplumber.open(pdf_path) as pdf:
-            print(f'Total pages: {len(pdf.pages)}', file=sys.stderr)
-
-            for i in range(min(80, len(pdf.pages))):
-                text = pdf.pages[i].extract_text()
-                if text and ('low glycemic' in text.lower() or 'calorie density' in text.lower() or 'ingredients for the ideal' in text.lower()):
-                    print(f'\n=== PAGE {i+1} ===')
-                    print(text[:3000])
-
-    except ImportError:
-        print("Error: Neither PyPDF2 nor pdfplumber is installed", file=sys.stderr)
-        sys.exit(1)
+except ImportError as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
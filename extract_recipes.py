@@ -1,12 +1,10 @@
 #!/usr/bin/env python3
 """Extract recipes from pages 201-270 of the cookbook PDF."""
 
-import PyPDF2
-import json
-import os
-import re
 from pathlib import Path
 
+from page_cache import PageCache
+
 def extract_text_from_pdf(pdf_path, start_page, end_page):
     """Extract text from specified page range."""
     text_by_page = {}
@@ -14,14 +12,10 @@ def extract_text_from_pdf(pdf_path, start_page, end_page):
     # Use Path to handle special characters
     pdf_path = Path(pdf_path)
 
-    with open(pdf_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
-        
-        # Pages are 0-indexed in PyPDF2
-        for page_num in range(start_page - 1, min(end_page, len(pdf_reader.pages))):
-            page = pdf_reader.pages[page_num]
-            text = page.extract_text()
-            text_by_page[page_num + 1] = text
+    with PageCache(pdf_path, 'pypdf2') as cache:
+        # Cache pages are 0-indexed like PyPDF2
+        for page_num in range(start_page - 1, min(end_page, cache.page_count())):
+            text_by_page[page_num + 1] = cache.text(page_num)
     
     return text_by_page
 
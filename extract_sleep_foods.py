@@ -1,31 +1,31 @@
-import PyPDF2
-import re
 import sys
 
-pdf_path = "/Users/dragan/Documents/how-not-to-diet/cookbook.pdf"
+from multi_term import Automaton, scan_pages
+from page_cache import find_pdf
+from page_stream import stream_pages
 
-try:
-    with open(pdf_path, 'rb') as file:
-        pdf_reader = PyPDF2.PdfReader(file)
+pdf_path = find_pdf()
 
-        # Search pages 15-35 for sleep-related content
-        sleep_keywords = ['sleep', 'melatonin', 'circadian', 'cherry', 'cherries',
-                         'kiwi', 'chamomile', 'passionflower', 'valerian',
-                         'banana', 'lavender', 'tryptophan', 'serotonin']
+if not pdf_path:
+    print("No PDF found!", file=sys.stderr)
+    sys.exit(1)
 
-        for page_num in range(15, min(40, len(pdf_reader.pages))):
-            page = pdf_reader.pages[page_num]
-            text = page.extract_text()
+try:
+    # Search pages 16-40 for sleep-related content
+    sleep_keywords = ['sleep', 'melatonin', 'circadian', 'cherry', 'cherries',
+                     'kiwi', 'chamomile', 'passionflower', 'valerian',
+                     'banana', 'lavender', 'tryptophan', 'serotonin']
 
-            # Look for sleep-related keywords
-            text_lower = text.lower()
-            found_keywords = [kw for kw in sleep_keywords if kw in text_lower]
+    automaton = Automaton(sleep_keywords)
+    pages = stream_pages(pdf_path, range(16, 41), 'pypdf2')
 
-            if found_keywords:
-                print(f"\n{'='*80}")
-                print(f"PAGE {page_num + 1} - Found: {', '.join(found_keywords)}")
-                print(f"{'='*80}")
-                print(text)
+    # Look for sleep-related keywords
+    for page_num, text, found in scan_pages(pages, automaton):
+        found_keywords = [kw for kw in sleep_keywords if kw in found]
+        print(f"\n{'='*80}")
+        print(f"PAGE {page_num} - Found: {', '.join(found_keywords)}")
+        print(f"{'='*80}")
+        print(text)
 
 except Exception as e:
     print(f"Error: {e}")
@@ -5,11 +5,14 @@ Target foods: hazelnuts, pecans, brazil nuts, hemp seeds, sunflower seeds, poppy
               eggplant/aubergine, leeks, shallots, artichokes, swiss chard, endive, radicchio
 """
 import sys
-import glob
+
+from multi_term import Automaton, scan_pages
+from page_cache import find_pdf
+from page_stream import DEFAULT_MAX_RSS_MB, PageStream
+from pdf_backend import default_backend
 
 # Find PDF file
-pdf_files = glob.glob('/Users/dragan/Documents/how-not-to-diet/*.pdf')
-pdf_path = pdf_files[0] if pdf_files else None
+pdf_path = find_pdf()
 
 if not pdf_path:
     print("No PDF found!", file=sys.stderr)
@@ -33,56 +36,18 @@ target_foods = [
 ]
 
 try:
-    import pdfplumber
-
-    with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
-        print(f'Total pages: {total_pages}', file=sys.stderr)
-
-        for i in range(total_pages):
-            text = pdf.pages[i].extract_text()
-            if not text:
-                continue
-
-            text_lower = text.lower()
-
-            # Check if any target food is mentioned
-            found_foods = []
-            for food in target_foods:
-                if food in text_lower:
-                    found_foods.append(food)
+    automaton = Automaton(target_foods)
 
-            if found_foods:
-                print(f'\n{"="*80}')
-                print(f'PAGE {i+1} - Found: {", ".join(set(found_foods))}')
-                print("="*80)
-                print(text)
+    stream = PageStream(pdf_path, backend=default_backend(prefer=('pdfplumber', 'pypdf2')),
+                        max_rss_mb=DEFAULT_MAX_RSS_MB)
+    print(f'Total pages: {stream.page_count}', file=sys.stderr)
 
-except ImportError:
-    try:
-        import PyPDF2
+    for page_num, text, found in scan_pages(stream, automaton):
+        print(f'\n{"="*80}')
+        print(f'PAGE {page_num} - Found: {", ".join(found)}')
+        print("="*80)
+        print(text)
 
-        with open(pdf_path, 'rb') as file:
-            pdf = PyPDF2.PdfReader(file)
-            total_pages = len(pdf.pages)
-            print(f'Total pages: {total_pages}', file=sys.stderr)
-
-            for i in range(total_pages):
-                text = pdf.pages[i].extract_text()
-                text_lower = text.lower()
-
-                # Check if any target food is mentioned
-                found_foods = []
-                for food in target_foods:
-                    if food in text_lower:
-                        found_foods.append(food)
-
-                if found_foods:
-                    print(f'\n{"="*80}')
-                    print(f'PAGE {i+1} - Found: {", ".join(set(found_foods))}')
-                    print("="*80)
-                    print(text)
-
-    except ImportError:
-        print("Error: Neither PyPDF2 nor pdfplumber is installed", file=sys.stderr)
-        sys.exit(1)
+except ImportError as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Single compiled food matcher for recipe and ingredient text.
+
+extract_all_recipes_120_200.extract_ingredients() re-sorted FOOD_KEYWORDS on
+every call and tested `keyword in text` for each keyword;
+parse_recipes_201_270.match_ingredients_to_foods() looped over its mapping
+table for every line. Both matched inside words ('pea' in 'peanut', 'beet' in
+'beetroot', 'rye' in 'dryer'). The matcher here is built once from
+
+    PHRASES               below ('garlic cloves' is garlic, not cloves)
+    alias index           every alias generated from data/foods plus the
+                          FOOD_KEYWORDS / INGREDIENT_MAPPINGS tables, each
+                          resolved to one food ID (alias_index.py)
+
+into one character trie (each term in its singular and plural spellings:
+'tomato'/'tomatoes', 'berry'/'berries') compiled to a single regex between
+word boundaries. A text is scanned once, left to right; at each position the
+longest term starting there wins and the scan resumes after it
+(leftmost-longest), so 'apple cider vinegar' beats 'vinegar' and matches
+never start or end inside a word.
+
+When PHRASES and the alias index disagree on a term, PHRASES wins.
+
+matcher_fingerprint() hashes PHRASES, TOKEN_RE and MATCHER_VERSION. Caches of
+matcher output (match_memo.py, synergy_graph.py, the recipe build manifest)
+store it beside the alias index hash, so editing PHRASES or the matching code
+(bump MATCHER_VERSION for fold() / surface_forms() / scan changes) discards
+them just as an alias change does.
+
+Usage:
+    from food_matcher import default_matcher
+
+    matcher = default_matcher()
+    matcher.foods('2 tablespoons unsalted peanut butter')   # ['peanuts']
+    matcher.match(text)     # [Match(start, end, term, food_id), ...]
+
+    python food_matcher.py "1 1/2 cups cooked chickpeas"
+    python food_matcher.py --benchmark     # vs the old per-keyword scans
+"""
+import hashlib
+import json
+import re
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# === CONFIGURATION ===
+TOKEN_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+# Phrases that must win over a shorter food name inside them ('cloves' in 'garlic cloves')
+PHRASES = {'garlic clove': 'garlic', 'garlic cloves': 'garlic'}
+# Bump when a change to the matching code alters what a text matches
+MATCHER_VERSION = 1
+
+_END = ''  # trie key marking "a term ends here"
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
+    term: str
+    food_id: str
+
+
+@lru_cache(maxsize=65536)
+def fold(token: str) -> str:
+    """Singular form of a lowercase token, good enough to compare both sides."""
+    if len(token) <= 3 or token.endswith(('ss', 'us', 'is')):
+        return token
+    if token.endswith('ies'):
+        return token[:-3] + 'y'
+    if token.endswith(('oes', 'ches', 'shes', 'xes', 'sses')):
+        return token[:-2]
+    if token.endswith('s'):
+        return token[:-1]
+    return token
+
+
+def tokens(text: str) -> List[Tuple[str, int, int]]:
+    """(folded token, start, end) for every word in `text`."""
+    return [(fold(m.group()), m.start(), m.end()) for m in TOKEN_RE.finditer(text.lower())]
+
+
+def surface_forms(term: str) -> List[str]:
+    """Spellings of a term as it may appear in text: singular and plural last word."""
+    words = [w for w, _, _ in _words(term)]
+    head, last = words[:-1], words[-1]
+    stem = fold(last)
+    forms = {last, stem, stem + 's', stem + 'es'}
+    if stem.endswith('y'):
+        forms.add(stem[:-1] + 'ies')
+    if stem.endswith('i'):
+        forms.add(stem + 'es')  # chilli -> chillies
+    return [' '.join(head + [form]) for form in sorted(forms)]
+
+
+def _words(text: str) -> List[Tuple[str, int, int]]:
+    return [(m.group(), m.start(), m.end()) for m in TOKEN_RE.finditer(text.lower())]
+
+
+def _trie_pattern(node: Dict) -> str:
+    """Regex for a character trie; optional tails are greedy, so longer terms are tried first."""
+    branches = []
+    for ch, child in sorted((k, v) for k, v in node.items() if k != _END):
+        # One space in a term stands for any run of spaces/hyphens in the text
+        branches.append((r'[\s-]+' if ch == ' ' else re.escape(ch)) + _trie_pattern(child))
+    if not branches:
+        return ''
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if _END in node:
+        body = f'(?:{body})?' if len(branches) == 1 else body + '?'
+    return body
+
+
+class FoodMatcher:
+    """Food terms compiled into one word-bounded trie regex; leftmost-longest matching."""
+
+    def __init__(self, tables: Iterable[Iterable[Tuple[str, str]]], known_ids: Optional[Iterable[str]] = None):
+        known = set(known_ids) if known_ids is not None else None
+        # Folded term -> (term, candidate food IDs in table order)
+        candidates: Dict[Tuple[str, ...], Tuple[str, List[str]]] = {}
+        for table in tables:
+            for term, food_id in table:
+                key = tuple(token for token, _, _ in tokens(term))
+                if key:
+                    entry = candidates.setdefault(key, (term.lower(), []))
+                    if food_id not in entry[1]:
+                        entry[1].append(food_id)
+
+        self.terms: Dict[str, str] = {}
+        # Surface form ("black eyed beans") -> (term, food ID); earlier tables win
+        self._by_form: Dict[str, Tuple[str, str]] = {}
+        trie: Dict = {}
+        for term, ids in candidates.values():
+            known_ids_for_term = [i for i in ids if known is None or i in known]
+            food_id = (known_ids_for_term or ids)[0]
+            self.terms[term] = food_id
+            for form in surface_forms(term):
+                self._by_form.setdefault(form, (term, food_id))
+                node = trie
+                for ch in form:
+                    node = node.setdefault(ch, {})
+                node[_END] = True
+
+        # The regex engine walks the trie in C: at each position it follows
+        # the one branch matching the next character, as far as it goes
+        self._pattern = re.compile(r'\b(?:' + _trie_pattern(trie) + r')\b') if trie else None
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def match(self, text: str) -> List[Match]:
+        """Leftmost-longest, non-overlapping, word-bounded matches in `text`."""
+        if self._pattern is None:
+            return []
+        by_form = self._by_form
+        matches = []
+        for m in self._pattern.finditer(text.lower()):
+            term, food_id = by_form[' '.join(TOKEN_RE.findall(m.group()))]
+            matches.append(Match(m.start(), m.end(), term, food_id))
+        return matches
+
+    def foods(self, text: str) -> List[str]:
+        """Food IDs mentioned in `text`, in order of first mention."""
+        return list(dict.fromkeys(m.food_id for m in self.match(text)))
+
+
+@lru_cache(maxsize=1)
+def matcher_fingerprint() -> str:
+    """Hash of everything besides the alias index that decides a match."""
+    source = json.dumps([MATCHER_VERSION, TOKEN_RE.pattern, sorted(PHRASES.items())])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+def build_matcher(rebuild: bool = False) -> FoodMatcher:
+    """Matcher over PHRASES and the generated alias index (see alias_index.py)."""
+    from alias_index import load_alias_index
+
+    index = load_alias_index(rebuild)
+    return FoodMatcher([PHRASES.items(), index.aliases.items()], index.food_ids)
+
+
+@lru_cache(maxsize=1)
+def default_matcher() -> FoodMatcher:
+    """The matcher over the repo's tables and data/foods, built once per process."""
+    return build_matcher()
+
+
+def legacy_keyword_scan(text: str, keywords: Dict[str, str]) -> List[str]:
+    """The original extract_ingredients(): sort, then `in` per keyword."""
+    found = set()
+    text_lower = text.lower()
+    for keyword, food_id in sorted(keywords.items(), key=lambda x: -len(x[0])):
+        if keyword in text_lower:
+            found.add(food_id)
+    return sorted(found)
+
+
+def legacy_mapping_scan(text: str, mappings: Dict[str, str]) -> List[str]:
+    """The original match_ingredients_to_foods(): `in` per mapping."""
+    text_lower = text.lower()
+    return list(dict.fromkeys(food_id for key, food_id in mappings.items() if key in text_lower))
+
+
+def benchmark(texts: List[str], lines: List[str], repeat: int = 3) -> Dict[str, float]:
+    """Best-of-`repeat` seconds: matcher vs the old scans on recipe texts and ingredient lines."""
+    from curated_aliases import FOOD_KEYWORDS, INGREDIENT_MAPPINGS
+
+    start = time.perf_counter()
+    matcher = build_matcher()
+    build_seconds = time.perf_counter() - start
+
+    def best(fn, items):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for item in items:
+                fn(item)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    return {
+        'build': build_seconds,
+        'recipes: keyword scan': best(lambda t: legacy_keyword_scan(t, FOOD_KEYWORDS), texts),
+        'recipes: matcher': best(matcher.foods, texts),
+        'lines: mapping scan': best(lambda t: legacy_mapping_scan(t, INGREDIENT_MAPPINGS), lines),
+        'lines: matcher': best(matcher.foods, lines),
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Match food names in text (word-bounded, longest first)')
+    parser.add_argument('texts', nargs='*', help='text to match')
+    parser.add_argument('--benchmark', action='store_true', help='compare with the old keyword/mapping scans')
+    args = parser.parse_args(argv)
+
+    matcher = default_matcher()
+    for text in args.texts:
+        for m in matcher.match(text):
+            print(f'{m.start:4d}-{m.end:<4d} {text[m.start:m.end]!r:30s} -> {m.food_id}')
+
+    if not args.benchmark:
+        if not args.texts:
+            parser.print_help()
+        return
+
+    from curated_aliases import FOOD_KEYWORDS
+    from recipe_segmenter import segment_book
+
+    recipes = list(segment_book())
+    texts = [r.text for r in recipes]
+    lines = [line for r in recipes for line in r.ingredients]
+    print(f'{len(matcher)} terms; {len(texts)} recipe texts, {len(lines)} ingredient lines')
+    for name, seconds in benchmark(texts, lines).items():
+        print(f'  {name:22s} {seconds * 1000:8.1f} ms')
+
+    # Substring hits the word-bounded matcher no longer reports
+    dropped: Dict[str, int] = {}
+    for text in texts:
+        matched = {m.term for m in matcher.match(text)}
+        text_lower = text.lower()
+        for keyword in FOOD_KEYWORDS:
+            if keyword in text_lower and not any(keyword in term for term in matched) \
+                    and not re.search(rf'\b{re.escape(keyword)}', text_lower):
+                dropped[keyword] = dropped.get(keyword, 0) + 1
+    if dropped:
+        print('in-word keyword hits dropped: ' + ', '.join(f'{k} x{v}' for k, v in sorted(dropped.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Shared in-memory food database.
+
+Six places loaded data/foods/*.json from scratch, each into its own shape:
+load_foods() and load_foods_db() in the two recipe scripts,
+manual_recipe_extract.load_foods(), get_existing_foods() in
+analyze_final_section.py and extract_final_section.py, and the loop at the
+top of identify_new_foods.py. They all read from here now.
+
+Each food is one slotted Food record. Category, synergy, conflict and
+timing strings are interned, so the ~200 foods share one copy of 'greens'
+or 'anti-inflammatory', and the lists are tuples. A Food also answers
+food['name'] / food.get('categories', []) like the JSON dict it replaces, so
+callers did not need rewriting.
+
+The loaded store is pickled to .cache/index/foods.pickle together with each
+file's mtime and size. On the next load, a stat() per file decides reuse:
+unchanged files keep their pickled record, and only new or edited files
+are opened and parsed. Loading takes milliseconds instead of 209
+open + json.load calls.
+
+Lookups are O(1): by food ID (file stem), by display name, or by any alias
+in the alias index (plurals, UK/US names - see alias_index.py).
+
+Usage:
+    from food_store import load_food_store
+
+    store = load_food_store()
+    store['almonds'].categories         # ('high-fiber', 'anti-inflammatory', ...)
+    store.by_name('Almonds')            # Food(id='almonds', ...)
+    store.lookup('garbanzo beans')      # Food(id='chickpeas', ...) via the alias index
+
+    python food_store.py stats [--rebuild]
+    python food_store.py show almonds
+"""
+import json
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from page_cache import BASE_DIR, _atomic_pickle
+from page_store import STORE_DIR
+
+# === CONFIGURATION ===
+FOODS_DIR = BASE_DIR / 'data' / 'foods'
+SNAPSHOT_FILE = STORE_DIR / 'foods.pickle'
+SNAPSHOT_VERSION = 1
+
+# JSON list fields whose strings repeat across foods
+INTERNED_FIELDS = ('categories', 'synergies', 'conflicts', 'timing')
+
+
+class Food:
+    """One food file as a slotted record; also readable like the original dict."""
+
+    __slots__ = ('id', 'number', 'name', 'categories', 'properties', 'benefits',
+                 'synergies', 'conflicts', 'timing', 'amount', 'sources')
+
+    # JSON key -> slot, where they differ ("id" in the file is the serial "food-2")
+    _SLOT_FOR_KEY = {'id': 'number'}
+
+    def __init__(self, food_id: str, data: Dict):
+        self.id = food_id
+        self.number = data.get('id', '')
+        self.name = data.get('name', '')
+        for field in INTERNED_FIELDS:
+            setattr(self, field, tuple(sys.intern(v) for v in data.get(field, ()) if isinstance(v, str)))
+        self.properties = tuple(data.get('properties', ()))
+        self.benefits = data.get('benefits', '')
+        self.amount = data.get('amount', '')
+        self.sources = data.get('sources', {})
+
+    def __repr__(self) -> str:
+        return f'Food(id={self.id!r}, name={self.name!r})'
+
+    # Dict-style access, for code written against the raw JSON
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, self._SLOT_FOR_KEY.get(key, key))
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: str) -> bool:
+        return self._SLOT_FOR_KEY.get(key, key) in self.__slots__
+
+    def to_dict(self) -> Dict:
+        """The record as its JSON file shape."""
+        return {'id': self.number, 'name': self.name, 'categories': list(self.categories),
+                'properties': list(self.properties), 'benefits': self.benefits,
+                'synergies': list(self.synergies), 'conflicts': list(self.conflicts),
+                'timing': list(self.timing), 'amount': self.amount, 'sources': self.sources}
+
+    # __slots__ classes without __dict__ pickle through these
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+
+class FoodStore:
+    """All foods, keyed by ID, with name and alias lookup tables."""
+
+    def __init__(self, foods: Dict[str, Food]):
+        self.foods = foods
+        self._names = {food.name.lower(): food_id for food_id, food in foods.items() if food.name}
+
+    def __len__(self) -> int:
+        return len(self.foods)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.foods)
+
+    def __contains__(self, food_id: str) -> bool:
+        return food_id in self.foods
+
+    def __getitem__(self, food_id: str) -> Food:
+        return self.foods[food_id]
+
+    def get(self, food_id: str, default=None) -> Optional[Food]:
+        return self.foods.get(food_id, default)
+
+    def items(self):
+        return self.foods.items()
+
+    def values(self):
+        return self.foods.values()
+
+    def by_name(self, name: str) -> Optional[Food]:
+        """Food whose display name is `name` (case-insensitive)."""
+        food_id = self._names.get(name.strip().lower())
+        return self.foods[food_id] if food_id else None
+
+    def lookup(self, text: str) -> Optional[Food]:
+        """Food for an ID, display name or alias."""
+        from alias_index import load_alias_index
+
+        food = self.foods.get(text) or self.by_name(text)
+        if food is None:
+            food_id = load_alias_index().lookup(text)
+            food = self.foods.get(food_id) if food_id else None
+        return food
+
+    def names(self) -> List[str]:
+        """Lowercase display names and ID-derived names ('black eyed peas'), as the old scripts built them."""
+        names = set(self._names)
+        names.update(food_id.replace('-', ' ') for food_id in self.foods)
+        return sorted(names)
+
+
+def _read_snapshot(snapshot_file: Path) -> Dict:
+    try:
+        with open(snapshot_file, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return {}
+    return snapshot if snapshot.get('version') == SNAPSHOT_VERSION else {}
+
+
+def build_food_store(rebuild: bool = False, foods_dir: Path = FOODS_DIR,
+                     snapshot_file: Path = SNAPSHOT_FILE) -> FoodStore:
+    """Load every food, reusing snapshot records whose file mtime and size are unchanged."""
+    snapshot = {} if rebuild else _read_snapshot(snapshot_file)
+    old_stamps: Dict[str, Tuple[int, int]] = snapshot.get('stamps', {})
+    old_foods: Dict[str, Food] = snapshot.get('foods', {})
+
+    stamps, foods = {}, {}
+    parsed = 0
+    # scandir: one directory read, and stat() without building Path objects
+    for entry in sorted(os.scandir(foods_dir), key=lambda e: e.name):
+        if not entry.name.endswith('.json'):
+            continue
+        stat = entry.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        food_id = entry.name[:-5]
+        stamps[food_id] = stamp
+        if old_stamps.get(food_id) == stamp and food_id in old_foods:
+            foods[food_id] = old_foods[food_id]
+            continue
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                foods[food_id] = Food(food_id, json.load(f))
+        except (OSError, ValueError) as e:
+            print(f'food store: skipping {entry.name}: {e}', file=sys.stderr)
+            continue
+        parsed += 1
+
+    if parsed or stamps.keys() != old_stamps.keys():
+        snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_pickle(snapshot_file, {'version': SNAPSHOT_VERSION, 'stamps': stamps, 'foods': foods})
+        removed = len(old_stamps.keys() - stamps.keys())
+        print(f'food store: {parsed} food files parsed, {removed} removed, '
+              f'{len(foods)} foods -> {snapshot_file}', file=sys.stderr)
+    return FoodStore(foods)
+
+
+_loaded: Optional[FoodStore] = None
+
+
+def load_food_store(rebuild: bool = False) -> FoodStore:
+    """The food store, checked against data/foods once per process."""
+    global _loaded
+    if _loaded is None or rebuild:
+        _loaded = build_food_store(rebuild)
+    return _loaded
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Shared food database with a pickled snapshot')
+    sub = parser.add_subparsers(dest='command', required=True)
+    stats = sub.add_parser('stats', help='load the store and report timings')
+    stats.add_argument('--rebuild', action='store_true', help='ignore the snapshot')
+    show = sub.add_parser('show', help='print one food')
+    show.add_argument('food', help='food ID, name or alias')
+    args = parser.parse_args(argv)
+
+    if args.command == 'show':
+        food = load_food_store().lookup(args.food)
+        if food is None:
+            print(f'no food for {args.food!r}')
+            return 1
+        print(json.dumps({'food_id': food.id, **food.to_dict()}, indent=2, ensure_ascii=False))
+        return 0
+
+    store = build_food_store(args.rebuild)
+
+    def best(fn, repeat=3):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    def raw_load():
+        for food_file in sorted(FOODS_DIR.glob('*.json')):
+            with open(food_file, 'r', encoding='utf-8') as f:
+                json.load(f)
+
+    loaded, raw = best(build_food_store), best(raw_load)
+
+    categories = {c for food in store.values() for c in food.categories}
+    synergies = {s for food in store.values() for s in food.synergies}
+    size = SNAPSHOT_FILE.stat().st_size if SNAPSHOT_FILE.exists() else 0
+    print(f'{len(store)} foods, {len(categories)} distinct categories, {len(synergies)} distinct synergies')
+    print(f'store load {loaded * 1000:.1f} ms vs {raw * 1000:.1f} ms for open + json.load of every file')
+    print(f'snapshot {size / 1024:.0f} KB at {SNAPSHOT_FILE}')
+    return 0
+
+
+if __name__ == '__main__':
+    # Run through the importable module so the snapshot pickles food_store.Food, not __main__.Food
+    import food_store
+    sys.exit(food_store.main())
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Trigram fuzzy matcher over the food alias index.
+
+Ingredient lines the food matcher finds nothing in were dropped silently, and
+identify_new_foods.py compared each candidate against every existing name
+with `candidate in existing or existing in candidate` - O(N x M), and blind
+to near-spellings ('chilies', 'garbanzos', 'tumeric'). Here every alias in
+the alias index is split into character trigrams ("  kale " -> '  k', ' ka',
+'kal', 'ale', 'le ') with an inverted list per trigram. A query touches only
+the lists of its own trigrams, so top-k is a few dictionary lookups and
+counter updates - well under a millisecond for the ~500 aliases.
+
+Score is the Dice coefficient of the two trigram sets (1.0 = same string).
+For ingredient lines the item is taken from ingredient_grammar and every
+run of up to MAX_WINDOW words is scored, so 'smooth unsalted natural peanut
+butter' still finds 'peanut butter'. A window must cover at least
+MIN_COVERAGE of the item's words (DESCRIPTORS such as 'smooth' or
+'unsalted' not counted): otherwise one word of a longer item scores 1.0
+on its own, and 'pomegranate molasses' became treacle, 'black garlic'
+garlic. REGRESSION_CASES pins these down (python fuzzy_match.py --check).
+
+Usage:
+    from fuzzy_match import load_trigram_index
+
+    index = load_trigram_index()
+    index.top_k('tumeric')          # [Candidate(food_id='turmeric', alias='turmeric', score=0.706), ...]
+
+    python fuzzy_match.py "garbanzos" "tumeric" [-k 5]
+    python fuzzy_match.py --unmatched [--threshold 0.65]  # rank unmatched corpus lines
+    python fuzzy_match.py --check                         # REGRESSION_CASES
+"""
+import math
+import sys
+import time
+from array import array
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from alias_index import normalize_alias
+
+# === CONFIGURATION ===
+# Best window score at or above this: the line names a food we have under another spelling.
+# 'black garlic' scores 0.6 against 'garlic' as a whole; 'garbanzos' 0.67 against 'garbanzo bean'
+ALIAS_THRESHOLD = 0.65
+MAX_WINDOW = 4
+# Share of an item's words (descriptors aside) a scored window has to cover
+MIN_COVERAGE = 0.6
+DEFAULT_K = 5
+
+# Words that qualify a food without naming it; not counted towards coverage
+DESCRIPTORS = frozenset((
+    'smooth', 'crunchy', 'unsalted', 'unsweetened', 'natural', 'organic', 'plain', 'fresh', 'ripe',
+    'large', 'small', 'medium', 'low', 'reduced', 'sodium', 'fat',
+))
+
+# (item, expected food ID or None for "new food") at ALIAS_THRESHOLD
+REGRESSION_CASES = (
+    ('pomegranate molasses', None),
+    ('black garlic', None),
+    ('tumeric', 'turmeric'),
+    ('garbanzos', 'chickpeas'),
+    ('smooth unsalted natural peanut butter', 'peanuts'),
+    ('low-sodium vegetable broth', 'vegetable-broth'),
+    ('nutritional yeast flakes', 'nutritional-yeast'),
+)
+
+
+class Candidate(NamedTuple):
+    food_id: str
+    alias: str
+    score: float
+
+
+def trigrams(text: str) -> List[str]:
+    """Distinct character trigrams of a normalized string, padded at word edges."""
+    padded = f'  {text} '
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class TrigramIndex:
+    """Inverted trigram lists over a fixed {alias: food_id} table."""
+
+    def __init__(self, aliases: Dict[str, str]):
+        self.aliases = list(aliases)
+        self.food_ids = [aliases[a] for a in self.aliases]
+        self.sizes = array('H')
+        postings: Dict[str, List[int]] = {}
+        for i, alias in enumerate(self.aliases):
+            grams = trigrams(alias)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: array('I', ids) for gram, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.aliases)
+
+    def scores(self, text: str) -> Dict[int, float]:
+        """{alias index: Dice score} for every alias sharing a trigram with `text`."""
+        grams = trigrams(normalize_alias(text))
+        if not grams:
+            return {}
+        shared: Dict[int, int] = {}
+        get = self.postings.get
+        for gram in grams:
+            for i in get(gram, ()):
+                shared[i] = shared.get(i, 0) + 1
+        n, sizes = len(grams), self.sizes
+        return {i: 2 * count / (n + sizes[i]) for i, count in shared.items()}
+
+    def top_k(self, text: str, k: int = DEFAULT_K) -> List[Candidate]:
+        """The k best foods for `text` (best alias per food), highest score first."""
+        best: Dict[str, Tuple[float, int]] = {}
+        for i, score in self.scores(text).items():
+            food_id = self.food_ids[i]
+            if food_id not in best or score > best[food_id][0]:
+                best[food_id] = (score, i)
+        ranked = sorted(best.items(), key=lambda item: (-item[1][0], self.aliases[item[1][1]]))[:k]
+        return [Candidate(food_id, self.aliases[i], round(score, 3)) for food_id, (score, i) in ranked]
+
+    def best_window(self, text: str) -> Tuple[str, List[Candidate]]:
+        """Score every run of up to MAX_WINDOW words covering MIN_COVERAGE of the item's words;
+        (best window, its top candidates)."""
+        words = normalize_alias(text).split()
+        content = [word not in DESCRIPTORS for word in words]
+        if not any(content):
+            content = [True] * len(words)
+        needed = math.ceil(MIN_COVERAGE * sum(content))
+        best_window, best = text, []
+        for size in range(min(MAX_WINDOW, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                if sum(content[start:start + size]) < needed:
+                    continue
+                window = ' '.join(words[start:start + size])
+                candidates = self.top_k(window, 3)
+                if candidates and (not best or candidates[0].score > best[0].score):
+                    best_window, best = window, candidates
+        return best_window, best
+
+
+@lru_cache(maxsize=1)
+def load_trigram_index() -> TrigramIndex:
+    """Trigram index over the current alias index (built once per process)."""
+    from alias_index import load_alias_index
+
+    return TrigramIndex(load_alias_index().aliases)
+
+
+def classify(index: TrigramIndex, item: str, threshold: float = ALIAS_THRESHOLD) -> Optional[Candidate]:
+    """The food `item` is another spelling of, or None if it looks like a new food."""
+    _, candidates = index.best_window(item)
+    return candidates[0] if candidates and candidates[0].score >= threshold else None
+
+
+def check(index: TrigramIndex) -> List[str]:
+    """REGRESSION_CASES the index gets wrong, as printable lines."""
+    failures = []
+    for item, expected in REGRESSION_CASES:
+        found = classify(index, item)
+        got = found.food_id if found else None
+        if got != expected:
+            detail = f' via {found.alias!r} {found.score:.3f}' if found else ''
+            failures.append(f'{item!r}: expected {expected or "new food"}, got {got or "new food"}{detail}')
+    return failures
+
+
+def rank_unmatched(lines: Iterable[str], threshold: float = ALIAS_THRESHOLD) -> Dict[str, List[Dict]]:
+    """Split lines the food matcher finds nothing in into likely aliases and new foods.
+
+    Returns {'alias': [...], 'new': [...]}; each entry has the item, how many
+    lines mention it, the best matching window and the top candidates.
+    Aliases are sorted by score, new foods by how often they occur.
+    """
+    from food_matcher import default_matcher
+    from ingredient_grammar import parse_line
+
+    matcher, index = default_matcher(), load_trigram_index()
+    items: Dict[str, Dict] = {}
+    for line in lines:
+        if matcher.foods(line):
+            continue
+        item = normalize_alias(parse_line(line).item) or normalize_alias(line)
+        if not item:
+            continue
+        if item in items:
+            items[item]['count'] += 1
+            continue
+        window, candidates = index.best_window(item)
+        items[item] = {'item': item, 'count': 1, 'window': window, 'candidates': candidates}
+
+    ranked: Dict[str, List[Dict]] = {'alias': [], 'new': []}
+    for entry in items.values():
+        score = entry['candidates'][0].score if entry['candidates'] else 0.0
+        ranked['alias' if score >= threshold else 'new'].append(entry)
+    ranked['alias'].sort(key=lambda e: -e['candidates'][0].score)
+    ranked['new'].sort(key=lambda e: (-e['count'], e['item']))
+    return ranked
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Trigram fuzzy matching against the food alias index')
+    parser.add_argument('queries', nargs='*', help='strings to look up')
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help='candidates per query')
+    parser.add_argument('--unmatched', action='store_true',
+                        help='rank every corpus ingredient line the food matcher misses')
+    parser.add_argument('--threshold', type=float, default=ALIAS_THRESHOLD,
+                        help='minimum score for "likely alias" (default: %(default)s)')
+    parser.add_argument('--check', action='store_true', help='run REGRESSION_CASES against the alias index')
+    args = parser.parse_args(argv)
+
+    index = load_trigram_index()
+    if args.check:
+        failures = check(index)
+        for failure in failures:
+            print(f'  FAIL {failure}')
+        print(f'{len(REGRESSION_CASES) - len(failures)}/{len(REGRESSION_CASES)} regression cases pass')
+        return 1 if failures else 0
+
+    for query in args.queries:
+        start = time.perf_counter()
+        candidates = index.top_k(query, args.k)
+        elapsed = time.perf_counter() - start
+        print(f'{query!r} ({elapsed * 1e6:.0f} µs)')
+        for c in candidates:
+            print(f'  {c.score:5.3f}  {c.food_id:30s} via {c.alias!r}')
+
+    if not args.unmatched:
+        if not args.queries:
+            parser.print_help()
+        return 0
+
+    from recipe_segmenter import segment_book
+
+    lines = [line for recipe in segment_book() for line in recipe.ingredients]
+    start = time.perf_counter()
+    ranked = rank_unmatched(lines, args.threshold)
+    elapsed = time.perf_counter() - start
+    print(f"{len(lines)} ingredient lines: {len(ranked['alias'])} unmatched items look like aliases, "
+          f"{len(ranked['new'])} like new foods ({elapsed * 1000:.0f} ms)", file=sys.stderr)
+
+    print('\nLIKELY ALIASES (item -> food)')
+    for e in ranked['alias']:
+        c = e['candidates'][0]
+        print(f"  {c.score:5.3f}  {e['item'][:45]:45s} x{e['count']:<3d} -> {c.food_id} (via {c.alias!r})")
+    print('\nLIKELY NEW FOODS (item, mentions, nearest)')
+    for e in ranked['new']:
+        nearest = f"{e['candidates'][0].food_id} {e['candidates'][0].score:.2f}" if e['candidates'] else '-'
+        print(f"  {e['item'][:45]:45s} x{e['count']:<3d} nearest: {nearest}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,20 +1,11 @@
 #!/usr/bin/env python3
 """Identify truly NEW foods from pages 321-386."""
 
-import json
-from pathlib import Path
+from food_store import load_food_store
+from fuzzy_match import ALIAS_THRESHOLD, load_trigram_index
 
-# Get existing food names
-existing_foods = set()
-foods_dir = Path("data/foods")
-
-for filepath in foods_dir.glob("*.json"):
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-        name = data.get('name', '').lower()
-        existing_foods.add(name)
-        # Also add filename variant
-        existing_foods.add(filepath.stem.replace('-', ' '))
+# Get existing food names (display names plus filename variants)
+existing_foods = set(load_food_store().names())
 
 # Print sorted list of existing foods for manual comparison
 print("EXISTING FOODS IN DATABASE:")
@@ -50,15 +41,14 @@ print("\n" + "="*80)
 print("NEW FOOD CANDIDATES TO CHECK:")
 print("="*80)
 
+# Nearest alias by trigram similarity: catches near-spellings and plurals
+# that a substring test misses, without comparing against every name
+index = load_trigram_index()
 for candidate in new_food_candidates:
-    candidate_lower = candidate.lower()
-    # Check various forms
-    exists = False
-    for existing in existing_foods:
-        if candidate_lower in existing or existing in candidate_lower:
-            exists = True
-            print(f"  {candidate:40} -> EXISTS as: {existing}")
-            break
-
-    if not exists:
-        print(f"  {candidate:40} -> NEW!")
+    window, matches = index.best_window(candidate)
+    if matches and matches[0].score >= ALIAS_THRESHOLD:
+        best = matches[0]
+        print(f"  {candidate:40} -> EXISTS as: {best.alias} ({best.food_id}, {best.score:.2f})")
+    else:
+        nearest = f" (nearest: {matches[0].alias}, {matches[0].score:.2f})" if matches else ""
+        print(f"  {candidate:40} -> NEW!{nearest}")
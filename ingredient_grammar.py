@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Compiled ingredient-line grammar with column-oriented batch parsing.
+
+Ingredient lines were kept as raw strings (ingredients_raw) or reduced
+straight to food IDs, so nothing could total or scale an amount. One compiled
+pattern now splits a normalized line into its parts:
+
+    1 1/2 cups/250g cooked* or 1 (400g) BPA-free tin ... chickpeas, drained
+    ^qty  ^unit ^metric     ^alternate ...                      ^preparation
+
+    quantity     1, 1/2, 1 1/2, 1.5; ranges "4 to 6" fill quantity_max
+    unit         cup, tablespoon, teaspoon, ounce, pound, g, ml, inch, ...
+    metric       the "/75g" or "(400g)" equivalent, as grams/ml/cm
+    item         what is being measured ("red onion")
+    preparation  leading "chopped"/"finely diced" and anything after a comma
+    alternate    ", or 1/2 teaspoon dried" / "or 1 (400g) tin ..."
+    optional     "(optional)"
+
+IngredientTable.parse() batch-parses many lines into parallel columns:
+float quantities in array('d') (NaN when absent) and unit codes in array('B')
+interned through UNITS. Scaling, metric conversion and totals are NumPy
+operations on numpy.frombuffer() views of those columns (a unit-factor
+lookup array, np.where, np.bincount), so they cost no Python work per row.
+
+Usage:
+    from ingredient_grammar import parse_line, IngredientTable
+
+    parse_line('1/2 cup/75g chopped red onion')
+    # Ingredient(quantity=0.5, unit='cup', metric=75.0, metric_unit='g',
+    #            item='red onion', preparation='chopped', ...)
+
+    table = IngredientTable.parse(lines)
+    table.scaled(2)                 # NumPy array of doubled quantities
+    table.metric_amounts()          # grams/ml per line, converted where needed
+    table.totals()                  # {unit: summed quantity}
+
+    python ingredient_grammar.py "1 teaspoon fresh thyme, or 1/2 teaspoon dried"
+    python ingredient_grammar.py --corpus [--benchmark]
+    python ingredient_grammar.py --check [--corpus]
+"""
+import math
+import re
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+# === CONFIGURATION ===
+# Unit code -> canonical unit; code 0 means "no unit" (counts: "2 carrots")
+UNITS = ['', 'cup', 'tablespoon', 'teaspoon', 'ounce', 'pound', 'pint', 'quart',
+         'g', 'kg', 'ml', 'l', 'inch', 'cm', 'mm', 'pinch', 'dash', 'handful']
+UNIT_CODES = {unit: code for code, unit in enumerate(UNITS)}
+
+UNIT_ALIASES = {
+    'cups': 'cup', 'c': 'cup',
+    'tablespoons': 'tablespoon', 'tbsp': 'tablespoon', 'tbs': 'tablespoon',
+    'teaspoons': 'teaspoon', 'tsp': 'teaspoon',
+    'ounces': 'ounce', 'oz': 'ounce', 'pounds': 'pound', 'lb': 'pound', 'lbs': 'pound',
+    'pints': 'pint', 'quarts': 'quart',
+    'grams': 'g', 'gram': 'g', 'kilograms': 'kg', 'millilitres': 'ml', 'litre': 'l', 'litres': 'l',
+    'inches': 'inch', 'pinches': 'pinch', 'dashes': 'dash', 'handfuls': 'handful',
+}
+
+# Grams or millilitres per unit, for quantities and printed equivalents alike. Mass and
+# volume only: lengths (inch, cm, mm) and pinches have no grams/ml amount
+METRIC_PER_UNIT = {
+    'cup': 250.0, 'tablespoon': 15.0, 'teaspoon': 5.0, 'ounce': 28.35, 'pound': 453.6,
+    'pint': 568.0, 'quart': 1136.0, 'g': 1.0, 'kg': 1000.0, 'ml': 1.0, 'l': 1000.0,
+}
+
+# (line, grams/ml metric_amounts() must give, None for no amount); python ingredient_grammar.py --check
+METRIC_CASES = (
+    ('4 cups/1 litre Light Vegetable Broth (here)', 1000.0),
+    ('1/4 cup/4 tablespoons chopped fresh coriander', 60.0),
+    ('2 pounds/1kg ripe plum tomatoes', 1000.0),
+    ('1 litre/1.75 pints water', 994.0),
+    ('1-inch/2.5cm piece fresh ginger', None),
+    ('3 cups/75g rocket', 75.0),
+    ('2 tablespoons white miso paste', 30.0),
+)
+
+# Leading preparation words ("finely chopped red onion"); "ground" is left
+# alone because it is part of food names (ground cumin, ground flaxseed)
+PREPARATIONS = ('chopped', 'diced', 'sliced', 'minced', 'grated', 'shredded', 'crushed', 'torn',
+                'halved', 'quartered', 'mashed', 'cubed', 'trimmed', 'peeled', 'rinsed', 'toasted')
+PREP_ADVERBS = ('finely', 'coarsely', 'roughly', 'thinly', 'thickly', 'freshly', 'lightly')
+
+_NUMBER = r'(?:(?:\d+\s+)?\d+/\d+|\d+(?:\.\d+)?)'
+_UNIT = '|'.join(sorted((re.escape(u) for u in list(UNIT_CODES)[1:] + list(UNIT_ALIASES)), key=len, reverse=True))
+
+LINE_RE = re.compile(rf'''
+    ^(?P<quantity>{_NUMBER})
+    (?:\s*(?:to|-)\s*(?P<quantity_max>{_NUMBER}))?
+    \s*
+    (?:\((?:[^()]*?/)?(?P<pack>{_NUMBER})\s*(?P<pack_unit>g|kg|ml|l)\)\s*)?   # 1 (400g) tin
+    (?:-?\s*(?P<unit>{_UNIT})\b\.?)?
+    (?:\s*/\s*(?P<metric>{_NUMBER})(?:\s*-\s*{_NUMBER})?\s*(?P<metric_unit>{_UNIT})\b)?   # /75g, /250-300g
+    \s*(?P<rest>.*)$
+''', re.IGNORECASE | re.VERBOSE)
+
+# An alternate starts at "or" followed by a quantity: ", or 1/2 teaspoon dried"
+ALTERNATE_RE = re.compile(rf',?\s+or\s+(?=(?:{_NUMBER})\b)')
+OPTIONAL_RE = re.compile(r'\s*\(optional\)|,?\s*optional$', re.IGNORECASE)
+HERE_RE = re.compile(r'\s*\(\s*here\s*\)', re.IGNORECASE)
+# "BPA-free tin or Tetra Pak salt-free chickpeas" names the food after the packaging
+PACKAGING_RE = re.compile(r'^(?:cooked\s+or\s+)?bpa-free\s+(?:tins?|tinned)(?:\s+or\s+tetra\s+paks?)?\s+(?:salt-free\s+)?',
+                          re.IGNORECASE)
+# Non-metric size in brackets: "1 (1/4-inch/5mm) piece fresh turmeric"
+SIZE_RE = re.compile(r'^\((?P<size>[^()]*)\)\s*')
+LEADING_PREP_RE = re.compile(
+    rf"^(?P<prep>(?:(?:{'|'.join(PREP_ADVERBS)})\s+)?(?:{'|'.join(PREPARATIONS)})(?:\s+and\s+(?:{'|'.join(PREPARATIONS)}))?)\s+",
+    re.IGNORECASE)
+# "cooked*" alone says how, not what: the food is named in the alternate
+STATE_ONLY_RE = re.compile(r'^(?:cold\s+)?(?:cooked|uncooked|fresh|frozen|thawed)$', re.IGNORECASE)
+
+
+class Ingredient(NamedTuple):
+    line: str
+    quantity: Optional[float]
+    quantity_max: Optional[float]
+    unit: str
+    metric: Optional[float]
+    metric_unit: str
+    item: str
+    preparation: str
+    alternate: str
+    optional: bool
+
+
+def parse_number(text: Optional[str]) -> Optional[float]:
+    """'1 1/2' -> 1.5, '3/4' -> 0.75, '2.5' -> 2.5; None stays None."""
+    if not text:
+        return None
+    total = 0.0
+    for part in text.split():
+        if '/' in part:
+            num, den = part.split('/')
+            total += int(num) / int(den) if int(den) else 0.0
+        else:
+            total += float(part)
+    return total
+
+
+def canonical_unit(unit: Optional[str]) -> str:
+    if not unit:
+        return ''
+    unit = unit.lower()
+    return UNIT_ALIASES.get(unit, unit)
+
+
+def _split_item(text: str):
+    """(item, preparation) from the text after the amount."""
+    item, _, after_comma = text.partition(', ')
+    item = item.replace('*', '')  # footnote markers ("cooked*")
+    preps = []
+    match = SIZE_RE.match(item)
+    if match:
+        preps.append(match.group('size'))
+        item = item[match.end():]
+    match = PACKAGING_RE.match(item)
+    if match:
+        preps.append('tinned')
+        item = item[match.end():]
+    match = LEADING_PREP_RE.match(item)
+    if match:
+        preps.append(match.group('prep'))
+        item = item[match.end():]
+    if after_comma:
+        preps.append(after_comma)
+    return item.strip(' ,'), ', '.join(preps)
+
+
+def parse_line(line: str) -> Ingredient:
+    """Parse one normalized ingredient line; lines without a quantity keep it None."""
+    line = line.strip()
+    text, optional = OPTIONAL_RE.subn('', line)
+    text = HERE_RE.sub('', text)
+
+    match = LINE_RE.match(text)
+    if match:
+        rest = match.group('rest')
+        quantity = parse_number(match.group('quantity'))
+        quantity_max = parse_number(match.group('quantity_max'))
+        unit = canonical_unit(match.group('unit'))
+        if match.group('metric'):
+            metric, metric_unit = parse_number(match.group('metric')), canonical_unit(match.group('metric_unit'))
+        elif match.group('pack'):
+            metric, metric_unit = parse_number(match.group('pack')), canonical_unit(match.group('pack_unit'))
+        else:
+            metric, metric_unit = None, ''
+    else:
+        rest = text
+        quantity = quantity_max = metric = None
+        unit = metric_unit = ''
+
+    alternate = ''
+    alt_match = ALTERNATE_RE.search(rest)
+    if alt_match:
+        rest, alternate = rest[:alt_match.start()], rest[alt_match.end():]
+
+    item, preparation = _split_item(rest)
+    if alternate and STATE_ONLY_RE.match(item):
+        # "1 1/2 cups/250g cooked* or 1 (400g) tin ... chickpeas, drained"
+        alt = parse_line(alternate)
+        preparation = ', '.join(p for p in (item, alt.preparation) if p)
+        item = alt.item
+    return Ingredient(line, quantity, quantity_max, unit, metric, metric_unit,
+                      item, preparation, alternate, bool(optional))
+
+
+def metric_amount(ingredient: Ingredient) -> Optional[float]:
+    """Grams/ml of one parsed line; the per-row reference for IngredientTable.metric_amounts()."""
+    for amount, unit in ((ingredient.metric, ingredient.metric_unit), (ingredient.quantity, ingredient.unit)):
+        if amount is not None and unit in METRIC_PER_UNIT:
+            return amount * METRIC_PER_UNIT[unit]
+    return None
+
+
+def _column(values: Iterable[Optional[float]]) -> array:
+    return array('d', (math.nan if v is None else v for v in values))
+
+
+class IngredientTable:
+    """Parsed ingredient lines as parallel columns (one row per line)."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.quantity = array('d')
+        self.quantity_max = array('d')
+        self.unit = array('B')
+        self.metric = array('d')
+        self.metric_unit = array('B')
+        self.optional = array('B')
+        self.items: List[str] = []
+        self.preparations: List[str] = []
+        self.alternates: List[str] = []
+        # Row -> caller's group (e.g. recipe number); -1 when not given
+        self.group = array('i')
+
+    @classmethod
+    def parse(cls, lines: Iterable[str], groups: Optional[Iterable[int]] = None) -> 'IngredientTable':
+        table = cls()
+        parsed = [parse_line(line) for line in lines]
+        table.lines = [p.line for p in parsed]
+        table.quantity = _column(p.quantity for p in parsed)
+        table.quantity_max = _column(p.quantity_max if p.quantity_max is not None else p.quantity for p in parsed)
+        table.unit = array('B', (UNIT_CODES.get(p.unit, 0) for p in parsed))
+        table.metric = _column(p.metric for p in parsed)
+        table.metric_unit = array('B', (UNIT_CODES.get(p.metric_unit, 0) for p in parsed))
+        table.optional = array('B', (p.optional for p in parsed))
+        # Interned: the same food/preparation text is one string object across rows
+        table.items = [sys.intern(p.item.lower()) for p in parsed]
+        table.preparations = [sys.intern(p.preparation) for p in parsed]
+        table.alternates = [p.alternate for p in parsed]
+        table.group = array('i', groups if groups is not None else [-1] * len(parsed))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def row(self, i: int) -> Ingredient:
+        def value(col, j):
+            return None if math.isnan(col[j]) else col[j]
+
+        qmax = value(self.quantity_max, i)
+        return Ingredient(self.lines[i], value(self.quantity, i), qmax if qmax != value(self.quantity, i) else None,
+                          UNITS[self.unit[i]], value(self.metric, i), UNITS[self.metric_unit[i]],
+                          self.items[i], self.preparations[i], self.alternates[i], bool(self.optional[i]))
+
+    def _floats(self, column: str):
+        import numpy as np
+
+        return np.frombuffer(getattr(self, column), dtype=np.float64)
+
+    def scaled(self, factor: float, column: str = 'quantity'):
+        """A quantity column multiplied by `factor` (e.g. servings 4 -> 6: 1.5), as a NumPy array."""
+        return self._floats(column) * factor
+
+    def metric_amounts(self):
+        """Grams/ml per row: the printed metric equivalent, else quantity, each times its
+        unit's METRIC_PER_UNIT factor; NaN where neither unit is a mass or volume."""
+        import numpy as np
+
+        factors = np.array([METRIC_PER_UNIT.get(u, math.nan) for u in UNITS])
+        printed = self._floats('metric') * factors[np.frombuffer(self.metric_unit, dtype=np.uint8)]
+        converted = self._floats('quantity') * factors[np.frombuffer(self.unit, dtype=np.uint8)]
+        return np.where(np.isnan(printed), converted, printed)
+
+    def totals(self, rows: Optional[Iterable[int]] = None) -> Dict[str, float]:
+        """Summed quantity per unit over `rows` (all rows by default); NaNs skipped."""
+        import numpy as np
+
+        quantity, unit = self._floats('quantity'), np.frombuffer(self.unit, dtype=np.uint8)
+        if rows is not None:
+            picked = np.fromiter(rows, dtype=np.intp)
+            quantity, unit = quantity[picked], unit[picked]
+        present = ~np.isnan(quantity)
+        sums = np.bincount(unit[present], weights=quantity[present], minlength=len(UNITS))
+        return {UNITS[code] or 'count': float(total) for code, total in enumerate(sums) if total}
+
+    def group_rows(self, group: int) -> List[int]:
+        import numpy as np
+
+        return np.flatnonzero(np.frombuffer(self.group, dtype=np.int32) == group).tolist()
+
+
+def corpus_table() -> IngredientTable:
+    """Every ingredient line of every recipe in the book, grouped by recipe index."""
+    from recipe_segmenter import segment_book
+
+    lines, groups = [], []
+    for n, recipe in enumerate(segment_book()):
+        lines.extend(recipe.ingredients)
+        groups.extend([n] * len(recipe.ingredients))
+    return IngredientTable.parse(lines, groups)
+
+
+def check_metric(table: Optional[IngredientTable] = None) -> List[str]:
+    """METRIC_CASES, then every row of `table`, against metric_amount(); failures as lines."""
+    cases = IngredientTable.parse(line for line, _ in METRIC_CASES)
+    expected = [amount for _, amount in METRIC_CASES]
+    tables = [(cases, expected)]
+    if table is not None:
+        tables.append((table, [metric_amount(table.row(i)) for i in range(len(table))]))
+    failures = []
+    for source, wanted in tables:
+        for line, got, want in zip(source.lines, source.metric_amounts().tolist(), wanted):
+            if want is None:
+                ok = math.isnan(got)
+            else:
+                ok = math.isclose(got, want, rel_tol=1e-3)
+            if not ok:
+                failures.append(f'{line!r}: got {got:g}, expected {want if want is not None else "nan"}')
+    return failures
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Parse ingredient lines into quantity/unit/item columns')
+    parser.add_argument('lines', nargs='*', help='ingredient lines to parse')
+    parser.add_argument('--corpus', action='store_true', help='parse every recipe ingredient in the book')
+    parser.add_argument('--benchmark', action='store_true', help='time batch parsing and column operations')
+    parser.add_argument('--check', action='store_true',
+                        help='check metric_amounts() on METRIC_CASES (and the corpus with --corpus)')
+    args = parser.parse_args(argv)
+
+    for line in args.lines:
+        for field, value in parse_line(line)._asdict().items():
+            print(f'{field:13s} {value!r}')
+        print()
+
+    if args.check:
+        try:
+            failures = check_metric(corpus_table() if args.corpus else None)
+        except ImportError as e:
+            print(f'Error: {e} (column operations need NumPy)', file=sys.stderr)
+            return 1
+        for failure in failures:
+            print(f'  FAIL {failure}')
+        print(f'metric amounts: {len(failures)} failures')
+        return 1 if failures else 0
+
+    if not (args.corpus or args.benchmark):
+        if not args.lines:
+            parser.print_help()
+        return 0
+
+    table = corpus_table()
+    with_qty = sum(1 for q in table.quantity if q == q)
+    with_metric = sum(1 for m in table.metric if m == m)
+    print(f'{len(table)} ingredient lines: {with_qty} with a quantity, {with_metric} with a metric equivalent')
+    counts: Dict[str, int] = {}
+    for code in table.unit:
+        counts[UNITS[code] or '(count)'] = counts.get(UNITS[code] or '(count)', 0) + 1
+    for unit, count in sorted(counts.items(), key=lambda item: -item[1]):
+        print(f'  {unit:12s} {count:5d}')
+
+    if args.benchmark:
+        lines = table.lines
+        start = time.perf_counter()
+        for line in lines:
+            parse_line(line)
+        per_line = time.perf_counter() - start
+
+        start = time.perf_counter()
+        IngredientTable.parse(lines)
+        batch = time.perf_counter() - start
+
+        try:
+            # Warm-up, so the timing below leaves out the NumPy import
+            table.totals()
+        except ImportError as e:
+            print(f'Error: {e} (column operations need NumPy)', file=sys.stderr)
+            return 1
+        start = time.perf_counter()
+        table.scaled(1.5)
+        table.metric_amounts()
+        table.totals()
+        columns = time.perf_counter() - start
+
+        print(f'  parse_line x{len(lines)}   {per_line * 1000:8.1f} ms')
+        print(f'  batch parse        {batch * 1000:8.1f} ms')
+        print(f'  scale+metric+sum   {columns * 1000:8.2f} ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
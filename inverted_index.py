@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Positional inverted index over the book's page text.
+
+Built once from the page cache (or from existing PAGE N dumps) and pickled to
+.cache/index/book_index.pkl. Lookups are dictionary hits plus small position
+intersections, so single terms, prefixes ("strawberr") and phrases
+("apple cider vinegar") resolve without rescanning any page.
+
+Usage:
+    from inverted_index import load_index
+
+    index = load_index()
+    index.pages('apple cider vinegar')          # [50, 56, 57, ...]
+    index.search('strawberr', prefix=True)      # [(page, char_offset), ...]
+    index.context(56, offset, 100)              # text around a hit
+
+CLI:
+    python inverted_index.py build [--dump pages_120_200.txt ...]
+    python inverted_index.py query "apple cider vinegar" [--prefix]
+"""
+import bisect
+import hashlib
+import pickle
+import re
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from page_cache import BASE_DIR, PageCache, _atomic_pickle, find_pdf
+
+# === CONFIGURATION ===
+INDEX_DIR = BASE_DIR / '.cache' / 'index'
+INDEX_FILE = INDEX_DIR / 'book_index.pkl'
+INDEX_VERSION = 1
+
+# Words, numbers and contractions; curly apostrophes are kept inside words
+TOKEN_RE = re.compile(r"[0-9a-z]+(?:['’][a-z]+)*")
+
+
+def tokenize(text: str) -> List[Tuple[str, int]]:
+    """Lowercased (token, char_offset) pairs."""
+    return [(m.group(), m.start()) for m in TOKEN_RE.finditer(text.lower())]
+
+
+def fingerprint(texts: Dict[int, str]) -> str:
+    digest = hashlib.sha256()
+    for page_num in sorted(texts):
+        digest.update(f'{page_num}\0'.encode())
+        digest.update(texts[page_num].encode('utf-8'))
+    return digest.hexdigest()
+
+
+class InvertedIndex:
+    """term -> {page: token positions}, plus per-page token char offsets."""
+
+    def __init__(self, texts: Optional[Dict[int, str]] = None):
+        if texts is None:
+            return  # restored by load_index()
+        self.texts = dict(sorted(texts.items()))
+        self.source = fingerprint(self.texts)
+        self.postings: Dict[str, Dict[int, array]] = {}
+        self.offsets: Dict[int, array] = {}
+
+        for page_num, text in self.texts.items():
+            page_offsets = array('I')
+            for position, (token, offset) in enumerate(tokenize(text)):
+                page_offsets.append(offset)
+                self.postings.setdefault(token, {}).setdefault(page_num, array('I')).append(position)
+            self.offsets[page_num] = page_offsets
+
+        self.terms = sorted(self.postings)
+
+    # --- lookups ---
+    def expand(self, term: str) -> List[str]:
+        """All indexed terms starting with `term`."""
+        start = bisect.bisect_left(self.terms, term)
+        end = bisect.bisect_left(self.terms, term + '￿')
+        return self.terms[start:end]
+
+    def _term_positions(self, term: str, prefix: bool) -> Dict[int, set]:
+        terms = self.expand(term) if prefix else ([term] if term in self.postings else [])
+        merged: Dict[int, set] = {}
+        for t in terms:
+            for page_num, positions in self.postings[t].items():
+                merged.setdefault(page_num, set()).update(positions)
+        return merged
+
+    def search(self, query: str, prefix: bool = False) -> List[Tuple[int, int]]:
+        """(page, char_offset) of every occurrence of `query`.
+
+        Multi-word queries match as a phrase. With prefix=True the last word
+        matches any term it starts ("strawberr" -> strawberry, strawberries).
+        """
+        words = [token for token, _ in tokenize(query)]
+        if not words:
+            return []
+        if len(words) == 1 and not prefix:
+            return [(page_num, self.offsets[page_num][position])
+                    for page_num, positions in sorted(self.postings.get(words[0], {}).items())
+                    for position in positions]
+
+        last = len(words) - 1
+        per_word = [self._term_positions(w, prefix and i == last) for i, w in enumerate(words)]
+        pages = set(per_word[0])
+        for positions in per_word[1:]:
+            pages &= positions.keys()
+
+        hits = []
+        for page_num in sorted(pages):
+            for start in sorted(per_word[0][page_num]):
+                if all(start + k in per_word[k][page_num] for k in range(1, len(words))):
+                    hits.append((page_num, self.offsets[page_num][start]))
+        return hits
+
+    def pages(self, query: str, prefix: bool = False) -> List[int]:
+        """Sorted page numbers containing `query`."""
+        return sorted({page_num for page_num, _ in self.search(query, prefix)})
+
+    def context(self, page_num: int, offset: int, width: int = 100) -> str:
+        text = self.texts[page_num]
+        return text[max(0, offset - width):offset + width]
+
+    # --- persistence ---
+    def save(self, index_file: Path = INDEX_FILE):
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        # Plain containers only, so the file loads the same whether this module
+        # ran as __main__ or was imported
+        _atomic_pickle(index_file, (INDEX_VERSION, self.source, self.texts, self.postings, self.offsets))
+
+    @classmethod
+    def _restore(cls, source, texts, postings, offsets) -> 'InvertedIndex':
+        index = cls()
+        index.source, index.texts, index.postings, index.offsets = source, texts, postings, offsets
+        index.terms = sorted(postings)
+        return index
+
+
+def pages_from_pdf(pdf_path=None, backend: Optional[str] = None) -> Dict[int, str]:
+    """Every page of the book, via the shared page cache."""
+    pdf_path = pdf_path or find_pdf()
+    if not pdf_path:
+        raise FileNotFoundError('No PDF found')
+    with PageCache(pdf_path, backend) as cache:
+        return {i + 1: text for i, text in cache.texts(range(cache.page_count()))}
+
+
+def pages_from_dumps(dump_files: Iterable) -> Dict[int, str]:
+    """Pages from existing PAGE N dumps; later files win on overlapping pages."""
+    from parallel_extract import read_dump
+
+    texts = {}
+    for dump_file in dump_files:
+        texts.update(read_dump(dump_file))
+    return texts
+
+
+def build_index(texts: Dict[int, str], index_file: Path = INDEX_FILE) -> InvertedIndex:
+    index = InvertedIndex(texts)
+    index.save(index_file)
+    return index
+
+
+def load_index(index_file: Path = INDEX_FILE, texts: Optional[Dict[int, str]] = None) -> InvertedIndex:
+    """Load the saved index, building it from the book when missing.
+
+    When `texts` is given the saved index is only reused if it was built from
+    exactly those pages, and is rebuilt from them otherwise. Run
+    `python inverted_index.py build` after re-extracting the book.
+    """
+    if index_file.exists():
+        with open(index_file, 'rb') as f:
+            version, *state = pickle.load(f)
+        if version == INDEX_VERSION and (texts is None or state[0] == fingerprint(texts)):
+            return InvertedIndex._restore(*state)
+
+    if texts is None:
+        texts = pages_from_pdf()
+    return build_index(texts, index_file)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Positional inverted index over the cookbook')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='build and save the index')
+    build.add_argument('--dump', nargs='+', help='build from PAGE N dump files instead of the PDF')
+    build.add_argument('--backend', help='PDF backend/mode for the page cache')
+    query = sub.add_parser('query', help='look up a term or phrase')
+    query.add_argument('text')
+    query.add_argument('--prefix', action='store_true', help='treat the last word as a prefix')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        texts = pages_from_dumps(args.dump) if args.dump else pages_from_pdf(backend=args.backend)
+        index = build_index(texts)
+        print(f'Indexed {len(index.texts)} pages, {len(index.terms)} terms '
+              f'in {time.perf_counter() - start:.2f}s -> {INDEX_FILE}')
+        return
+
+    start = time.perf_counter()
+    index = load_index()
+    loaded = time.perf_counter()
+    hits = index.search(args.text, args.prefix)
+    elapsed = time.perf_counter() - loaded
+    print(f'{args.text!r}: {len(hits)} hits on pages {sorted({p for p, _ in hits})}')
+    print(f'(load {loaded - start:.3f}s, query {elapsed * 1e6:.0f}µs)', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,18 +4,14 @@
 import json
 from pathlib import Path
 
+from food_store import load_food_store
+
 OUTPUT_DIR = Path("/Users/dragan/Documents/how-not-to-diet/data/recipes")
-FOODS_DIR = Path("/Users/dragan/Documents/how-not-to-diet/data/foods")
 START_NUM = 30
 
 # Load food database
 def load_foods():
-    foods = {}
-    for food_file in FOODS_DIR.glob("*.json"):
-        with open(food_file, 'r') as f:
-            food_data = json.load(f)
-            foods[food_file.stem] = food_data
-    return foods
+    return load_food_store()
 
 foods_db = load_foods()
 
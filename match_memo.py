@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Persistent memo: normalized ingredient line -> matched food IDs.
+
+The same ingredient lines recur across the book ('freshly ground black
+pepper', '1 tablespoon Umami Sauce Redux (here)') and across runs, and every
+recipe script used to re-match all of them. The memo keeps the matcher's
+answer for each line in a size-bounded LRU table, saved next to the alias
+index. Each entry also records how long the original match took, so a run
+can report the time the hits saved.
+
+The memo stores the alias index hash and the matcher fingerprint it was
+built against; when either changes (a food file or curated table edited,
+PHRASES or the matching code changed), the whole memo is discarded, since
+any line's answer may have changed.
+
+Lines are keyed case- and whitespace-insensitively, which is exactly what
+the food matcher ignores.
+
+Usage:
+    from match_memo import default_memo
+
+    memo = default_memo()
+    memo.foods('1 tablespoon Umami Sauce Redux (here)')   # matcher.foods(), memoized
+    memo.close()        # save and print hit rate / time saved to stderr
+
+    python match_memo.py stats
+    python match_memo.py clear
+    python match_memo.py warm        # match every corpus ingredient line twice, report
+"""
+import json
+import sys
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List
+
+from page_cache import _atomic_write
+from page_store import STORE_DIR
+
+# === CONFIGURATION ===
+MEMO_FILE = STORE_DIR / 'match_memo.json'
+MEMO_VERSION = 1
+MAX_ENTRIES = 20000
+
+
+def memo_key(line: str) -> str:
+    """Lowercase, whitespace-collapsed line: the matcher gives every variant the same answer."""
+    return ' '.join(line.lower().split())
+
+
+class MatchMemo:
+    """Size-bounded LRU of {key: (food IDs, seconds the match took)}, persisted as JSON."""
+
+    def __init__(self, match: Callable[[str], List[str]], alias_hash: str, matcher_hash: str,
+                 memo_file: Path = MEMO_FILE, max_entries: int = MAX_ENTRIES):
+        self.match = match
+        self.alias_hash = alias_hash
+        self.matcher_hash = matcher_hash
+        self.memo_file = memo_file
+        self.max_entries = max_entries
+        self.entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.hits = self.misses = 0
+        self.saved_seconds = self.lookup_seconds = 0.0
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.memo_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != MEMO_VERSION or data.get('alias_hash') != self.alias_hash \
+                or data.get('matcher_hash') != self.matcher_hash:
+            print('match memo: alias index or matcher changed, starting empty', file=sys.stderr)
+            self.dirty = True
+            return
+        # Stored oldest first, so the LRU order survives the round trip
+        for key, ids, seconds in data.get('entries', []):
+            self.entries[key] = (ids, seconds)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def foods(self, line: str) -> List[str]:
+        """Food IDs in `line`, from the memo when the line has been matched before."""
+        start = time.perf_counter()
+        key = memo_key(line)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry[1]
+            self.lookup_seconds += time.perf_counter() - start
+            return list(entry[0])
+
+        ids = self.match(line)
+        self.entries[key] = (list(ids), time.perf_counter() - start)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.misses += 1
+        self.dirty = True
+        return ids
+
+    def save(self):
+        """Write the memo if anything changed."""
+        if not self.dirty:
+            return
+        data = {'version': MEMO_VERSION, 'alias_hash': self.alias_hash, 'matcher_hash': self.matcher_hash,
+                'entries': [[key, ids, round(seconds, 7)] for key, (ids, seconds) in self.entries.items()]}
+        self.memo_file.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.memo_file, json.dumps(data, ensure_ascii=False))
+        self.dirty = False
+
+    def report(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups if lookups else 0.0
+        saved = self.saved_seconds - self.lookup_seconds
+        return (f'match memo: {self.hits}/{lookups} hits ({rate:.0%}), '
+                f'{saved * 1000:.1f} ms saved, {len(self.entries)} entries')
+
+    def close(self):
+        """Save and report; call once at the end of a run."""
+        self.save()
+        if self.hits or self.misses:
+            print(self.report(), file=sys.stderr)
+
+
+@lru_cache(maxsize=1)
+def default_memo() -> MatchMemo:
+    """The memo over the default food matcher, shared by every recipe script in the process."""
+    from alias_index import load_alias_index
+    from food_matcher import default_matcher, matcher_fingerprint
+
+    return MatchMemo(default_matcher().foods, load_alias_index().hash, matcher_fingerprint())
+
+
+def clear(memo_file: Path = MEMO_FILE) -> bool:
+    if memo_file.exists():
+        memo_file.unlink()
+        return True
+    return False
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Persistent ingredient-line match memo')
+    parser.add_argument('command', choices=['stats', 'clear', 'warm'])
+    args = parser.parse_args(argv)
+
+    if args.command == 'clear':
+        print('removed' if clear() else 'no memo', MEMO_FILE)
+        return
+
+    memo = default_memo()
+    if args.command == 'stats':
+        size = MEMO_FILE.stat().st_size if MEMO_FILE.exists() else 0
+        print(f'{len(memo)} entries (max {memo.max_entries}), {size / 1024:.0f} KB, '
+              f'alias index {memo.alias_hash[:12]}, matcher {memo.matcher_hash[:12]}')
+        return
+
+    from recipe_segmenter import segment_book
+
+    lines = [line for recipe in segment_book() for line in recipe.ingredients]
+    for label in ('first pass', 'second pass'):
+        memo.hits = memo.misses = 0
+        memo.saved_seconds = memo.lookup_seconds = 0.0
+        for line in lines:
+            memo.foods(line)
+        print(f'{label}: {memo.report()}')
+    memo.save()
+
+
+if __name__ == '__main__':
+    main()
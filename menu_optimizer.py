@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Weekly menu optimizer: fill data/weekly-menus.json from data/recipes.
+
+The menus file holds 7-day skeletons with breakfast, lunch, dinner and snack
+slots. A week is filled slot by slot (Monday breakfast, Monday lunch, ...)
+with beam search, scoring
+
+    + COVERAGE_WEIGHT  x  Daily Dozen categories covered that day
+    + SYNERGY_WEIGHT   x  synergy edges among the day's foods
+    - REPEAT_PENALTY   x  times the recipe was already used this week
+
+Everything the search touches is precomputed as integers:
+
+    dd[r]        Daily Dozen bitmask of recipe r (category_rules.py)
+    own[r]       synergy edges between r's own foods (synergy_graph.py)
+    pair[r][s]   synergy edges between r's foods and s's foods, both directions
+
+so the gain of placing r into a day is one popcount of (day mask | dd[r])
+plus a few table reads. Each step keeps the BEAM_WIDTH best partial weeks
+and, per partial week, expands only its CANDIDATES_PER_STATE best
+next recipes by immediate gain (the rest cannot beat them on this step and
+rarely win later). A recipe never fills two slots of the same day.
+
+Slots accept recipes by meal type (SLOT_MEAL_TYPES). Condiments, sauces and
+spice blends are ingredients of other recipes and are never scheduled.
+
+Several menus can be generated at once in worker processes. Menu i uses
+seed i to break ties differently, and for i > 0 a seeded AVOID_SHARE of the
+recipes costs CROSS_MENU_PENALTY each, so different seeds lean on different
+recipes. The avoid set depends on the seed alone, so the menus are the same
+however the seeds are split across workers.
+
+--write stores each slot as a {id, name} reference to data/recipes, not a
+copy of the recipe JSON; the site reads them as RecipeRef (src/types/index.ts).
+
+Usage:
+    python menu_optimizer.py                     # optimize the first skeleton, print it
+    python menu_optimizer.py --write             # ... and fill data/weekly-menus.json
+    python menu_optimizer.py --menus 8 --workers 4 [--write]
+    python menu_optimizer.py --beam 64 --benchmark
+"""
+import heapq
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from page_cache import BASE_DIR, _atomic_write
+from recipe_store import MEAL_GROUPS
+
+# === CONFIGURATION ===
+MENUS_FILE = BASE_DIR / 'data' / 'weekly-menus.json'
+DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+SLOTS = ('breakfast', 'lunch', 'dinner', 'snacks')
+SLOT_MEAL_TYPES = MEAL_GROUPS
+COVERAGE_WEIGHT = 10
+SYNERGY_WEIGHT = 1
+REPEAT_PENALTY = 15
+# Penalty for using a recipe in the seed's avoid set: 1.5 Daily Dozen categories, so
+# a menu gives way to another recipe unless the avoided one covers two more categories
+CROSS_MENU_PENALTY = 15
+# Share of recipes each seed other than 0 avoids
+AVOID_SHARE = 0.5
+# Random per-recipe bonus in [0, SEED_JITTER) for seeds other than 0
+SEED_JITTER = 3.0
+BEAM_WIDTH = 32
+CANDIDATES_PER_STATE = 12
+
+
+class Tables(NamedTuple):
+    """Precomputed integer tables over the schedulable recipes."""
+    ids: List[str]
+    names: List[str]
+    dd: List[int]
+    own: List[int]
+    pair: List[List[int]]
+    eligible: Dict[str, List[int]]
+
+
+def build_tables(recipes=None) -> Tables:
+    """Daily Dozen masks, synergy counts and slot eligibility for every schedulable recipe."""
+    from category_rules import daily_dozen_rules
+    from recipe_store import load_recipes
+    from synergy_graph import load_synergy_graph
+
+    if recipes is None:
+        recipes = load_recipes()
+    accepted = {meal for types in SLOT_MEAL_TYPES.values() for meal in types}
+    recipes = [r for r in recipes if r.meal_type in accepted]
+
+    rules, graph = daily_dozen_rules(), load_synergy_graph()
+    offsets, targets = graph.rows['synergies']
+    food_masks, reach = [], []
+    for recipe in recipes:
+        members = [graph.index[f] for f in recipe.foods if f in graph.index]
+        mask = reach_mask = 0
+        for i in members:
+            mask |= 1 << i
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                reach_mask |= 1 << j
+        food_masks.append(mask)
+        reach.append(reach_mask)
+
+    n = len(recipes)
+    # A food reaching its own recipe's foods; each edge is counted from its source side
+    own = [(reach[r] & food_masks[r]).bit_count() for r in range(n)]
+    pair = [[(reach[r] & food_masks[s]).bit_count() + (reach[s] & food_masks[r]).bit_count() if r != s else 0
+             for s in range(n)] for r in range(n)]
+    eligible = {slot: [r for r, recipe in enumerate(recipes) if recipe.meal_type in types]
+                for slot, types in SLOT_MEAL_TYPES.items()}
+    return Tables([r.id for r in recipes], [r.name for r in recipes],
+                  [rules.mask(r.foods) for r in recipes], own, pair, eligible)
+
+
+class State(NamedTuple):
+    score: float
+    week: Tuple[int, ...]       # recipe index per filled slot
+    day_mask: int               # Daily Dozen bits of the current day
+    seen: int                   # recipes used at least once this week
+    seen_twice: int             # ... at least twice
+
+
+def avoid_set(seed: int, count: int) -> List[int]:
+    """Recipe indexes seed `seed` is penalized for using; empty for seed 0."""
+    if not seed:
+        return []
+    rng = random.Random(f'avoid-{seed}')
+    return [r for r in range(count) if rng.random() < AVOID_SHARE]
+
+
+def optimize_week(tables: Tables, beam_width: int = BEAM_WIDTH, candidates: int = CANDIDATES_PER_STATE,
+                  seed: int = 0, avoid: Sequence[int] = ()) -> Tuple[List[int], float]:
+    """Best week found: (recipe index per slot, day-major; score)."""
+    rng = random.Random(seed)
+    # Seeded jitter, well below one Daily Dozen category, reorders near-ties
+    jitter = [rng.random() * SEED_JITTER if seed else 0.0 for _ in tables.ids]
+    avoid_mask = 0
+    for r in avoid:
+        avoid_mask |= 1 << r
+    dd, own, pair = tables.dd, tables.own, tables.pair
+
+    beam = [State(0.0, (), 0, 0, 0)]
+    for day in range(len(DAYS)):
+        for slot_index, slot in enumerate(SLOTS):
+            pool = tables.eligible[slot]
+            if not pool:
+                beam = [s._replace(week=s.week + (-1,)) for s in beam]
+                continue
+            expanded = []
+            for state in beam:
+                day_mask = 0 if slot_index == 0 else state.day_mask
+                today = state.week[len(state.week) - slot_index:] if slot_index else ()
+                base = day_mask.bit_count()
+                gains = []
+                for r in pool:
+                    if r in today:
+                        continue
+                    gain = COVERAGE_WEIGHT * ((day_mask | dd[r]).bit_count() - base) + SYNERGY_WEIGHT * own[r]
+                    row = pair[r]
+                    for t in today:
+                        if t >= 0:
+                            gain += SYNERGY_WEIGHT * row[t]
+                    bit = 1 << r
+                    if state.seen_twice & bit:
+                        gain -= 2 * REPEAT_PENALTY
+                    elif state.seen & bit:
+                        gain -= REPEAT_PENALTY
+                    if avoid_mask & bit:
+                        gain -= CROSS_MENU_PENALTY
+                    gains.append((gain + jitter[r], r))
+                for gain, r in heapq.nlargest(candidates, gains):
+                    bit = 1 << r
+                    expanded.append(State(state.score + gain, state.week + (r,), day_mask | dd[r],
+                                          state.seen | bit, state.seen_twice | (state.seen & bit)))
+            beam = heapq.nlargest(beam_width, expanded, key=lambda s: s.score) or beam
+    best = max(beam, key=lambda s: s.score)
+    return list(best.week), best.score
+
+
+def week_stats(tables: Tables, week: List[int]) -> Dict:
+    """Coverage per day, synergy edges and repeats of a filled week."""
+    coverage, synergy = [], 0
+    for day in range(len(DAYS)):
+        chosen = [r for r in week[day * len(SLOTS):(day + 1) * len(SLOTS)] if r >= 0]
+        mask = 0
+        for k, r in enumerate(chosen):
+            mask |= tables.dd[r]
+            synergy += tables.own[r] + sum(tables.pair[r][t] for t in chosen[:k])
+        coverage.append(mask.bit_count())
+    used = [r for r in week if r >= 0]
+    return {'coverage': coverage, 'synergy': synergy, 'distinct': len(set(used)), 'slots': len(used)}
+
+
+_worker_tables: Optional[Tables] = None
+
+
+def _init_worker(tables: Tables):
+    global _worker_tables
+    _worker_tables = tables
+
+
+def _optimize_batch(args: Tuple[List[int], int, int]) -> List[Tuple[List[int], float]]:
+    """Menus for `seeds`, each with its own seed-derived avoid set."""
+    seeds, beam_width, candidates = args
+    count = len(_worker_tables.ids)
+    return [optimize_week(_worker_tables, beam_width, candidates, seed, avoid_set(seed, count)) for seed in seeds]
+
+
+def generate_menus(tables: Tables, count: int, workers: Optional[int] = None,
+                   beam_width: int = BEAM_WIDTH, candidates: int = CANDIDATES_PER_STATE) -> List[Tuple[List[int], float]]:
+    """`count` weeks (seeds 0..count-1); workers=1 runs in-process."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, count))
+    batches = [list(range(count))[i::workers] for i in range(workers)]
+    if workers == 1:
+        _init_worker(tables)
+        results = _optimize_batch((batches[0], beam_width, candidates))
+        return results
+    by_seed: Dict[int, Tuple[List[int], float]] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(tables,)) as pool:
+        for seeds, results in zip(batches, pool.map(_optimize_batch, [(b, beam_width, candidates) for b in batches])):
+            by_seed.update(zip(seeds, results))
+    return [by_seed[seed] for seed in range(count)]
+
+
+def fill_menu(menu: Dict, tables: Tables, week: List[int]) -> Dict:
+    """The skeleton with every slot set to a {id, name} reference to its recipe."""
+    days = {day['day']: day for day in menu.get('days', [])}
+    filled_days = []
+    for d, day in enumerate(DAYS):
+        entry = dict(days.get(day, {'day': day}))
+        for s, slot in enumerate(SLOTS):
+            r = week[d * len(SLOTS) + s]
+            recipe = {'id': tables.ids[r], 'name': tables.names[r]} if r >= 0 else None
+            entry[slot] = ([recipe] if recipe else []) if slot == 'snacks' else recipe
+        filled_days.append(entry)
+    return {**menu, 'days': filled_days}
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fill weekly menus from data/recipes with beam search')
+    parser.add_argument('--menus', type=int, default=1, help='weeks to generate (default: one per skeleton)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--beam', type=int, default=BEAM_WIDTH, help='beam width (default: %(default)s)')
+    parser.add_argument('--candidates', type=int, default=CANDIDATES_PER_STATE,
+                        help='expansions per beam state (default: %(default)s)')
+    parser.add_argument('--write', action='store_true', help=f'write the filled menus to {MENUS_FILE.name}')
+    parser.add_argument('--benchmark', action='store_true', help='time one week and the batch, serial vs parallel')
+    args = parser.parse_args(argv)
+
+    from recipe_store import load_recipes
+
+    start = time.perf_counter()
+    recipes = load_recipes()
+    tables = build_tables(recipes)
+    print(f'{len(tables.ids)} schedulable recipes, tables built in {(time.perf_counter() - start) * 1000:.0f} ms '
+          f'(' + ', '.join(f'{slot} {len(pool)}' for slot, pool in tables.eligible.items()) + ')', file=sys.stderr)
+
+    with open(MENUS_FILE, 'r', encoding='utf-8') as f:
+        menus = json.load(f)
+    count = max(args.menus, len(menus) if args.write else 1)
+
+    if args.benchmark:
+        start = time.perf_counter()
+        optimize_week(tables, args.beam, args.candidates)
+        print(f'one week: {(time.perf_counter() - start) * 1000:.0f} ms')
+        for label, workers in (('serial', 1), ('parallel', args.workers)):
+            start = time.perf_counter()
+            generate_menus(tables, count, workers, args.beam, args.candidates)
+            print(f'{count} weeks {label}: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+    start = time.perf_counter()
+    results = generate_menus(tables, count, args.workers, args.beam, args.candidates)
+    elapsed = time.perf_counter() - start
+    print(f'{count} week(s) optimized in {elapsed * 1000:.0f} ms', file=sys.stderr)
+
+    for i, (week, score) in enumerate(results):
+        stats = week_stats(tables, week)
+        print(f'\nWEEK {i + 1}: score {score:.0f}, Daily Dozen per day {stats["coverage"]}, '
+              f'{stats["synergy"]} synergy edges, {stats["distinct"]}/{stats["slots"]} distinct recipes')
+        for d, day in enumerate(DAYS):
+            names = [tables.names[r][:28] if r >= 0 else '-' for r in week[d * len(SLOTS):(d + 1) * len(SLOTS)]]
+            print(f'  {day:9s} ' + ' | '.join(f'{n:28s}' for n in names))
+
+    if args.write:
+        year = menus[0]['year'] if menus else time.localtime().tm_year
+        for i, (week, _) in enumerate(results):
+            if i >= len(menus):
+                menus.append({'id': f'week-{i + 1}-{year}', 'name': f'Optimized Week {i + 1}', 'week': i + 1,
+                              'year': year, 'days': [{'day': day} for day in DAYS]})
+            menus[i] = fill_menu(menus[i], tables, week)
+        _atomic_write(MENUS_FILE, json.dumps(menus, indent=2, ensure_ascii=False) + '\n')
+        print(f'\n{len(results)} menu(s) written to {MENUS_FILE}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Aho-Corasick multi-term scanner.
+
+Scripts like search_specific_foods.py check ~100 substrings against every
+page (`food in text_lower` per term). The automaton here is compiled once
+from the whole term list and finds every occurrence of every term in a single
+pass over each page, with the same substring semantics as `in`.
+
+Usage:
+    from multi_term import Automaton, scan_pages
+
+    automaton = Automaton(['strawberr', 'kale', 'swiss chard'])
+    automaton.scan('Kale and strawberries')   # {'kale': [0], 'strawberr': [9]}
+
+    with PageCache(pdf_path) as cache:
+        for page_num, text, found in scan_pages(cache.texts(range(n)), automaton):
+            ...
+
+    python multi_term.py --benchmark     # automaton vs nested `in` loops
+"""
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class Automaton:
+    """Compiled Aho-Corasick automaton over a fixed list of (lowercase) terms."""
+
+    def __init__(self, terms: Iterable[str]):
+        # Keep the caller's order, drop duplicates and empty strings
+        self.terms = list(dict.fromkeys(t.lower() for t in terms if t))
+
+        # Trie: goto[state] maps char -> state; out[state] lists term indices
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for term_idx, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(term_idx)
+
+        # Breadth-first failure links; outputs inherit from their fail state
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        # Resolve failure chains into a full transition table so scanning is a
+        # single dict lookup per character. Only characters that occur in some
+        # term get entries; anything else returns to the root.
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        order = deque(goto[0].values())
+        while order:
+            state = order.popleft()
+            table = dict(delta[fail[state]])
+            table.update(goto[state])
+            delta[state] = table
+            order.extend(goto[state].values())
+
+        self._delta = delta
+        # Output as (term index, term length) tuples, None when empty
+        self._out = [tuple((i, len(self.terms[i])) for i in o) or None for o in out]
+
+    def __len__(self):
+        return len(self.terms)
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (char_offset, term) for every occurrence, in text order."""
+        delta, out, terms = self._delta, self._out, self.terms
+        state = 0
+        for pos, ch in enumerate(text.lower()):
+            state = delta[state].get(ch, 0)
+            hits = out[state]
+            if hits:
+                for term_idx, length in hits:
+                    yield pos - length + 1, terms[term_idx]
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """{term: [char offsets]} for every term found in `text`."""
+        found: Dict[str, List[int]] = {}
+        for offset, term in self.finditer(text):
+            found.setdefault(term, []).append(offset)
+        return found
+
+
+def scan_pages(pages: Iterable[Tuple[int, str]], automaton: Automaton) -> Iterator[Tuple[int, str, Dict[str, List[int]]]]:
+    """Stream (page, text, {term: offsets}) for pages with at least one match.
+
+    `pages` is any (page, text) iterator - e.g. PageCache.texts() - and is
+    consumed lazily, so only one page is held at a time.
+    """
+    for page, text in pages:
+        if not text:
+            continue
+        found = automaton.scan(text)
+        if found:
+            yield page, text, found
+
+
+def nested_scan(text: str, terms: List[str]) -> List[str]:
+    """The original approach: one `in` test per term per page."""
+    text_lower = text.lower()
+    return [term for term in terms if term in text_lower]
+
+
+def benchmark(texts: List[str], terms: List[str], repeat: int = 3) -> Dict[str, float]:
+    """Best-of-`repeat` seconds for the automaton vs nested loops over `texts`."""
+    start = time.perf_counter()
+    automaton = Automaton(terms)
+    compile_seconds = time.perf_counter() - start
+
+    def best(fn):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for text in texts:
+                fn(text)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    # Sanity check: both approaches must agree on which terms occur
+    for text in texts:
+        assert set(automaton.scan(text)) == set(nested_scan(text, automaton.terms))
+
+    return {
+        'compile': compile_seconds,
+        'automaton_terms_only': best(lambda t: automaton.scan(t)),
+        'nested_in_terms_only': best(lambda t: nested_scan(t, automaton.terms)),
+        # The nested scripts also re-find offsets with str.find for context
+        'nested_with_offsets': best(lambda t: _nested_offsets(t, automaton.terms)),
+    }
+
+
+def _nested_offsets(text: str, terms: List[str]) -> Dict[str, List[int]]:
+    text_lower = text.lower()
+    found = {}
+    for term in terms:
+        pos = text_lower.find(term)
+        while pos != -1:
+            found.setdefault(term, []).append(pos)
+            pos = text_lower.find(term, pos + 1)
+    return found
+
+
+def main(argv=None):
+    import argparse
+
+    from inverted_index import load_index
+    from search_specific_foods import target_foods
+
+    parser = argparse.ArgumentParser(description='Aho-Corasick multi-term scanner')
+    parser.add_argument('--benchmark', action='store_true', help='compare with nested `in` loops')
+    parser.add_argument('--with-food-names', action='store_true',
+                        help='also scan for every food name in data/foods (shows how the gap grows with term count)')
+    parser.add_argument('terms', nargs='*', help='terms to scan for (default: search_specific_foods list)')
+    args = parser.parse_args(argv)
+
+    terms = list(args.terms or target_foods)
+    if args.with_food_names:
+        import json
+        from page_cache import BASE_DIR
+
+        for food_file in sorted((BASE_DIR / 'data' / 'foods').glob('*.json')):
+            with open(food_file, 'r', encoding='utf-8') as f:
+                terms.append(json.load(f).get('name', ''))
+    texts = load_index().texts
+
+    if args.benchmark:
+        result = benchmark(list(texts.values()), terms)
+        chars = sum(len(t) for t in texts.values())
+        print(f'{len(terms)} terms over {len(texts)} pages ({chars / 1e6:.2f}M chars)')
+        for name, seconds in result.items():
+            print(f'  {name:22s} {seconds * 1000:8.1f} ms')
+        return
+
+    automaton = Automaton(terms)
+    for page, _, found in scan_pages(texts.items(), automaton):
+        print(f'PAGE {page}: ' + ', '.join(f'{t} x{len(o)}' for t, o in sorted(found.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+One-pass text normalization for extracted page text.
+
+Every parser used to clean page text its own way (repeated .lower() calls,
+ad-hoc re.sub for dashes and fractions) and some never did - which is how
+"Tuscan White\\nBean Dressing" ended up in recipe-001.json's name. This
+module normalizes a page once:
+
+    characters  curly quotes -> ' and ", en/em dashes -> -, odd spaces -> ' ',
+                x-sign -> x (one precompiled str.translate table)
+    expansions  Unicode fractions -> 1/2 etc. ("1½" -> "1 1/2"), ligatures
+                (fi, fl, ...) -> letters, runs of spaces -> one space
+    reflow      wrapped lines rejoined: multi-line ALL-CAPS titles (before a
+                MAKES: line or after a trailing AND/WITH/...), lines that
+                continue in lowercase, and words split after a hyphen
+
+Dual units ("½ cup/75g") come out uniformly as ASCII ("1/2 cup/75g") for the
+ingredient grammar. Every edit is kept, so any offset in the normalized text
+maps back to the raw text (Normalized.raw_offset).
+
+Results are cached as JSON: next to the raw page in the page cache
+(NNNN.norm.json, via PageCache.normalized) and under .cache/index/normalized
+for corpus pages, keyed by the raw text's SHA-256.
+
+Usage:
+    from normalize import normalize, normalized_pages
+
+    norm = normalize(raw_text)
+    norm.text, norm.lower               # normalized text, lowercased once
+    norm.raw_offset(norm.text.find('1/2 cup'))
+
+    pages = normalized_pages(range(120, 201))   # {page: Normalized} from the corpus
+
+    python normalize.py page 120
+    python normalize.py --benchmark
+"""
+import bisect
+import hashlib
+import json
+import re
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from page_cache import _atomic_write
+from page_store import STORE_DIR
+
+# === CONFIGURATION ===
+NORMALIZED_DIR = STORE_DIR / 'normalized'
+NORMALIZE_VERSION = 1
+
+# One-to-one character replacements (offsets are unchanged by this step)
+CHAR_TABLE = str.maketrans({
+    '‘': "'", '’': "'", '‚': "'", '′': "'",
+    '“': '"', '”': '"', '„': '"', '″': '"',
+    '–': '-', '—': '-', '‐': '-', '‑': '-', '−': '-',
+    '\u00a0': ' ', '\u2002': ' ', '\u2003': ' ', '\u2009': ' ', '\u202f': ' ', '\t': ' ',
+    '×': 'x',
+})
+
+FRACTIONS = {
+    '½': '1/2', '⅓': '1/3', '⅔': '2/3', '¼': '1/4', '¾': '3/4',
+    '⅕': '1/5', '⅖': '2/5', '⅗': '3/5', '⅘': '4/5',
+    '⅙': '1/6', '⅚': '5/6', '⅛': '1/8', '⅜': '3/8', '⅝': '5/8', '⅞': '7/8',
+}
+LIGATURES = {'ﬀ': 'ff', 'ﬁ': 'fi', 'ﬂ': 'fl', 'ﬃ': 'ffi', 'ﬄ': 'ffl', 'ﬅ': 'st', 'ﬆ': 'st'}
+
+# Characters that expand, plus whitespace runs inside a line and at its ends
+_EXPAND_RE = re.compile('[' + ''.join(FRACTIONS) + ''.join(LIGATURES) + ']|(?<=\\S) {2,}(?=\\S)| +$|^ +',
+                        re.MULTILINE)
+
+# Wrapped headings end on a connector word or a dash
+_CONNECTOR_RE = re.compile(r'(?:\b(?:AND|WITH|TO|OF|THE|IN|ON|FOR|OR|A)|[-/&])$')
+_MAKES_RE = re.compile(r'^MAKES:')
+
+
+def _is_caps(line: str) -> bool:
+    return line.isupper() and not _MAKES_RE.match(line)
+
+
+class Normalized:
+    """Normalized page text plus the edits that map it back to the raw text."""
+
+    __slots__ = ('text', 'sha256', '_edits', '_lower')
+
+    def __init__(self, text: str, sha256: str, edits: Tuple[array, array, array, array]):
+        self.text = text
+        self.sha256 = sha256
+        # Parallel arrays over length-changing edits: out_start, in_start, out_len, in_len
+        self._edits = edits
+        self._lower = None
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    def raw_offset(self, offset: int) -> int:
+        """Offset in the raw text of the character at `offset` in the normalized text."""
+        out_starts, in_starts, out_lens, in_lens = self._edits
+        i = bisect.bisect_right(out_starts, offset) - 1
+        if i < 0:
+            return offset
+        delta = offset - out_starts[i]
+        if delta < out_lens[i]:
+            # Inside a replacement: point at the start of what it replaced
+            return in_starts[i] + min(delta, max(in_lens[i] - 1, 0))
+        return in_starts[i] + in_lens[i] + (delta - out_lens[i])
+
+    def raw_span(self, start: int, end: int) -> Tuple[int, int]:
+        """Raw-text [start, end) covering the normalized span [start, end)."""
+        if end <= start:
+            raw = self.raw_offset(start)
+            return raw, raw
+        return self.raw_offset(start), self.raw_offset(end - 1) + 1
+
+    def to_json(self) -> Dict:
+        return {'version': NORMALIZE_VERSION, 'sha256': self.sha256, 'text': self.text,
+                'edits': [list(a) for a in self._edits]}
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'Normalized':
+        return cls(data['text'], data['sha256'], tuple(array('I', a) for a in data['edits']))
+
+
+def _reflow_edits(text: str) -> List[Tuple[int, int, str]]:
+    """(start, end, replacement) for every soft line break in `text`."""
+    lines = text.split('\n')
+    stripped = [line.strip() for line in lines]
+
+    # Lines belonging to a run of ALL-CAPS lines directly above a MAKES: line
+    title_lines = set()
+    for i, line in enumerate(stripped):
+        if _MAKES_RE.match(line):
+            j = i - 1
+            while j >= 0 and stripped[j] and _is_caps(stripped[j]):
+                title_lines.add(j)
+                j -= 1
+
+    edits = []
+    pos = 0
+    for i in range(len(lines) - 1):
+        line_end = pos + len(lines[i])
+        prev, nxt = stripped[i], stripped[i + 1]
+        pos = line_end + 1
+        if not prev or not nxt:
+            continue
+
+        if _is_caps(prev) and _is_caps(nxt):
+            join = (i in title_lines and i + 1 in title_lines) or bool(_CONNECTOR_RE.search(prev))
+        else:
+            join = nxt[0].islower() and prev[-1] not in '.!?:'
+        if not join:
+            continue
+
+        # Replace trailing spaces + newline + leading spaces as one edit
+        start = line_end - (len(lines[i]) - len(lines[i].rstrip()))
+        end = pos + (len(lines[i + 1]) - len(lines[i + 1].lstrip()))
+        glue = '' if prev.endswith('-') and prev[-2:-1].isalpha() and nxt[0].isalpha() else ' '
+        edits.append((start, end, glue))
+    return edits
+
+
+def normalize(raw: str) -> Normalized:
+    """Normalize one page of raw extracted text."""
+    sha256 = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    text = raw.translate(CHAR_TABLE)
+
+    edits = _reflow_edits(text)
+    reflow_starts = [start for start, _, _ in edits]
+    for m in _EXPAND_RE.finditer(text):
+        start, end = m.span()
+        # Whitespace already consumed by a line join
+        k = bisect.bisect_right(reflow_starts, start) - 1
+        if k >= 0 and start < edits[k][1] or k + 1 < len(reflow_starts) and reflow_starts[k + 1] < end:
+            continue
+        ch = m.group()
+        if ch in FRACTIONS:
+            replacement = (' ' if start and text[start - 1].isdigit() else '') + FRACTIONS[ch]
+        elif ch in LIGATURES:
+            replacement = LIGATURES[ch]
+        else:
+            replacement = ' ' if 0 < start and end < len(text) and text[start - 1] != '\n' and text[end] != '\n' else ''
+        edits.append((start, end, replacement))
+    edits.sort()
+
+    pieces = []
+    out_starts, in_starts, out_lens, in_lens = array('I'), array('I'), array('I'), array('I')
+    pos = out = 0
+    for start, end, replacement in edits:
+        pieces.append(text[pos:start])
+        out += start - pos
+        if len(replacement) != end - start:
+            out_starts.append(out)
+            in_starts.append(start)
+            out_lens.append(len(replacement))
+            in_lens.append(end - start)
+        pieces.append(replacement)
+        out += len(replacement)
+        pos = end
+    pieces.append(text[pos:])
+
+    return Normalized(''.join(pieces), sha256, (out_starts, in_starts, out_lens, in_lens))
+
+
+def normalize_cached(raw: str, cache_file: Path) -> Normalized:
+    """normalize(raw), reusing `cache_file` when it was made from the same raw text."""
+    sha256 = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == NORMALIZE_VERSION and data.get('sha256') == sha256:
+            return Normalized.from_json(data)
+    except (OSError, ValueError):
+        pass
+
+    norm = normalize(raw)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(cache_file, json.dumps(norm.to_json(), ensure_ascii=False))
+    return norm
+
+
+def normalized_pages(pages: Optional[Iterable[int]] = None) -> Dict[int, Normalized]:
+    """{page: Normalized} for corpus pages (all of them by default)."""
+    from corpus import load_corpus
+
+    corpus = load_corpus()
+    numbers = corpus.pages() if pages is None else [p for p in pages if p in corpus]
+    result = {}
+    for page_num in numbers:
+        raw = corpus[page_num]
+        sha256 = hashlib.sha256(raw.encode('utf-8')).hexdigest()
+        result[page_num] = normalize_cached(raw, NORMALIZED_DIR / f'{sha256}.json')
+    return result
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Normalize extracted page text')
+    parser.add_argument('--benchmark', action='store_true', help='time cold and cached normalization of the corpus')
+    sub = parser.add_subparsers(dest='command')
+    page = sub.add_parser('page', help='print one normalized corpus page')
+    page.add_argument('number', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'page':
+        pages = normalized_pages([args.number])
+        if not pages:
+            print(f'Page {args.number} is not in the corpus', file=sys.stderr)
+            sys.exit(1)
+        print(pages[args.number].text)
+        return
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    from corpus import load_corpus
+
+    corpus = load_corpus()
+    raws = [corpus[p] for p in corpus]
+    chars = sum(len(r) for r in raws)
+
+    start = time.perf_counter()
+    for raw in raws:
+        normalize(raw)
+    cold = time.perf_counter() - start
+
+    normalized_pages()  # warm the cache
+    start = time.perf_counter()
+    normalized_pages()
+    warm = time.perf_counter() - start
+
+    print(f'{len(raws)} pages ({chars / 1e6:.2f}M chars)')
+    print(f'  normalize      {cold * 1000:8.1f} ms  ({chars / cold / 1e6:.1f}M chars/sec)')
+    print(f'  cached load    {warm * 1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
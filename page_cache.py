@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Persistent page-text cache shared by the extract_*/search_* scripts.
+
+Decoding a page of the cookbook with PyPDF2 or pdfplumber is by far the
+slowest step of every investigation script. Page text is stored on disk under
+.cache/pages, keyed by the SHA-256 of the PDF, the backend that produced it and
+the 0-based page index, so a warm run reads plain text files instead of
+re-decoding the book.
+
+Usage:
+    from page_cache import PageCache, find_pdf
+
+    with PageCache(find_pdf()) as cache:
+        for i in range(cache.page_count()):
+            text = cache.text(i)
+    # -> "page cache: 386 hits, 0 misses (100.0% hit rate)" on stderr
+
+CLI:
+    python page_cache.py stats              # show cached books/backends
+    python page_cache.py warm [--backend B] # decode every page once (fast/layout/auto)
+    python page_cache.py clear [--backend B] [--pdf-hash H]
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from pdf_backend import BACKENDS, MODES, Book, open_book, resolve
+
+# === CONFIGURATION ===
+BASE_DIR = Path(__file__).resolve().parent
+CACHE_DIR = BASE_DIR / '.cache' / 'pages'
+HASH_CHUNK = 1 << 20
+
+
+def find_pdf() -> Optional[str]:
+    """Locate the cookbook PDF (COOKBOOK_PDF env var, then the repo root)."""
+    env_path = os.environ.get('COOKBOOK_PDF')
+    if env_path and os.path.isfile(env_path):
+        return env_path
+
+    pdf_files = sorted(glob.glob(str(BASE_DIR / '*.pdf')))
+    pdf_files = [f for f in pdf_files if os.path.isfile(f) and not os.path.basename(f).startswith('.')]
+    # Prefer the cookbook itself over any other PDF lying around
+    for pdf in pdf_files:
+        if 'Cookbook' in os.path.basename(pdf):
+            return pdf
+    return pdf_files[0] if pdf_files else None
+
+
+def pdf_hash(pdf_path, cache_dir: Path = CACHE_DIR) -> str:
+    """SHA-256 of the PDF, memoized by (size, mtime) so warm runs skip hashing."""
+    pdf_path = os.path.abspath(pdf_path)
+    stat = os.stat(pdf_path)
+    index_file = cache_dir / 'hashes.json'
+
+    hashes = {}
+    if index_file.exists():
+        try:
+            with open(index_file, 'r', encoding='utf-8') as f:
+                hashes = json.load(f)
+        except (OSError, ValueError):
+            hashes = {}
+
+    entry = hashes.get(pdf_path)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+
+    hashes[pdf_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _atomic_write(index_file, json.dumps(hashes, indent=2))
+    return digest.hexdigest()
+
+
+def _atomic_write(path: Path, text: str):
+    """Write via a temp file + rename so concurrent readers never see partial data."""
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _atomic_write_bytes(path: Path, data: bytes):
+    """Binary counterpart of _atomic_write()."""
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _atomic_pickle(path: Path, obj):
+    """Pickle `obj` the same way: temp file + rename, highest protocol."""
+    tmp = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    with open(tmp, 'wb') as f:
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+class PageCache:
+    """Page text for one PDF and backend, decoded at most once per page."""
+
+    def __init__(self, pdf_path, backend: Optional[str] = None, cache_dir: Path = CACHE_DIR):
+        # Accepts a mode ('fast', 'layout', 'auto') or a backend name
+        backend = resolve(backend)
+
+        self.pdf_path = str(pdf_path)
+        self.backend = backend
+        self.cache_dir = Path(cache_dir)
+        self.pdf_hash = pdf_hash(self.pdf_path, self.cache_dir)
+        self.book_dir = self.cache_dir / self.pdf_hash
+        self.page_dir = self.book_dir / backend
+        self.page_dir.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.decode_seconds = 0.0
+        self._book: Optional[Book] = None
+
+    # --- reader handling ---
+    def _open(self) -> Book:
+        """Open the PDF on the first cache miss only."""
+        if self._book is None:
+            self._book = open_book(self.pdf_path, self.backend)
+        return self._book
+
+    def close(self):
+        if self._book is not None:
+            self._book.close()
+        self._book = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.report()
+
+    # --- lookups ---
+    def page_count(self) -> int:
+        """Number of pages in the book (read from cache metadata when warm)."""
+        meta_file = self.book_dir / 'meta.json'
+        if meta_file.exists():
+            with open(meta_file, 'r', encoding='utf-8') as f:
+                return json.load(f)['page_count']
+
+        count = len(self._open())
+        _atomic_write(meta_file, json.dumps({'pdf_path': self.pdf_path, 'page_count': count}, indent=2))
+        return count
+
+    def _page_file(self, index: int) -> Path:
+        return self.page_dir / f'{index:04d}.txt'
+
+    def text(self, index: int) -> str:
+        """Text of the 0-based page `index`; empty string when the page has none."""
+        page_file = self._page_file(index)
+        try:
+            with open(page_file, 'r', encoding='utf-8') as f:
+                text = f.read()
+            self.hits += 1
+            return text
+        except FileNotFoundError:
+            pass
+
+        start = time.perf_counter()
+        text = self._open().pages[index].extract_text()
+        self.decode_seconds += time.perf_counter() - start
+        self.misses += 1
+
+        _atomic_write(page_file, text)
+        return text
+
+    def texts(self, indices: Iterable[int]) -> Iterator[Tuple[int, str]]:
+        """Yield (index, text) for each 0-based index."""
+        for index in indices:
+            yield index, self.text(index)
+
+    def normalized(self, index: int):
+        """normalize.Normalized text of a page, cached next to the raw text (NNNN.norm.json)."""
+        from normalize import normalize_cached
+
+        return normalize_cached(self.text(index), self._page_file(index).with_suffix('.norm.json'))
+
+    # --- invalidation / stats ---
+    def invalidate(self, index: Optional[int] = None):
+        """Drop one cached page, or every page of this book/backend."""
+        if index is not None:
+            self._page_file(index).unlink(missing_ok=True)
+            self._page_file(index).with_suffix('.norm.json').unlink(missing_ok=True)
+        else:
+            shutil.rmtree(self.page_dir, ignore_errors=True)
+            self.page_dir.mkdir(parents=True, exist_ok=True)
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'decode_seconds': round(self.decode_seconds, 3),
+        }
+
+    def report(self, file=sys.stderr):
+        stats = self.stats()
+        if stats['hits'] or stats['misses']:
+            print(f"page cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.1%} hit rate, {stats['decode_seconds']}s decoding)", file=file)
+
+
+def clear(backend: Optional[str] = None, book_hash: Optional[str] = None, cache_dir: Path = CACHE_DIR) -> int:
+    """Remove cached pages, optionally limited to one backend and/or one PDF hash.
+
+    Returns the number of page files removed.
+    """
+    if not cache_dir.exists():
+        return 0
+    removed = 0
+    for book_dir in cache_dir.iterdir():
+        if not book_dir.is_dir() or (book_hash and not book_dir.name.startswith(book_hash)):
+            continue
+        for backend_dir in book_dir.iterdir():
+            if not backend_dir.is_dir() or (backend and backend_dir.name != backend):
+                continue
+            removed += sum(1 for _ in backend_dir.glob('*.txt'))
+            shutil.rmtree(backend_dir)
+        if not backend:
+            shutil.rmtree(book_dir)
+    return removed
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Manage the shared page-text cache')
+    parser.add_argument('command', choices=['stats', 'warm', 'clear'])
+    parser.add_argument('--backend', choices=sorted(MODES) + list(BACKENDS))
+    parser.add_argument('--pdf-hash', help='limit `clear` to one book (hash prefix)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'clear':
+        removed = clear(resolve(args.backend) if args.backend else None, args.pdf_hash)
+        print(f'Removed {removed} cached pages')
+        return
+
+    if args.command == 'stats':
+        if not CACHE_DIR.exists():
+            print('Cache is empty')
+            return
+        for book_dir in sorted(p for p in CACHE_DIR.iterdir() if p.is_dir()):
+            for backend_dir in sorted(p for p in book_dir.iterdir() if p.is_dir()):
+                files = list(backend_dir.glob('*.txt'))
+                size = sum(f.stat().st_size for f in files)
+                print(f'{book_dir.name[:16]}  {backend_dir.name:10s} {len(files):4d} pages  {size / 1024:8.1f} KiB')
+        return
+
+    pdf_path = find_pdf()
+    if not pdf_path:
+        print('No PDF found!', file=sys.stderr)
+        sys.exit(1)
+    with PageCache(pdf_path, args.backend) as cache:
+        for _ in cache.texts(range(cache.page_count())):
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Binary page store with an offset index, read through mmap.
+
+The PAGE N text dumps have to be read whole and re-split with a regex every
+time a script wants one page. A .pstore file instead holds all page texts as
+one UTF-8 blob behind a fixed-size header and a slot table of (offset, length)
+per page number, so page N is found with one struct lookup and read as a
+slice of the memory-mapped file - nothing else is read or decoded.
+
+Layout (little-endian):
+    header      magic b'PGSTORE', version u8, first page u32, slot count u32
+    slots       (offset u32, length u32) for pages first..first+count-1;
+                length MISSING marks a page that is not in the store
+    blob        page texts, UTF-8, back to back (identical texts stored once)
+
+Usage:
+    from page_store import PageStore, open_dump_store
+
+    with PageStore('.cache/index/book.pstore') as store:
+        text = store[201]              # str
+        view = store.raw(201)          # zero-copy memoryview of the UTF-8 bytes
+        view.release()
+
+    pages = open_dump_store('pages_120_200.txt')   # sidecar store, rebuilt when the dump changes
+
+CLI:
+    python page_store.py build [--dump pages_120_200.txt ...] [-o book.pstore]
+    python page_store.py export book.pstore -o pages.txt     # back to PAGE N text
+    python page_store.py get book.pstore 201
+"""
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+from page_cache import BASE_DIR
+
+# === CONFIGURATION ===
+STORE_DIR = BASE_DIR / '.cache' / 'index'
+STORE_FILE = STORE_DIR / 'book.pstore'
+MAGIC = b'PGSTORE'
+VERSION = 1
+
+_HEADER = struct.Struct('<7sBII')
+_SLOT = struct.Struct('<II')
+MISSING = 0xFFFFFFFF
+
+
+def write_store(store_file, text_by_page: Dict[int, str]):
+    """Write {page_number: text} as a .pstore file (atomically)."""
+    store_file = Path(store_file)
+    numbers = sorted(text_by_page)
+    first = numbers[0] if numbers else 1
+    count = numbers[-1] - first + 1 if numbers else 0
+
+    slots = [(0, MISSING)] * count
+    blobs: List[bytes] = []
+    offset = 0
+    # Identical page texts (blank pages, repeated dumps) share one blob entry
+    stored: Dict[bytes, int] = {}
+    for page_num in numbers:
+        data = text_by_page[page_num].encode('utf-8')
+        if data not in stored:
+            stored[data] = offset
+            blobs.append(data)
+            offset += len(data)
+        slots[page_num - first] = (stored[data], len(data))
+
+    store_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = store_file.with_name(f'{store_file.name}.{os.getpid()}.tmp')
+    with open(tmp, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, first, count))
+        f.write(b''.join(_SLOT.pack(*slot) for slot in slots))
+        f.write(b''.join(blobs))
+    os.replace(tmp, store_file)
+
+
+class PageStore(Mapping):
+    """Read-only {page_number: text} mapping over a memory-mapped .pstore file.
+
+    Views returned by raw() point into the mapping; release them before
+    close(), or close() raises BufferError.
+    """
+
+    def __init__(self, store_file):
+        self.store_file = Path(store_file)
+        with open(self.store_file, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+
+        magic, version, self.first, self.count = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{self.store_file} is not a version {VERSION} page store')
+        self._blob_start = _HEADER.size + self.count * _SLOT.size
+        self._present = None
+
+    def _slot(self, page_num: int):
+        index = page_num - self.first
+        if not 0 <= index < self.count:
+            return None
+        offset, length = _SLOT.unpack_from(self._mm, _HEADER.size + index * _SLOT.size)
+        return None if length == MISSING else (self._blob_start + offset, length)
+
+    def raw(self, page_num: int) -> memoryview:
+        """UTF-8 bytes of a page as a zero-copy view into the file."""
+        slot = self._slot(page_num)
+        if slot is None:
+            raise KeyError(page_num)
+        start, length = slot
+        return self._view[start:start + length]
+
+    def __getitem__(self, page_num: int) -> str:
+        with self.raw(page_num) as view:
+            return str(view, 'utf-8')
+
+    def __contains__(self, page_num) -> bool:
+        return isinstance(page_num, int) and self._slot(page_num) is not None
+
+    def pages(self) -> List[int]:
+        """Page numbers present in the store, ascending."""
+        if self._present is None:
+            self._present = [self.first + i for i in range(self.count)
+                             if _SLOT.unpack_from(self._mm, _HEADER.size + i * _SLOT.size)[1] != MISSING]
+        return self._present
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.pages())
+
+    def __len__(self) -> int:
+        return len(self.pages())
+
+    def close(self):
+        if self._mm is not None:
+            self._view.release()
+            self._mm.close()
+            self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_dump(store: Mapping, output_file):
+    """Write a store back out in the PAGE N text dump format."""
+    from parallel_extract import write_dump
+
+    write_dump(output_file, store)
+
+
+def dump_store_path(dump_file) -> Path:
+    return STORE_DIR / f'{Path(dump_file).stem}.pstore'
+
+
+def open_dump_store(dump_file) -> PageStore:
+    """PageStore for a PAGE N dump, (re)built when the dump is newer than its store."""
+    from parallel_extract import read_dump
+
+    store_file = dump_store_path(dump_file)
+    if not store_file.exists() or os.path.getmtime(store_file) < os.path.getmtime(dump_file):
+        write_store(store_file, read_dump(dump_file))
+    return PageStore(store_file)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Binary page store with mmap random access')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='write a page store from the PDF or from PAGE N dumps')
+    build.add_argument('--dump', nargs='+', help='PAGE N dump files (later files win on overlap)')
+    build.add_argument('-o', '--output', default=str(STORE_FILE))
+    export = sub.add_parser('export', help='write a store back out as a PAGE N dump')
+    export.add_argument('store')
+    export.add_argument('-o', '--output', help='dump file (default: stdout)')
+    get = sub.add_parser('get', help='print one page')
+    get.add_argument('store')
+    get.add_argument('page', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        from inverted_index import pages_from_dumps, pages_from_pdf
+
+        texts = pages_from_dumps(args.dump) if args.dump else pages_from_pdf()
+        write_store(args.output, texts)
+        print(f'Stored {len(texts)} pages ({os.path.getsize(args.output) / 1024:.0f} KiB) -> {args.output}',
+              file=sys.stderr)
+        return
+
+    with PageStore(args.store) as store:
+        if args.command == 'get':
+            if args.page not in store:
+                print(f'Page {args.page} is not in {args.store}', file=sys.stderr)
+                sys.exit(1)
+            print(store[args.page])
+        elif args.output:
+            export_dump(store, args.output)
+            print(f'Text saved to {args.output}', file=sys.stderr)
+        else:
+            from parallel_extract import format_page
+
+            for page_num, text in store.items():
+                sys.stdout.write(format_page(page_num, text))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Streaming page iterator with early termination and bounded memory.
+
+Replaces the ad-hoc `for i in range(total_pages): pdf.pages[i].extract_text()`
+loops. Pages come from the shared page cache and are yielded lazily as
+1-indexed `(page_no, text)` pairs, so a consumer that `break`s after five hits
+never touches the rest of the book. Out-of-range page numbers are skipped
+instead of being swallowed by a bare `except`.
+
+Memory is bounded by an optional peak-RSS ceiling: when the process grows past
+it, the PDF reader - and every page object it has accumulated - is dropped and
+reopened on the next cache miss. If that does not bring RSS back under the
+ceiling, PageStreamMemoryError is raised rather than letting the run balloon.
+
+Usage:
+    from page_stream import PageStream
+
+    for page_no, text in PageStream(pdf_path, pages=range(1, 101), max_rss_mb=512):
+        if 'glycemic' in text.lower():
+            break
+"""
+import gc
+import os
+import sys
+from typing import Iterable, Iterator, Optional, Tuple
+
+from page_cache import CACHE_DIR, PageCache
+
+# Default ceiling for scripts that scan the whole book
+DEFAULT_MAX_RSS_MB = 512
+
+
+class PageStreamMemoryError(MemoryError):
+    pass
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MiB (best effort per platform)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1 << 20)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1 << 20)
+    except (OSError, ValueError):
+        pass
+    # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+
+class PageStream:
+    """Iterable of (page_no, text) for selected 1-indexed pages of the book."""
+
+    def __init__(self, pdf_path, pages: Optional[Iterable[int]] = None, backend: Optional[str] = None,
+                 max_rss_mb: Optional[float] = None, cache_dir=CACHE_DIR):
+        self.pdf_path = pdf_path
+        self.pages = pages
+        self.backend = backend
+        self.max_rss_mb = max_rss_mb
+        self.cache_dir = cache_dir
+        self.releases = 0
+        self.peak_rss_mb = 0.0
+        self._page_count = None
+
+    @property
+    def page_count(self) -> int:
+        """Total pages in the book (from cache metadata when warm)."""
+        if self._page_count is None:
+            with PageCache(self.pdf_path, self.backend, self.cache_dir) as cache:
+                self._page_count = cache.page_count()
+        return self._page_count
+
+    def _check_memory(self, cache: PageCache):
+        rss = current_rss_mb()
+        self.peak_rss_mb = max(self.peak_rss_mb, rss)
+        if rss <= self.max_rss_mb:
+            return
+
+        # Drop the reader and every page object it holds; reopened lazily
+        cache.close()
+        gc.collect()
+        self.releases += 1
+        rss = current_rss_mb()
+        if rss > self.max_rss_mb:
+            raise PageStreamMemoryError(
+                f'RSS {rss:.0f} MiB still above the {self.max_rss_mb:.0f} MiB ceiling after releasing the PDF reader')
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        cache = PageCache(self.pdf_path, self.backend, self.cache_dir)
+        try:
+            total = cache.page_count()
+            self._page_count = total
+            numbers = range(1, total + 1) if self.pages is None else self.pages
+            for page_no in numbers:
+                if not 1 <= page_no <= total:
+                    continue
+                text = cache.text(page_no - 1)
+                if self.max_rss_mb:
+                    self._check_memory(cache)
+                yield page_no, text
+        finally:
+            # Runs on exhaustion, on `break` (generator close) and on errors
+            cache.close()
+            cache.report()
+
+
+def stream_pages(pdf_path, pages: Optional[Iterable[int]] = None, backend: Optional[str] = None,
+                 max_rss_mb: Optional[float] = DEFAULT_MAX_RSS_MB) -> Iterator[Tuple[int, str]]:
+    """Shorthand for iterating a PageStream with the default memory ceiling."""
+    return iter(PageStream(pdf_path, pages, backend, max_rss_mb))
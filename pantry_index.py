@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Pantry mode: which recipes can I make with these foods?
+
+Every recipe's food IDs (recipe_store.py) become a fixed-width bitset over
+the food set, bit i = i-th food ID in sorted order (the same order as the
+synergy graph), packed into WORD_BITS-bit words. The words are stored
+word-major, a W x N uint64 matrix, so each word of a query is one contiguous
+pass over all recipes. A pantry is one W-word mask:
+
+    missing = recipes & ~pantry          W x N
+    count   = popcount(missing)          summed over the W words
+
+Recipes with count <= k that use at least one pantry food are returned,
+fewest missing first, then most pantry foods used; the missing foods are
+decoded only for those rows. With ~210 foods W is 4, so even thousands of
+recipes are a few tens of KB and a query runs in microseconds.
+
+Food entries a recipe lists but the food store cannot resolve
+(Recipe.unresolved) cannot be checked against a pantry, so each one counts
+as missing; they are listed with each result as `unchecked`.
+
+The matrix is kept in .cache/index/pantry_index.pkl and rebuilt when a
+recipe file, the food set or the alias index changes.
+
+Usage:
+    from pantry_index import load_pantry_index
+
+    index = load_pantry_index()
+    index.query(['chickpeas', 'kale', 'garlic', 'lemons'], max_missing=2)
+
+    python pantry_index.py chickpeas kale garlic "sweet potato" [--missing 2] [-n 10]
+    python pantry_index.py --benchmark [--scale 5000]
+"""
+import hashlib
+import pickle
+import sys
+import time
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from page_cache import _atomic_pickle
+from page_store import STORE_DIR
+
+# === CONFIGURATION ===
+INDEX_FILE = STORE_DIR / 'pantry_index.pkl'
+INDEX_VERSION = 1
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+
+
+def _popcount(words):
+    """Set bits per element of a uint64 array."""
+    import numpy as np
+
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words)
+    # numpy < 2.0: byte lookup table
+    table = np.array([bin(b).count('1') for b in range(256)], dtype=np.uint8)
+    return table[words.view(np.uint8).reshape(*words.shape, 8)].sum(axis=-1, dtype=np.uint8)
+
+
+class PantryMatch(NamedTuple):
+    recipe_id: str
+    name: str
+    missing: Tuple[str, ...]        # food IDs the pantry lacks
+    used: int                       # recipe foods the pantry has
+    unchecked: Tuple[str, ...]      # recipe entries that name no known food, counted as missing
+
+
+class PantryIndex:
+    """Recipe bitsets over the sorted food IDs, stored word-major (W x N uint64)."""
+
+    def __init__(self, food_ids: List[str], recipe_ids: List[str], names: List[str],
+                 unresolved: List[Tuple[str, ...]], bits, digest: str = ''):
+        import numpy as np
+
+        self.food_ids = food_ids
+        self.food_index = {food_id: i for i, food_id in enumerate(food_ids)}
+        self.recipe_ids = recipe_ids
+        self.names = names
+        self.unresolved = unresolved
+        self.bits = np.ascontiguousarray(bits, dtype=np.uint64)
+        self.sizes = _popcount(self.bits).sum(axis=0, dtype=np.int32)
+        self.unchecked = np.array([len(entries) for entries in unresolved], dtype=np.int32)
+        self.digest = digest
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    @property
+    def words(self) -> int:
+        return self.bits.shape[0]
+
+    def mask(self, food_ids: Iterable[str]) -> int:
+        """Bitset of the given food IDs as a Python int; unknown IDs are ignored."""
+        mask = 0
+        for food_id in food_ids:
+            i = self.food_index.get(food_id)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def recipe_mask(self, r: int) -> int:
+        """Bitset of recipe r as a Python int."""
+        return int.from_bytes(self.bits[:, r].tobytes(), 'little')
+
+    def decode(self, mask: int) -> Tuple[str, ...]:
+        """Food IDs of a bitset, in food order."""
+        found = []
+        while mask:
+            low = mask & -mask
+            found.append(self.food_ids[low.bit_length() - 1])
+            mask ^= low
+        return tuple(found)
+
+    def query(self, pantry: Iterable[str], max_missing: int = 0, limit: Optional[int] = None) -> List[PantryMatch]:
+        """Recipes missing at most `max_missing` foods (unresolved entries included) that use
+        at least one pantry food, best first."""
+        import numpy as np
+
+        mask = self.mask(pantry)
+        # One contiguous pass per word: popcount(recipe & ~pantry), summed over words
+        lacking = np.array([~(mask >> (w * WORD_BITS)) & WORD_MASK for w in range(self.words)], dtype=np.uint64)
+        lacks = _popcount(self.bits & lacking[:, None]).sum(axis=0, dtype=np.int32)
+        used = self.sizes - lacks
+        counts = lacks + self.unchecked
+        hits = np.flatnonzero((counts <= max_missing) & (used > 0))
+        # lexsort: last key is primary -> fewest missing, then most pantry foods used, then recipe order
+        hits = hits[np.lexsort((hits, -used[hits], counts[hits]))]
+        if limit is not None:
+            hits = hits[:limit]
+        results = []
+        for r in hits.tolist():
+            results.append(PantryMatch(self.recipe_ids[r], self.names[r], self.decode(self.recipe_mask(r) & ~mask),
+                                       int(used[r]), self.unresolved[r]))
+        return results
+
+    def save(self, index_file=INDEX_FILE) -> None:
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_pickle(index_file, (INDEX_VERSION, self.digest, self.food_ids, self.recipe_ids, self.names,
+                                    self.unresolved, self.bits))
+
+
+def build_pantry_index(recipes, food_ids: List[str], digest: str = '') -> PantryIndex:
+    import numpy as np
+
+    index = {food_id: i for i, food_id in enumerate(food_ids)}
+    words = max(1, -(-len(food_ids) // WORD_BITS))
+    bits = np.zeros((words, len(recipes)), dtype=np.uint64)
+    for r, recipe in enumerate(recipes):
+        mask = 0
+        for food_id in recipe.foods:
+            if food_id in index:
+                mask |= 1 << index[food_id]
+        bits[:, r] = [(mask >> (w * WORD_BITS)) & WORD_MASK for w in range(words)]
+    return PantryIndex(food_ids, [r.id for r in recipes], [r.name for r in recipes],
+                       [r.unresolved for r in recipes], bits, digest)
+
+
+def _source_digest(food_ids: List[str], alias_hash: str, recipes_dir) -> str:
+    """Hash of the food set, the alias index and every recipe file's (name, mtime, size)."""
+    from recipe_store import recipes_digest
+
+    digest = hashlib.sha256(alias_hash.encode('ascii'))
+    digest.update('\n'.join(food_ids).encode('utf-8'))
+    digest.update(recipes_digest(recipes_dir).encode('ascii'))
+    return digest.hexdigest()
+
+
+_loaded: Optional[PantryIndex] = None
+
+
+def load_pantry_index(rebuild: bool = False, index_file=INDEX_FILE) -> PantryIndex:
+    """The stored index, checked against the recipe files and food set once per process."""
+    global _loaded
+    if _loaded is not None and not rebuild:
+        return _loaded
+
+    from alias_index import load_alias_index
+    from food_store import load_food_store
+    from recipe_store import RECIPES_DIR, load_recipes
+
+    food_ids = sorted(load_food_store())
+    digest = _source_digest(food_ids, load_alias_index().hash, RECIPES_DIR)
+
+    if not rebuild and index_file.exists():
+        try:
+            with open(index_file, 'rb') as f:
+                version, stored_digest, *state = pickle.load(f)
+            if version == INDEX_VERSION and stored_digest == digest:
+                _loaded = PantryIndex(*state, digest=digest)
+                return _loaded
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            pass
+
+    _loaded = build_pantry_index(load_recipes(), food_ids, digest)
+    _loaded.save(index_file)
+    print(f'pantry index: {len(_loaded)} recipes x {len(food_ids)} foods '
+          f'({_loaded.words} words) -> {index_file}', file=sys.stderr)
+    return _loaded
+
+
+def resolve_pantry(items: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """(food IDs, items that name no known food) for free-text pantry items."""
+    from food_store import load_food_store
+
+    store = load_food_store()
+    foods, unknown = [], []
+    for item in items:
+        food = store.lookup(item)
+        if food is None:
+            unknown.append(item)
+        elif food.id not in foods:
+            foods.append(food.id)
+    return foods, unknown
+
+
+def benchmark(index: PantryIndex, scale: int, repeat: int = 200) -> None:
+    """Time queries against the real index and one tiled up to `scale` recipes."""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    pantry = [index.food_ids[i] for i in rng.choice(len(index.food_ids), size=40, replace=False)]
+    reps = -(-scale // max(len(index), 1))
+    tiled = PantryIndex(index.food_ids, (index.recipe_ids * reps)[:scale], (index.names * reps)[:scale],
+                        (index.unresolved * reps)[:scale], np.tile(index.bits, (1, reps))[:, :scale])
+    for label, target in (('real', index), ('tiled', tiled)):
+        for k in (0, 3):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                found = target.query(pantry, max_missing=k, limit=10)
+            elapsed = (time.perf_counter() - start) / repeat
+            print(f'{label:5s} {len(target):6d} recipes, missing <= {k}: '
+                  f'{elapsed * 1e6:7.1f} us/query ({len(found)} returned)')
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Recipes makeable from a pantry of foods')
+    parser.add_argument('foods', nargs='*', help='food IDs, names or aliases')
+    parser.add_argument('--missing', type=int, default=0, help='allow this many missing foods (default: 0)')
+    parser.add_argument('-n', type=int, default=20, help='results to show (default: %(default)s)')
+    parser.add_argument('--rebuild', action='store_true')
+    parser.add_argument('--benchmark', action='store_true', help='time queries, also against a tiled index')
+    parser.add_argument('--scale', type=int, default=5000, help='recipes in the tiled benchmark index')
+    args = parser.parse_args(argv)
+
+    try:
+        index = load_pantry_index(rebuild=args.rebuild)
+    except ImportError as e:
+        print(f'Error: {e} (the pantry index needs NumPy)', file=sys.stderr)
+        return 1
+    if args.benchmark:
+        benchmark(index, args.scale)
+        return 0
+    if not args.foods:
+        parser.error('give at least one pantry food')
+
+    pantry, unknown = resolve_pantry(args.foods)
+    if unknown:
+        print(f'Unknown foods (ignored): {", ".join(unknown)}', file=sys.stderr)
+    print(f'Pantry: {", ".join(pantry)}')
+    matches = index.query(pantry, args.missing, args.n)
+    if not matches:
+        print(f'No recipe is missing {args.missing} or fewer foods.')
+    for match in matches:
+        missing = f'missing {", ".join(match.missing)}' if match.missing else 'nothing missing'
+        print(f'  {match.recipe_id}  {match.name[:45]:45s}  uses {match.used}, {missing}')
+        if match.unchecked:
+            print(f'      also lists (counted as missing): {", ".join(match.unchecked)}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
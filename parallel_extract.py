@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Parallel whole-book extraction across a process pool.
+
+Page ranges are split into contiguous chunks and spread across worker
+processes; each worker opens its own reader (through PageCache, so decoded
+pages also land in the shared cache). Results are reassembled in page order,
+so the dump is byte-identical to a serial run.
+
+Usage:
+    python parallel_extract.py --start 1 --end 386 -o all_pages.txt
+    python parallel_extract.py --start 201 --end 270 --workers 1   # serial
+    python parallel_extract.py --verify                            # compare serial vs parallel
+"""
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from page_cache import CACHE_DIR, PageCache, find_pdf
+from pdf_backend import BACKENDS, MODES
+
+# Page headers used by the existing dumps: the ={80} block (optionally with a
+# " - Found: ..." suffix) and the older "=== PAGE N ===" line
+DUMP_HEADER_RE = re.compile(r'^(?:={80}\nPAGE (\d+)[^\n]*\n={80}\n|=== PAGE (\d+) ===\n)', re.MULTILINE)
+
+# Chunks per worker; more chunks balance uneven pages better, fewer cost less IPC
+CHUNKS_PER_WORKER = 4
+
+_worker_cache: Optional[PageCache] = None
+
+
+def _init_worker(pdf_path, backend, cache_dir):
+    """Give each worker process its own reader/cache."""
+    global _worker_cache
+    _worker_cache = PageCache(pdf_path, backend, cache_dir)
+
+
+def _extract_chunk(indices: List[int]) -> Tuple[List[Tuple[int, str]], Tuple[int, int, float]]:
+    cache = _worker_cache
+    before = (cache.hits, cache.misses, cache.decode_seconds)
+    texts = list(cache.texts(indices))
+    return texts, (cache.hits - before[0], cache.misses - before[1], cache.decode_seconds - before[2])
+
+
+def _chunks(indices: List[int], count: int) -> List[List[int]]:
+    size = max(1, -(-len(indices) // count))
+    return [indices[i:i + size] for i in range(0, len(indices), size)]
+
+
+def extract_pages(pdf_path, start_page: int, end_page: int, workers: Optional[int] = None,
+                  backend: Optional[str] = None, cache_dir=CACHE_DIR) -> Dict[int, str]:
+    """Extract text for 1-indexed pages start_page..end_page (inclusive).
+
+    Returns {page_number: text} in page order. workers=1 runs in-process.
+    """
+    with PageCache(pdf_path, backend, cache_dir) as cache:
+        end_page = min(end_page, cache.page_count())
+        indices = list(range(start_page - 1, end_page))
+        backend = cache.backend
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = max(1, min(workers, len(indices)))
+
+        if workers == 1:
+            return {i + 1: text for i, text in cache.texts(indices)}
+
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cache.pdf_path, backend, cache_dir)) as pool:
+            for texts, (hits, misses, seconds) in pool.map(_extract_chunk, _chunks(indices, workers * CHUNKS_PER_WORKER)):
+                cache.hits += hits
+                cache.misses += misses
+                cache.decode_seconds += seconds
+                results.update((i + 1, text) for i, text in texts)
+
+    return dict(sorted(results.items()))
+
+
+def format_page(page_num: int, text: str) -> str:
+    """One page block in the pages_201_270.txt dump format."""
+    return f"\n{'='*80}\nPAGE {page_num}\n{'='*80}\n\n{text}\n"
+
+
+def write_dump(output_file, text_by_page: Dict[int, str]):
+    """Write pages as an ordered `PAGE N` dump."""
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for page_num in sorted(text_by_page):
+            f.write(format_page(page_num, text_by_page[page_num]))
+
+
+def read_dump(dump_file) -> Dict[int, str]:
+    """Parse a `PAGE N` dump back into {page_number: text}.
+
+    Inverse of write_dump() for its own output; also reads the older
+    "=== PAGE N ===" dumps. Later blocks for the same page win.
+    """
+    with open(dump_file, 'r', encoding='utf-8') as f:
+        return parse_dump(f.read())
+
+
+def parse_dump(content: str) -> Dict[int, str]:
+    """read_dump() for dump text already in memory."""
+    headers = list(DUMP_HEADER_RE.finditer(content))
+    text_by_page = {}
+    for header, following in zip(headers, headers[1:] + [None]):
+        page_num = int(header.group(1) or header.group(2))
+        end = following.start() if following else len(content)
+        text = content[header.end():end]
+        if header.group(1):
+            # write_dump framing: blank line after the header, newline after the text
+            text = text[1:] if text.startswith('\n') else text
+            text = text[:-2] if text.endswith('\n\n') else text.rstrip('\n')
+        else:
+            text = text.rstrip('\n')
+        text_by_page[page_num] = text
+    return text_by_page
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Extract cookbook pages in parallel')
+    parser.add_argument('--start', type=int, default=1, help='first page (1-indexed)')
+    parser.add_argument('--end', type=int, default=386, help='last page (inclusive)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--backend', choices=sorted(MODES) + list(BACKENDS))
+    parser.add_argument('-o', '--output', help='dump file (default: stdout)')
+    parser.add_argument('--verify', action='store_true',
+                        help='decode serially and in parallel (cache bypassed) and compare the dumps')
+    args = parser.parse_args(argv)
+
+    pdf_path = find_pdf()
+    if not pdf_path:
+        print("No PDF found!", file=sys.stderr)
+        sys.exit(1)
+
+    if args.verify:
+        import tempfile
+
+        dumps = {}
+        for label, workers in (('serial', 1), ('parallel', args.workers)):
+            with tempfile.TemporaryDirectory() as tmp:
+                start = time.perf_counter()
+                pages = extract_pages(pdf_path, args.start, args.end, workers, args.backend, cache_dir=tmp)
+                elapsed = time.perf_counter() - start
+            dumps[label] = ''.join(format_page(n, t) for n, t in pages.items())
+            print(f'{label:8s} {len(pages)} pages in {elapsed:.2f}s ({len(pages) / elapsed:.1f} pages/sec)')
+        identical = dumps['serial'] == dumps['parallel']
+        print('Output identical' if identical else 'OUTPUT DIFFERS')
+        sys.exit(0 if identical else 1)
+
+    start = time.perf_counter()
+    pages = extract_pages(pdf_path, args.start, args.end, args.workers, args.backend)
+    print(f'Extracted {len(pages)} pages in {time.perf_counter() - start:.2f}s', file=sys.stderr)
+
+    if args.output:
+        write_dump(args.output, pages)
+        print(f'Text saved to {args.output}', file=sys.stderr)
+    else:
+        for page_num, text in pages.items():
+            sys.stdout.write(format_page(page_num, text))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,200 +2,50 @@
 """Parse recipes from pages 201-270 and create JSON files."""
 
 import json
-import re
-from pathlib import Path
 from typing import Dict, List, Tuple
 
-# Configuration
-EXTRACTED_TEXT = Path("/Users/dragan/Documents/how-not-to-diet/pages_201_270.txt")
-FOODS_DIR = Path("/Users/dragan/Documents/how-not-to-diet/data/foods")
-OUTPUT_DIR = Path("/Users/dragan/Documents/how-not-to-diet/data/recipes")
-START_RECIPE_NUM = 30
+from category_rules import daily_dozen_coverage, tweak_coverage
+from food_store import load_food_store
+from match_memo import default_memo
+from page_cache import BASE_DIR
+from parallel_extract import parse_dump
+from recipe_build import build_recipes
+from recipe_store import RECIPES_DIR
+from synergy_graph import load_synergy_graph
 
-# Create output directory
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# Configuration
+EXTRACTED_TEXT = BASE_DIR / "pages_201_270.txt"
+OUTPUT_DIR = RECIPES_DIR
+# Recipe IDs and rebuilds are tracked in OUTPUT_DIR/build-manifest.json (recipe_build.py);
+# bump BUILD_VERSION when the recipe JSON produced here changes
+BUILD_SOURCE = "pages_201_270"
+BUILD_VERSION = "1"
 
 # Load food database
 def load_foods() -> Dict:
-    """Load all foods from the foods directory."""
-    foods = {}
-    food_names_to_ids = {}
-
-    for food_file in FOODS_DIR.glob("*.json"):
-        with open(food_file, 'r') as f:
-            food_data = json.load(f)
-            food_id = food_file.stem
-            foods[food_id] = food_data
-
-            # Create lookup by name
-            if 'name' in food_data:
-                name_lower = food_data['name'].lower()
-                food_names_to_ids[name_lower] = food_id
-
-                # Add common variations
-                if name_lower == 'chickpeas':
-                    food_names_to_ids['chickpea'] = food_id
-                elif name_lower == 'kale':
-                    food_names_to_ids['kale'] = food_id
-                    food_names_to_ids['dark leafy greens'] = food_id
-
-    return foods, food_names_to_ids
-
-def parse_recipes_from_text(text: str) -> List[Dict]:
-    """Parse recipes from extracted text."""
-    recipes = []
-
-    # Split by page markers
-    pages = text.split("="*80)
-
-    current_recipe = None
-    in_ingredients = False
-    in_instructions = False
-
-    for i, page_text in enumerate(pages):
-        if not page_text.strip():
-            continue
-
-        lines = page_text.strip().split('\n')
-
-        for line_idx, line in enumerate(lines):
-            line = line.strip()
-
-            # Detect recipe title (ALL CAPS or Title Case, with MAKES: and DIFFICULTY:)
-            if 'MAKES:' in line and 'DIFFICULTY:' in line:
-                # Look back for the recipe title (previous non-empty line)
-                title_line = None
-                for back_idx in range(line_idx - 1, max(0, line_idx - 5), -1):
-                    if lines[back_idx].strip() and lines[back_idx].strip() != "":
-                        title_line = lines[back_idx].strip()
-                        break
-
-                if title_line:
-                    # Save previous recipe
-                    if current_recipe:
-                        recipes.append(current_recipe)
-
-                    # Parse servings and difficulty
-                    servings_match = re.search(r'MAKES:\s*(\d+)\s*(?:to\s*(\d+))?\s*servings?', line, re.IGNORECASE)
-                    difficulty_match = re.search(r'DIFFICULTY:\s*(\w+)', line, re.IGNORECASE)
-
-                    servings = servings_match.group(1) if servings_match else "4"
-                    servings_max = servings_match.group(2) if servings_match and servings_match.group(2) else servings
-                    difficulty = difficulty_match.group(1) if difficulty_match else "Moderate"
-
-                    # Get page number
-                    page_match = re.search(r'PAGE\s+(\d+)', '\n'.join(lines[:line_idx]))
-                    page_num = page_match.group(1) if page_match else "?"
-
-                    current_recipe = {
-                        "name": title_line.title(),
-                        "page": int(page_num) if page_num != "?" else None,
-                        "servings": f"{servings}-{servings_max}" if servings != servings_max else servings,
-                        "difficulty": difficulty,
-                        "ingredients_raw": [],
-                        "instructions_raw": [],
-                        "description": ""
-                    }
-                    in_ingredients = True
-                    in_instructions = False
-
-            # Collect description (text between MAKES line and ingredients)
-            elif current_recipe and not current_recipe.get("description") and line and not line.isupper():
-                if 'MAKES:' not in line and 'DIFFICULTY:' not in line:
-                    if line_idx > 0 and 'MAKES:' in lines[line_idx - 1]:
-                        current_recipe["description"] = line
-
-            # Detect start of instructions
-            elif line.startswith("Preheat") or line.startswith("Heat") or line.startswith("Place") or line.startswith("In a") or line.startswith("Using"):
-                in_ingredients = False
-                in_instructions = True
-                if current_recipe and line:
-                    current_recipe["instructions_raw"].append(line)
-
-            # Collect ingredients
-            elif current_recipe and in_ingredients and line:
-                # Ingredients usually start with amounts or ingredient names
-                if re.match(r'^[\d½⅓¼⅔¾⅛⅜⅝⅞]', line) or re.match(r'^[A-Z]', line):
-                    # Skip certain lines
-                    if not any(skip in line for skip in ['Preheat', 'Turn to', 'Hint:', '*', 'WHITE BEAN', 'TEMPEH']):
-                        current_recipe["ingredients_raw"].append(line)
-
-            # Collect instructions
-            elif current_recipe and in_instructions and line:
-                if not line.startswith("*") and not line.startswith("Hint:"):
-                    current_recipe["instructions_raw"].append(line)
-
-    # Add last recipe
-    if current_recipe:
-        recipes.append(current_recipe)
-
-    return recipes
-
-def match_ingredients_to_foods(ingredient_text: str, foods: Dict, food_lookup: Dict) -> List[str]:
-    """Match ingredient text to food database entries."""
-    matched_foods = []
-    ingredient_lower = ingredient_text.lower()
-
-    # Common ingredient mappings
-    ingredient_mappings = {
-        'chickpeas': 'chickpeas',
-        'chickpea': 'chickpeas',
-        'kale': 'kale',
-        'dark leafy greens': 'kale',
-        'carrots': 'carrots',
-        'carrot': 'carrots',
-        'cumin': 'cumin',
-        'tomatoes': 'cherry-tomatoes',
-        'cherry tomatoes': 'cherry-tomatoes',
-        'sweet potato': 'sweet-potatoes',
-        'sweet potatoes': 'sweet-potatoes',
-        'onion': 'onions',
-        'red onion': 'onions',
-        'garlic': 'garlic',
-        'black pepper': 'black-pepper',
-        'cranberries': 'cranberries-dried',
-        'celery': 'celery',
-        'lentils': 'lentils-brown-puy',
-        'brown lentils': 'lentils-brown-puy',
-        'black lentils': 'lentils-black-beluga',
-        'mushrooms': 'mushrooms-white',
-        'tempeh': 'tempeh',
-        'white beans': 'white-beans-cannellini',
-        'black beans': 'black-beans',
-        'peas': 'peas',
-        'parsley': 'parsley-fresh',
-        'fresh parsley': 'parsley-fresh',
-        'broccoli': 'broccoli',
-        'barley': 'barley',
-        'oats': 'oat-groats-whole-intact-oats',
-        'rye': 'rye-berries-whole',
-        'kabocha squash': 'kabocha-squash',
-        'butternut squash': 'butternut-squash',
-        'collards': 'collard-greens',
-        'miso': 'miso',
-        'nutritional yeast': 'nutritional-yeast',
-        'apple cider vinegar': 'apple-cider-vinegar',
-        'coriander': 'coriander-ground',
-        'ground coriander': 'coriander-ground',
-        'smoked paprika': 'smoked-paprika',
-        'sage': 'sage-dried',
-        'thyme': 'thyme-dried',
-        'rosemary': 'rosemary-dried',
-        'black-eyed beans': 'black-eyed-peas',
-        'beetroot': 'beetroot',
-        'beets': 'beetroot',
-        'red beans': 'red-beans-kidney',
-        'kidney beans': 'red-beans-kidney',
+    """Load all foods from the shared food store (aliases live in the alias index)."""
+    return load_food_store()
+
+def recipe_from_span(span) -> Dict:
+    """Recipe fields of one segmented RecipeSpan."""
+    if span.servings:
+        low, high = span.servings
+        servings = f"{low}-{high}" if low != high else str(low)
+    else:
+        servings = span.makes
+    return {
+        "name": span.name.title(),
+        "page": span.page,
+        "servings": servings,
+        "difficulty": span.difficulty,
+        "ingredients_raw": span.ingredients,
+        "instructions_raw": span.instructions,
+        "description": ' '.join(span.description)
     }
 
-    # Try direct mappings first
-    for key, food_id in ingredient_mappings.items():
-        if key in ingredient_lower:
-            if food_id in foods:
-                if food_id not in matched_foods:
-                    matched_foods.append(food_id)
-
-    return matched_foods
+def match_ingredients_to_foods(ingredient_text: str, foods: Dict) -> List[str]:
+    """Match ingredient text to food database entries."""
+    return [food_id for food_id in default_memo().foods(ingredient_text) if food_id in foods]
 
 def determine_meal_type(recipe_name: str, page: int) -> str:
     """Determine meal type based on recipe name and context."""
@@ -215,171 +65,109 @@ def determine_meal_type(recipe_name: str, page: int) -> str:
     else:
         return 'dinner'  # Default
 
-def calculate_daily_dozen(matched_foods: List[str], foods: Dict) -> List[str]:
+def calculate_daily_dozen(matched_foods: List[str]) -> List[str]:
     """Calculate Daily Dozen categories covered by recipe."""
-    daily_dozen = []
-
-    for food_id in matched_foods:
-        if food_id in foods:
-            food_data = foods[food_id]
-            categories = food_data.get('categories', [])
-
-            # Map categories to Daily Dozen
-            if 'rich-in-legumes' in categories or 'legumes' in categories:
-                if 'beans' not in daily_dozen:
-                    daily_dozen.append('beans')
-            if 'cruciferous' in categories:
-                if 'cruciferous-vegetables' not in daily_dozen:
-                    daily_dozen.append('cruciferous-vegetables')
-            if 'greens' in categories:
-                if 'greens' not in daily_dozen:
-                    daily_dozen.append('greens')
-            if 'rich-in-vegetables' in categories:
-                if 'other-vegetables' not in daily_dozen:
-                    daily_dozen.append('other-vegetables')
-            if 'berries' in categories:
-                if 'berries' not in daily_dozen:
-                    daily_dozen.append('berries')
-            if 'whole-grains' in categories:
-                if 'whole-grains' not in daily_dozen:
-                    daily_dozen.append('whole-grains')
-            if 'nuts-and-seeds' in categories:
-                if 'nuts-and-seeds' not in daily_dozen:
-                    daily_dozen.append('nuts-and-seeds')
-
-    return daily_dozen
-
-def extract_tweaks(matched_foods: List[str], foods: Dict, recipe_data: Dict) -> List[str]:
+    return daily_dozen_coverage(matched_foods)
+
+def extract_tweaks(matched_foods: List[str], recipe_data: Dict) -> List[str]:
     """Extract 21 Tweaks incorporated in recipe."""
-    tweaks = []
-
-    for food_id in matched_foods:
-        if food_id in foods:
-            food_data = foods[food_id]
-            categories = food_data.get('categories', [])
-
-            # Map to 21 Tweaks
-            if 'weight-loss-booster' in categories:
-                if 'spices' not in tweaks:
-                    tweaks.append('spices')
-            if food_id == 'apple-cider-vinegar' or 'vinegar' in food_id:
-                if 'vinegar' not in tweaks:
-                    tweaks.append('vinegar')
-            if 'high-fiber' in categories:
-                if 'fiber' not in tweaks:
-                    tweaks.append('fiber')
-            if 'negative-calorie' in categories:
-                if 'negative-calorie-foods' not in tweaks:
-                    tweaks.append('negative-calorie-foods')
-
-    # Check recipe name for meal timing
-    name_lower = recipe_data.get('name', '').lower()
-    if 'breakfast' in name_lower:
-        tweaks.append('meal-timing-breakfast')
-
-    return tweaks
+    return tweak_coverage(matched_foods, recipe_data.get('name', ''))
 
 def extract_synergies(matched_foods: List[str], foods: Dict) -> List[Dict]:
     """Extract food synergies from matched foods."""
-    all_synergies = []
-
-    for food_id in matched_foods:
-        if food_id in foods:
-            food_data = foods[food_id]
-            synergies = food_data.get('synergies', [])
-
-            # Check which synergies are present in this recipe
-            for synergy in synergies:
-                # Normalize synergy name for matching
-                synergy_normalized = synergy.lower().replace('-', ' ').replace('_', ' ')
-
-                # Check if synergy food is in recipe
-                for other_food_id in matched_foods:
-                    if other_food_id != food_id:
-                        other_food_name = foods[other_food_id].get('name', '').lower()
-                        if synergy_normalized in other_food_name or other_food_name in synergy_normalized:
-                            synergy_obj = {
-                                "food1": food_id,
-                                "food2": other_food_id,
-                                "benefit": f"{foods[food_id]['name']} + {foods[other_food_id]['name']}"
-                            }
-                            if synergy_obj not in all_synergies:
-                                all_synergies.append(synergy_obj)
-
-    return all_synergies
-
-def main():
-    print("Loading food database...")
-    foods, food_lookup = load_foods()
-    print(f"Loaded {len(foods)} foods")
-
-    print("\nReading extracted text...")
-    with open(EXTRACTED_TEXT, 'r') as f:
-        text = f.read()
+    return [
+        {
+            "food1": food_id,
+            "food2": other_food_id,
+            "benefit": f"{foods[food_id]['name']} + {foods[other_food_id]['name']}"
+        }
+        for food_id, other_food_id in load_synergy_graph().pairs(food_id for food_id in matched_foods if food_id in foods)
+    ]
 
-    print("Parsing recipes...")
-    recipes = parse_recipes_from_text(text)
-    print(f"Found {len(recipes)} recipes")
+def create_recipe(recipe: Dict, recipe_id: str, foods: Dict) -> Dict:
+    """Complete recipe JSON for one parsed recipe."""
+    print(f"\nProcessing: {recipe['name']}")
 
-    # Process each recipe
-    recipe_num = START_RECIPE_NUM
-    processed_recipes = []
+    # Match ingredients to foods
+    matched_foods = []
+    for ingredient in recipe['ingredients_raw']:
+        foods_in_ingredient = match_ingredients_to_foods(ingredient, foods)
+        matched_foods.extend(foods_in_ingredient)
+
+    # Remove duplicates while preserving order
+    matched_foods = list(dict.fromkeys(matched_foods))
+
+    # Calculate Daily Dozen coverage
+    daily_dozen = calculate_daily_dozen(matched_foods)
+
+    # Extract tweaks
+    tweaks = extract_tweaks(matched_foods, recipe)
+
+    # Extract synergies
+    synergies = extract_synergies(matched_foods, foods)
+
+    # Determine meal type
+    meal_type = determine_meal_type(recipe['name'], recipe.get('page', 0))
+
+    print(f"  - Page: {recipe['page']}")
+    print(f"  - Foods matched: {len(matched_foods)}")
+    print(f"  - Daily Dozen: {len(daily_dozen)} categories")
+    print(f"  - Tweaks: {len(tweaks)}")
+    print(f"  - Synergies: {len(synergies)}")
+
+    return {
+        "id": recipe_id,
+        "name": recipe['name'],
+        "page": recipe.get('page'),
+        "meal_type": meal_type,
+        "servings": recipe.get('servings', '4'),
+        "difficulty": recipe.get('difficulty', 'Moderate'),
+        "description": recipe.get('description', ''),
+        "ingredients_raw": recipe['ingredients_raw'],
+        "instructions": recipe['instructions_raw'],
+        "foods_used": matched_foods,
+        "daily_dozen_coverage": daily_dozen,
+        "tweaks_incorporated": tweaks,
+        "synergies": synergies
+    }
 
-    for recipe in recipes:
-        print(f"\nProcessing: {recipe['name']}")
-
-        # Match ingredients to foods
-        matched_foods = []
-        for ingredient in recipe['ingredients_raw']:
-            foods_in_ingredient = match_ingredients_to_foods(ingredient, foods, food_lookup)
-            matched_foods.extend(foods_in_ingredient)
-
-        # Remove duplicates while preserving order
-        matched_foods = list(dict.fromkeys(matched_foods))
-
-        # Calculate Daily Dozen coverage
-        daily_dozen = calculate_daily_dozen(matched_foods, foods)
-
-        # Extract tweaks
-        tweaks = extract_tweaks(matched_foods, foods, recipe)
-
-        # Extract synergies
-        synergies = extract_synergies(matched_foods, foods)
-
-        # Determine meal type
-        meal_type = determine_meal_type(recipe['name'], recipe.get('page', 0))
-
-        # Create recipe object
-        recipe_obj = {
-            "id": f"recipe-{recipe_num:03d}",
-            "name": recipe['name'],
-            "page": recipe.get('page'),
-            "meal_type": meal_type,
-            "servings": recipe.get('servings', '4'),
-            "difficulty": recipe.get('difficulty', 'Moderate'),
-            "description": recipe.get('description', ''),
-            "ingredients_raw": recipe['ingredients_raw'],
-            "instructions": recipe['instructions_raw'],
-            "foods_used": matched_foods,
-            "daily_dozen_coverage": daily_dozen,
-            "tweaks_incorporated": tweaks,
-            "synergies": synergies
-        }
+def main(argv=None):
+    import argparse
 
-        # Save to JSON file
-        output_file = OUTPUT_DIR / f"recipe-{recipe_num:03d}.json"
-        with open(output_file, 'w') as f:
-            json.dump(recipe_obj, f, indent=2)
+    parser = argparse.ArgumentParser(description="Parse recipes from pages 201-270 into data/recipes")
+    parser.add_argument('--force', action='store_true', help="re-parse and rewrite every recipe")
+    parser.add_argument('--prune', action='store_true',
+                        help="delete recipe files on these pages that no build manifest entry owns")
+    args = parser.parse_args(argv)
 
-        print(f"  - Page: {recipe['page']}")
-        print(f"  - Foods matched: {len(matched_foods)}")
-        print(f"  - Daily Dozen: {len(daily_dozen)} categories")
-        print(f"  - Tweaks: {len(tweaks)}")
-        print(f"  - Synergies: {len(synergies)}")
-        print(f"  - Saved to: {output_file}")
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-        processed_recipes.append(recipe_obj)
-        recipe_num += 1
+    print("Reading extracted text...")
+    with open(EXTRACTED_TEXT, 'r') as f:
+        pages = parse_dump(f.read())
+
+    # Foods are only loaded when some recipe actually needs re-parsing
+    loaded = []
+
+    def make_recipe(span, recipe_id: str) -> Dict:
+        if not loaded:
+            print("Loading food database...")
+            loaded.append(load_foods())
+            print(f"Loaded {len(loaded[0])} foods")
+        return create_recipe(recipe_from_span(span), recipe_id, loaded[0])
+
+    report = build_recipes(BUILD_SOURCE, pages, make_recipe, OUTPUT_DIR, BUILD_VERSION, force=args.force,
+                           prune=args.prune)
+    print(f"\n{report.summary()}")
+    for recipe_id in report.written:
+        print(f"  - Saved to: {OUTPUT_DIR / f'{recipe_id}.json'}")
+    if report.noop:
+        return
+
+    processed_recipes = []
+    for recipe_id in report.ids:
+        with open(OUTPUT_DIR / f"{recipe_id}.json", 'r') as f:
+            processed_recipes.append(json.load(f))
 
     # Create summary
     summary = {
@@ -416,5 +204,7 @@ def main():
     print(f"\nSummary saved to: {summary_file}")
     print(f"\nRecipe files saved in: {OUTPUT_DIR}")
 
+    default_memo().close()
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Unified PDF backend layer.
+
+Every script used to carry its own `try: import PyPDF2 ... except: import
+pdfplumber` block. This module owns that choice instead:
+
+    fast    PyPDF2 - quick, plain reading order
+    layout  pdfplumber - slower, keeps columns and spacing
+    auto    fast first, re-decoded with layout when the fast text looks broken
+            (empty, run-together words, (cid:NN) glyphs), layout is installed
+            and its measured per-page cost is still reasonable
+
+Pages are lazy: nothing is decoded until `extract_text()` is called, and the
+backend page object is dropped afterwards.
+
+Usage:
+    from pdf_backend import open_book
+
+    with open_book(pdf_path, 'auto') as book:
+        text = book.pages[201].extract_text()
+
+    python pdf_backend.py --benchmark [--pages 40]
+"""
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Canonical backend names (also the page-cache keys) and the module each needs
+BACKEND_MODULES = {'pypdf2': 'PyPDF2', 'pdfplumber': 'pdfplumber'}
+MODES = {'fast': 'pypdf2', 'layout': 'pdfplumber', 'auto': 'auto'}
+BACKENDS = ('pypdf2', 'pdfplumber', 'auto')
+
+# auto mode: fast text scoring below this is re-decoded with the layout backend...
+QUALITY_THRESHOLD = 0.6
+# ...unless layout has measured more than this many times slower and fast text is non-empty
+AUTO_COST_RATIO = 20.0
+# Tokens longer than this are almost always words glued together by a bad decode
+LONG_TOKEN = 24
+
+_CID_RE = re.compile(r'\(cid:\d+\)')
+
+
+@lru_cache(maxsize=None)
+def available(backend: str) -> bool:
+    try:
+        __import__(BACKEND_MODULES[backend])
+        return True
+    except ImportError:
+        return False
+
+
+def default_backend(prefer: Tuple[str, ...] = ('pypdf2', 'pdfplumber')) -> str:
+    """First installed backend in `prefer` order (PyPDF2, then pdfplumber)."""
+    for backend in prefer:
+        if available(backend):
+            return backend
+    raise ImportError('Neither PyPDF2 nor pdfplumber is installed')
+
+
+def resolve(mode: Optional[str]) -> str:
+    """Map a mode ('fast'/'layout'/'auto') or backend name to a canonical backend."""
+    if mode is None:
+        return default_backend()
+    backend = MODES.get(mode, mode)
+    if backend not in BACKENDS:
+        raise ValueError(f'Unknown PDF backend {mode!r}, expected one of {sorted(MODES) + list(BACKENDS)}')
+    return backend
+
+
+def text_quality(text: str) -> float:
+    """Rough 0..1 score of how readable an extracted page is."""
+    if not text or not text.strip():
+        return 0.0
+    tokens = text.split()
+    letters = sum(c.isalpha() or c.isspace() for c in text) / len(text)
+    long_tokens = sum(len(t) > LONG_TOKEN for t in tokens) / len(tokens)
+    junk = (len(_CID_RE.findall(text)) + text.count('�')) / len(tokens)
+    return max(0.0, letters * (1 - long_tokens) * (1 - min(junk, 1.0)))
+
+
+class _Reader:
+    """One opened document for one concrete backend."""
+
+    def __init__(self, pdf_path, backend: str):
+        self.backend = backend
+        self._file = None
+        if backend == 'pypdf2':
+            import PyPDF2
+            self._file = open(pdf_path, 'rb')
+            self._doc = PyPDF2.PdfReader(self._file)
+        else:
+            import pdfplumber
+            self._doc = pdfplumber.open(pdf_path)
+
+    def __len__(self):
+        return len(self._doc.pages)
+
+    def extract_text(self, index: int) -> str:
+        page = self._doc.pages[index]
+        text = page.extract_text() or ''
+        # pdfplumber keeps parsed layout objects per page; release them
+        flush = getattr(page, 'flush_cache', None) or getattr(page, 'close', None)
+        if self.backend == 'pdfplumber' and flush:
+            flush()
+        return text
+
+    def outline(self) -> List[Tuple[str, int]]:
+        """Top-level bookmarks as (title, 0-based page index); PyPDF2 only."""
+        if self.backend != 'pypdf2':
+            return []
+        doc = self._doc
+        entries = getattr(doc, 'outline', None)
+        if entries is None:
+            entries = getattr(doc, 'outlines', [])
+        result = []
+        for entry in entries:
+            # Nested lists are child bookmarks (individual recipes etc.)
+            if isinstance(entry, list):
+                continue
+            try:
+                result.append((str(entry.title), doc.get_destination_page_number(entry)))
+            except Exception:
+                continue
+        return result
+
+    def close(self):
+        if self.backend == 'pdfplumber':
+            self._doc.close()
+        if self._file is not None:
+            self._file.close()
+
+
+class LazyPage:
+    """A page that is only decoded when its text is requested."""
+
+    __slots__ = ('_book', 'index')
+
+    def __init__(self, book: 'Book', index: int):
+        self._book = book
+        self.index = index
+
+    @property
+    def number(self) -> int:
+        return self.index + 1
+
+    def extract_text(self) -> str:
+        return self._book.extract_text(self.index)
+
+
+class _Pages:
+    """Sequence of LazyPage objects, created on access."""
+
+    def __init__(self, book: 'Book'):
+        self._book = book
+
+    def __len__(self):
+        return len(self._book)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [LazyPage(self._book, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f'page index {index} out of range')
+        return LazyPage(self._book, index)
+
+    def __iter__(self):
+        return (LazyPage(self._book, i) for i in range(len(self)))
+
+
+class Book:
+    """An opened PDF exposing `pages[i].extract_text()` for any backend/mode."""
+
+    def __init__(self, pdf_path, mode: Optional[str] = None):
+        self.pdf_path = str(pdf_path)
+        self.backend = resolve(mode)
+        self._readers: Dict[str, _Reader] = {}
+        # Per-backend [pages decoded, seconds spent] - used by auto mode and benchmarks
+        self.timings: Dict[str, list] = {}
+        # auto mode: which backend produced each page
+        self.choices: Dict[int, str] = {}
+        self.pages = _Pages(self)
+
+    def _reader(self, backend: str) -> _Reader:
+        if backend not in self._readers:
+            self._readers[backend] = _Reader(self.pdf_path, backend)
+        return self._readers[backend]
+
+    def __len__(self):
+        backend = self.backend if self.backend != 'auto' else default_backend()
+        return len(self._reader(backend))
+
+    def _decode(self, backend: str, index: int) -> str:
+        start = time.perf_counter()
+        text = self._reader(backend).extract_text(index)
+        stats = self.timings.setdefault(backend, [0, 0.0])
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
+        return text
+
+    def extract_text(self, index: int) -> str:
+        if self.backend != 'auto':
+            return self._decode(self.backend, index)
+
+        fast = default_backend()
+        try:
+            text = self._decode(fast, index)
+        except Exception as e:
+            print(f'{fast} failed on page {index + 1}: {e}', file=sys.stderr)
+            text = ''
+        choice = fast
+
+        if text_quality(text) < QUALITY_THRESHOLD and self._layout_affordable(fast, text):
+            layout_text = self._decode('pdfplumber', index)
+            if text_quality(layout_text) > text_quality(text):
+                text, choice = layout_text, 'pdfplumber'
+
+        self.choices[index] = choice
+        return text
+
+    def _layout_affordable(self, fast: str, text: str) -> bool:
+        if fast == 'pdfplumber' or not available('pdfplumber'):
+            return False
+        if not text.strip():
+            return True
+        fast_cost, layout_cost = self.cost_per_page(fast), self.cost_per_page('pdfplumber')
+        if not fast_cost or layout_cost is None:
+            return True
+        return layout_cost / fast_cost <= AUTO_COST_RATIO
+
+    def outline(self) -> List[Tuple[str, int]]:
+        """The PDF's top-level bookmarks, or [] when it has none (or PyPDF2 is missing)."""
+        if not available('pypdf2'):
+            return []
+        return self._reader('pypdf2').outline()
+
+    def cost_per_page(self, backend: str) -> Optional[float]:
+        """Measured mean seconds per page for a backend, if it has been used."""
+        count, seconds = self.timings.get(backend, (0, 0.0))
+        return seconds / count if count else None
+
+    def close(self):
+        for reader in self._readers.values():
+            reader.close()
+        self._readers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_book(pdf_path, mode: Optional[str] = None) -> Book:
+    """Open a PDF with 'fast', 'layout', 'auto' (or a backend name); default is fast."""
+    return Book(pdf_path, mode)
+
+
+def benchmark(pdf_path, indices: Optional[Iterable[int]] = None, modes=('fast', 'layout', 'auto')) -> Dict[str, Dict]:
+    """Decode the same pages with each mode and report pages/sec and mean quality."""
+    results = {}
+    for mode in modes:
+        backend = MODES[mode]
+        if backend != 'auto' and not available(backend):
+            print(f'{mode:7s} skipped ({BACKEND_MODULES[backend]} not installed)', file=sys.stderr)
+            continue
+
+        with open_book(pdf_path, mode) as book:
+            pages = list(indices) if indices is not None else list(range(len(book)))
+            start = time.perf_counter()
+            quality = sum(text_quality(book.extract_text(i)) for i in pages)
+            elapsed = time.perf_counter() - start
+            results[mode] = {
+                'pages': len(pages),
+                'seconds': round(elapsed, 3),
+                'pages_per_sec': round(len(pages) / elapsed, 1) if elapsed else float('inf'),
+                'mean_quality': round(quality / len(pages), 3) if pages else 0.0,
+            }
+            if mode == 'auto':
+                results[mode]['layout_pages'] = sum(1 for b in book.choices.values() if b == 'pdfplumber')
+    return results
+
+
+def main(argv=None):
+    import argparse
+
+    from page_cache import find_pdf
+
+    parser = argparse.ArgumentParser(description='PDF backend benchmark')
+    parser.add_argument('--benchmark', action='store_true', help='report pages/sec for each backend')
+    parser.add_argument('--pages', type=int, default=None, help='only benchmark the first N pages')
+    args = parser.parse_args(argv)
+
+    pdf_path = find_pdf()
+    if not pdf_path:
+        print('No PDF found!', file=sys.stderr)
+        sys.exit(1)
+
+    if not args.benchmark:
+        parser.print_help()
+        return
+
+    indices = range(args.pages) if args.pages else None
+    print(f"{'mode':8s} {'pages':>6s} {'seconds':>8s} {'pages/sec':>10s} {'quality':>8s}")
+    for mode, r in benchmark(pdf_path, indices).items():
+        extra = f"  ({r['layout_pages']} pages via layout)" if 'layout_pages' in r else ''
+        print(f"{mode:8s} {r['pages']:6d} {r['seconds']:8.2f} {r['pages_per_sec']:10.1f} {r['mean_quality']:8.3f}{extra}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Manifest-driven incremental recipe build.
+
+extract_all_recipes_120_200.py and parse_recipes_201_270.py used to
+re-parse every recipe and rewrite every recipe-NNN.json on each run, and
+numbered recipes from fixed offsets (recipe-001 up for pages 120-200,
+recipe-030 up for 201-270), so a recipe's ID depended on its position and
+runs over overlapping ranges could overwrite each other's files.
+
+Both scripts now hand their pages and a recipe function to build_recipes(),
+which keeps data/recipes/build-manifest.json:
+
+    sources    per script: its page hashes (SHA-256 of the raw page text),
+               the alias-index hash, the matcher fingerprint, the food data
+               digest and the builder version it was last built with, and
+               its recipe IDs
+    recipes    per recipe ID: content key, source, its own page hashes, the
+               hash of all its inputs, and the SHA-256 of the written file
+    ids        content key -> recipe ID
+
+A run then works in three tiers:
+
+    no-op      nothing the source depends on changed and every file it
+               wrote is still there: return without segmenting anything
+    skip       segmenting is needed, but a recipe's own pages, the aliases,
+               the matcher, the food data and the builder version are
+               unchanged
+    rebuild    only the remaining recipes go through the recipe function,
+               and a file is rewritten only when its JSON text changed
+
+IDs come from the recipe's content key (its name, case- and
+punctuation-folded), not from its position. The first build adopts the ID of
+an existing file with the same key, so recipe-030 stays recipe-030, or else
+of a file on one of the recipe's pages whose key is a run of words of the
+recipe's or the other way round (older passes named page 134 'Lentil
+Bolognese', the segmenter 'Courgette Linguine with Mushroom-Lentil
+Bolognese'). A recipe seen for the first time gets recipe-<8 hex digits of
+the key's SHA-1>. A key already owned by another source (the same recipe on
+overlapping dump pages) is left to that source.
+
+Recipes a source no longer produces are reported, not deleted. Recipe files
+on a source's pages that no manifest entry owns are reported as orphans;
+they are deleted only with prune=True (the scripts' --prune).
+
+Usage:
+    from recipe_build import build_recipes
+
+    report = build_recipes('pages_201_270', raw_pages, make_recipe, output_dir=OUTPUT_DIR,
+                           version=BUILD_VERSION)
+    report.written, report.unchanged, report.skipped
+
+    python recipe_build.py status [--output-dir data/recipes]    # also lists orphans
+"""
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Collection, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from page_cache import _atomic_write
+
+# === CONFIGURATION ===
+MANIFEST_NAME = 'build-manifest.json'
+MANIFEST_VERSION = 1
+ID_HASH_LENGTH = 8
+
+_KEY_RE = re.compile(r'[a-z0-9]+')
+
+
+def content_key(name: str) -> str:
+    """Stable key of a recipe name: lowercase alphanumeric words joined by '-'."""
+    return '-'.join(_KEY_RE.findall(name.lower()))
+
+
+def content_id(key: str) -> str:
+    return f'recipe-{hashlib.sha1(key.encode("utf-8")).hexdigest()[:ID_HASH_LENGTH]}'
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _inputs_hash(environment: Dict, page_hashes: List[str]) -> str:
+    return _sha256(json.dumps([environment, page_hashes], sort_keys=True))
+
+
+def build_environment(version: str) -> Dict[str, str]:
+    """Everything besides page text a recipe depends on."""
+    from alias_index import load_alias_index
+    from food_matcher import matcher_fingerprint
+    from synergy_graph import load_synergy_graph
+
+    # The synergy graph digest covers every food's categories, synergies and conflicts
+    return {'version': version, 'aliases': load_alias_index().hash, 'matcher': matcher_fingerprint(),
+            'foods': load_synergy_graph().digest}
+
+
+class BuildReport:
+    def __init__(self, source: str):
+        self.source = source
+        self.noop = False
+        self.ids: List[str] = []            # every recipe of the source, in page order
+        self.written: List[str] = []        # re-parsed, file changed
+        self.unchanged: List[str] = []      # re-parsed, identical output
+        self.skipped: List[str] = []        # inputs unchanged, not re-parsed
+        self.shadowed: List[str] = []       # keys another source already builds
+        self.dropped: List[str] = []        # built before, no longer produced
+        self.orphans: List[str] = []        # files on the source's pages no manifest entry owns
+        self.pruned: List[str] = []         # ... deleted (prune=True)
+        self.seconds = 0.0
+
+    def summary(self) -> str:
+        if self.noop:
+            parts = ['up to date']
+        else:
+            parts = [f'{len(self.written)} written', f'{len(self.unchanged)} unchanged',
+                     f'{len(self.skipped)} skipped']
+        if self.shadowed:
+            parts.append(f'{len(self.shadowed)} built by another source')
+        if self.dropped:
+            parts.append(f'{len(self.dropped)} no longer produced: {", ".join(self.dropped)}')
+        if self.pruned:
+            parts.append(f'{len(self.pruned)} orphaned files deleted: {", ".join(self.pruned)}')
+        elif self.orphans:
+            parts.append(f'{len(self.orphans)} orphaned files (--prune deletes them): {", ".join(self.orphans)}')
+        return f'{self.source}: {len(self.ids)} recipes; {", ".join(parts)} ({self.seconds * 1000:.1f} ms)'
+
+
+class BuildManifest:
+    def __init__(self, path: Path):
+        self.path = path
+        data = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            pass
+        if data.get('version') != MANIFEST_VERSION:
+            data = {}
+        self.sources: Dict[str, Dict] = data.get('sources', {})
+        self.recipes: Dict[str, Dict] = data.get('recipes', {})
+        self.ids: Dict[str, str] = data.get('ids', {})
+
+    def save(self):
+        data = {'version': MANIFEST_VERSION, 'sources': self.sources,
+                'recipes': dict(sorted(self.recipes.items())), 'ids': dict(sorted(self.ids.items()))}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(self.path, json.dumps(data, indent=2, ensure_ascii=False) + '\n')
+
+    def assign_id(self, key: str, pages: Iterable[int], existing: List['ExistingRecipe']) -> str:
+        """The recipe ID for a content key, recorded on first use."""
+        if key not in self.ids:
+            adopted = match_existing(key, pages, existing, set(self.ids.values()))
+            self.ids[key] = adopted or content_id(key)
+        return self.ids[key]
+
+
+class ExistingRecipe(NamedTuple):
+    recipe_id: str              # file name stem
+    key: str
+    page: Optional[int]
+
+
+def existing_recipes(output_dir: Path) -> List[ExistingRecipe]:
+    """The recipe files already in output_dir, in ID order."""
+    found = []
+    for path in sorted(output_dir.glob('recipe-*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        try:
+            page = int(data.get('page'))
+        except (TypeError, ValueError):
+            page = None
+        found.append(ExistingRecipe(path.stem, content_key(str(data.get('name', ''))), page))
+    return found
+
+
+def _run_of(short: str, long: str) -> bool:
+    """True when `short`'s words occur as a contiguous run of `long`'s (prefixes included)."""
+    return bool(short) and f'-{short}-' in f'-{long}-'
+
+
+def match_existing(key: str, pages: Iterable[int], existing: List[ExistingRecipe],
+                   claimed: Collection[str]) -> Optional[str]:
+    """ID of the existing file a recipe should keep: the lowest with the same key, else the
+    first on one of its pages whose key is a run of words of the recipe's, or contains it."""
+    candidates = [e for e in existing if e.recipe_id not in claimed]
+    for e in candidates:
+        if e.key == key:
+            return e.recipe_id
+    pages = set(pages)
+    for e in candidates:
+        if e.page in pages and (_run_of(e.key, key) or _run_of(key, e.key)):
+            return e.recipe_id
+    return None
+
+
+def find_orphans(manifest: BuildManifest, pages: Iterable[int], existing: List[ExistingRecipe]) -> List[str]:
+    """Files on `pages` that no manifest recipe entry owns."""
+    pages = set(pages)
+    return [e.recipe_id for e in existing if e.page in pages and e.recipe_id not in manifest.recipes]
+
+
+def _report_orphans(report: BuildReport, manifest: BuildManifest, pages: Set[int], output_dir: Path, prune: bool):
+    report.orphans = find_orphans(manifest, pages, existing_recipes(output_dir))
+    if prune:
+        for recipe_id in report.orphans:
+            (output_dir / f'{recipe_id}.json').unlink(missing_ok=True)
+        report.pruned, report.orphans = report.orphans, []
+
+
+def build_recipes(source: str, pages: Dict[int, str], make_recipe: Callable[[object, str], Dict],
+                  output_dir: Path, version: str = '1', force: bool = False,
+                  ensure_ascii: bool = True, prune: bool = False) -> BuildReport:
+    """Build the recipes on `pages` ({page: raw text}) into output_dir, re-parsing only what changed.
+
+    make_recipe(span, recipe_id) turns a recipe_segmenter.RecipeSpan into the
+    recipe's JSON object. Orphaned files on `pages` are reported, and deleted
+    when `prune` is set.
+    """
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    report = BuildReport(source)
+    manifest = BuildManifest(output_dir / MANIFEST_NAME)
+    environment = build_environment(version)
+    page_hashes = {str(page): _sha256(text) for page, text in sorted(pages.items())}
+
+    previous = manifest.sources.get(source, {})
+    if not force and previous.get('environment') == environment and previous.get('pages') == page_hashes \
+            and all((output_dir / f'{recipe_id}.json').exists() for recipe_id in previous.get('recipes', [])):
+        report.noop = True
+        report.ids = list(previous.get('recipes', []))
+        if prune:
+            _report_orphans(report, manifest, set(pages), output_dir, prune)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    from normalize import NORMALIZED_DIR, normalize_cached
+    from recipe_segmenter import segment
+
+    normalized = [(page, normalize_cached(text, NORMALIZED_DIR / f'{page_hashes[str(page)]}.json'))
+                  for page, text in sorted(pages.items())]
+    existing = None
+    for span in segment(normalized):
+        key = content_key(span.name)
+        if key not in manifest.ids and existing is None:
+            existing = existing_recipes(output_dir)
+        recipe_id = manifest.assign_id(key, span.pages, existing or [])
+        owner = manifest.recipes.get(recipe_id, {}).get('source', source)
+        if owner != source and owner in manifest.sources:
+            report.shadowed.append(recipe_id)
+            continue
+        if recipe_id in report.ids:
+            # Same name twice in one source: the first span wins
+            continue
+        report.ids.append(recipe_id)
+
+        span_hashes = [page_hashes.get(str(page), '') for page in span.pages]
+        inputs = _inputs_hash(environment, span_hashes)
+        entry = manifest.recipes.get(recipe_id, {})
+        output_file = output_dir / f'{recipe_id}.json'
+        if not force and entry.get('inputs') == inputs and output_file.exists():
+            report.skipped.append(recipe_id)
+            continue
+
+        text = json.dumps(make_recipe(span, recipe_id), indent=2, ensure_ascii=ensure_ascii)
+        try:
+            current = output_file.read_text(encoding='utf-8')
+        except OSError:
+            current = None
+        if current == text:
+            report.unchanged.append(recipe_id)
+        else:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            _atomic_write(output_file, text)
+            report.written.append(recipe_id)
+        manifest.recipes[recipe_id] = {
+            'key': key, 'source': source, 'pages': dict(zip(map(str, span.pages), span_hashes)),
+            'inputs': inputs, 'output': _sha256(text),
+        }
+
+    report.dropped = [recipe_id for recipe_id in previous.get('recipes', []) if recipe_id not in report.ids]
+    for recipe_id in report.dropped:
+        if manifest.recipes.get(recipe_id, {}).get('source') == source:
+            del manifest.recipes[recipe_id]
+    manifest.sources[source] = {'environment': environment, 'pages': page_hashes, 'recipes': report.ids}
+    manifest.save()
+    _report_orphans(report, manifest, set(pages), output_dir, prune)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def main(argv=None):
+    import argparse
+
+    from recipe_store import RECIPES_DIR
+
+    parser = argparse.ArgumentParser(description='Incremental recipe build manifest')
+    sub = parser.add_subparsers(dest='command', required=True)
+    status = sub.add_parser('status', help='sources, recipe counts, files changed since they were built and orphans')
+    status.add_argument('--output-dir', type=Path, default=RECIPES_DIR)
+    args = parser.parse_args(argv)
+
+    manifest = BuildManifest(args.output_dir / MANIFEST_NAME)
+    if not manifest.sources:
+        print(f'No build manifest in {args.output_dir}')
+        return
+    for source, info in sorted(manifest.sources.items()):
+        pages = sorted(int(page) for page in info['pages'])
+        span = f'pages {pages[0]}-{pages[-1]}' if pages else 'no pages'
+        print(f'{source}: {len(info["recipes"])} recipes, {span}, builder {info["environment"]["version"]}')
+    edited = []
+    for recipe_id, entry in sorted(manifest.recipes.items()):
+        path = args.output_dir / f'{recipe_id}.json'
+        if not path.exists():
+            edited.append(f'{recipe_id} (missing)')
+        elif _sha256(path.read_text(encoding='utf-8')) != entry['output']:
+            edited.append(recipe_id)
+    if edited:
+        print(f'Edited since built (kept until their inputs change or --force): {", ".join(edited)}',
+              file=sys.stderr)
+    existing = existing_recipes(args.output_dir)
+    for source, info in sorted(manifest.sources.items()):
+        orphans = find_orphans(manifest, map(int, info['pages']), existing)
+        if orphans:
+            print(f'{source}: orphaned files (rerun its extraction with --prune to delete): {", ".join(orphans)}',
+                  file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
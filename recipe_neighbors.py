@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Nearest-neighbour index over recipes, for "swap this meal" queries.
+
+Each recipe is a sparse vector over a fixed feature space: one feature per
+food ID it uses (weight 1) and one per food category those foods belong to
+(weight CATEGORY_WEIGHT), so "Red Curry Chickpeas" and "Chickpea Tikka"
+are close even when they share few exact foods. Two similarities are kept:
+
+    cosine     weighted vectors, L2-normalized:  x . y
+    jaccard    feature sets:                     |x & y| / |x | y|
+
+Both are computed for all pairs with one NumPy matrix product each and kept,
+with the TOP_K best neighbours per recipe, in .cache/index/recipe_neighbors.pkl.
+Queries are answered from memory: unfiltered ones read the precomputed top-k,
+filtered ones ("like recipe-045 but for dinner") sort one row of the
+similarity matrix restricted to the meal types recipe_store.meal_types()
+accepts ('Dinner' also takes 'main dish' and 'lunch' recipes).
+
+On load the recipe files are compared with the stamps (mtime, size) stored
+in the index. A changed or new recipe costs one matrix-vector product per
+metric and a top-k refresh of the rows it can enter or leave; a removed one
+drops its row and column. Changes to the food data or alias index, which
+can change every vector, rebuild the index.
+
+Usage:
+    from recipe_neighbors import load_recipe_neighbors
+
+    index = load_recipe_neighbors()
+    index.like('recipe-045', k=5)                       # [('recipe-051', 0.62), ...]
+    index.like('recipe-045', meal_type='breakfast')
+
+    python recipe_neighbors.py like recipe-045 [--meal breakfast] [-k 5] [--metric jaccard]
+    python recipe_neighbors.py build [--rebuild] [--benchmark]
+"""
+import hashlib
+import pickle
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from page_cache import _atomic_pickle
+from page_store import STORE_DIR
+
+# === CONFIGURATION ===
+INDEX_FILE = STORE_DIR / 'recipe_neighbors.pkl'
+INDEX_VERSION = 1
+TOP_K = 10
+CATEGORY_WEIGHT = 0.5
+METRICS = ('cosine', 'jaccard')
+
+
+def feature_space(store) -> Dict[str, int]:
+    """{feature: column}: every food ID, then every category as 'category:<slug>'."""
+    features = sorted(store) + sorted({f'category:{c}' for food in store.values() for c in food.categories})
+    return {feature: column for column, feature in enumerate(features)}
+
+
+def recipe_features(food_ids: Sequence[str], store, columns: Dict[str, int]) -> Dict[int, float]:
+    """Sparse vector {column: weight} of one recipe."""
+    vector: Dict[int, float] = {}
+    for food_id in food_ids:
+        food = store.get(food_id)
+        if food is None:
+            continue
+        vector[columns[food_id]] = 1.0
+        for category in food.categories:
+            vector.setdefault(columns[f'category:{category}'], CATEGORY_WEIGHT)
+    return vector
+
+
+def _source_digest(columns: Dict[str, int], store, alias_hash: str) -> str:
+    """Hash of what every recipe vector depends on besides the recipe file."""
+    digest = hashlib.sha256(alias_hash.encode('ascii'))
+    for food_id, food in sorted(store.items()):
+        digest.update(f'{food_id}\0{food.name}\0{",".join(food.categories)}\n'.encode('utf-8'))
+    digest.update('\n'.join(columns).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class RecipeNeighbors:
+    """Recipe vectors, all-pairs similarities and top-k neighbours per metric."""
+
+    def __init__(self, columns: Dict[str, int], digest: str = ''):
+        import numpy as np
+
+        self.columns = columns
+        self.digest = digest
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.meal_types: List[str] = []
+        self.vectors: List[Dict[int, float]] = []
+        self.stamps: Dict[str, Tuple[int, int, str]] = {}    # file name -> (mtime_ns, size, recipe ID)
+        self.weighted = np.zeros((0, len(columns)), dtype=np.float32)     # L2-normalized rows
+        self.binary = np.zeros((0, len(columns)), dtype=np.float32)
+        self.sims = {metric: np.zeros((0, 0), dtype=np.float32) for metric in METRICS}
+        self.top = {metric: np.zeros((0, 0), dtype=np.int32) for metric in METRICS}
+        self.index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # --- building ---
+
+    def _rows(self, vector: Dict[int, float]):
+        import numpy as np
+
+        weighted = np.zeros(len(self.columns), dtype=np.float32)
+        if vector:
+            weighted[list(vector)] = list(vector.values())
+            weighted /= np.linalg.norm(weighted)
+        return weighted, (weighted > 0).astype(np.float32)
+
+    def _similarity_rows(self, i: int) -> Dict[str, object]:
+        """Similarities of recipe i to every recipe (self excluded as -1)."""
+        import numpy as np
+
+        cosine = self.weighted @ self.weighted[i]
+        inter = self.binary @ self.binary[i]
+        union = self.binary.sum(axis=1) + self.binary[i].sum() - inter
+        jaccard = inter / np.maximum(union, 1)
+        rows = {'cosine': cosine, 'jaccard': jaccard}
+        for row in rows.values():
+            row[i] = -1
+        return rows
+
+    def _refresh_top(self, metric: str, rows) -> None:
+        import numpy as np
+
+        k = min(TOP_K, max(len(self) - 1, 0))
+        if self.top[metric].shape != (len(self), k):
+            self.top[metric] = np.zeros((len(self), k), dtype=np.int32)
+            rows = range(len(self))
+        sims = self.sims[metric]
+        for r in rows:
+            # Stable sort on the negated row keeps ties in recipe ID order
+            self.top[metric][r] = np.argsort(-sims[r], kind='stable')[:k]
+
+    def build(self, recipes, store) -> None:
+        """Index every recipe from scratch."""
+        import numpy as np
+
+        self.ids = [recipe.id for recipe in recipes]
+        self.names = [recipe.name for recipe in recipes]
+        self.meal_types = [recipe.meal_type for recipe in recipes]
+        self.vectors = [recipe_features(recipe.foods, store, self.columns) for recipe in recipes]
+        self.index = {recipe_id: i for i, recipe_id in enumerate(self.ids)}
+        rows = [self._rows(vector) for vector in self.vectors]
+        shape = (len(rows), len(self.columns))
+        self.weighted = np.array([w for w, _ in rows], dtype=np.float32).reshape(shape)
+        self.binary = np.array([b for _, b in rows], dtype=np.float32).reshape(shape)
+
+        inter = self.binary @ self.binary.T
+        sizes = self.binary.sum(axis=1)
+        self.sims = {
+            'cosine': self.weighted @ self.weighted.T,
+            'jaccard': inter / np.maximum(sizes[:, None] + sizes[None, :] - inter, 1),
+        }
+        for metric in METRICS:
+            np.fill_diagonal(self.sims[metric], -1)
+            self._refresh_top(metric, range(len(self)))
+
+    def update(self, recipe, store) -> None:
+        """Add or replace one recipe: one similarity row/column and the top-k rows it touches."""
+        import numpy as np
+
+        vector = recipe_features(recipe.foods, store, self.columns)
+        weighted, binary = self._rows(vector)
+        i = self.index.get(recipe.id)
+        if i is None:
+            i = len(self.ids)
+            self.index[recipe.id] = i
+            self.ids.append(recipe.id)
+            self.names.append(recipe.name)
+            self.meal_types.append(recipe.meal_type)
+            self.vectors.append(vector)
+            self.weighted = np.vstack([self.weighted, weighted])
+            self.binary = np.vstack([self.binary, binary])
+            for metric in METRICS:
+                self.sims[metric] = np.pad(self.sims[metric], ((0, 1), (0, 1)), constant_values=-1)
+        else:
+            self.names[i], self.meal_types[i], self.vectors[i] = recipe.name, recipe.meal_type, vector
+            self.weighted[i], self.binary[i] = weighted, binary
+
+        for metric, row in self._similarity_rows(i).items():
+            sims, top = self.sims[metric], self.top[metric]
+            sims[i, :] = row
+            sims[:, i] = row
+            affected = {i}
+            if len(top) == len(self) and top.shape[1]:
+                # Rows that listed i (its score changed) or whose k-th best it now beats or ties
+                kth = sims[np.arange(len(self)), top[:, -1]]
+                affected.update(np.flatnonzero((top == i).any(axis=1) | (row >= kth)).tolist())
+            self._refresh_top(metric, sorted(affected))
+
+    def remove(self, recipe_id: str) -> None:
+        import numpy as np
+
+        i = self.index.pop(recipe_id, None)
+        if i is None:
+            return
+        for values in (self.ids, self.names, self.meal_types, self.vectors):
+            del values[i]
+        self.index = {rid: j for j, rid in enumerate(self.ids)}
+        self.weighted = np.delete(self.weighted, i, axis=0)
+        self.binary = np.delete(self.binary, i, axis=0)
+        for metric in METRICS:
+            self.sims[metric] = np.delete(np.delete(self.sims[metric], i, axis=0), i, axis=1)
+            # Every stored neighbour index past i shifted, so re-rank from the kept similarities
+            self._refresh_top(metric, range(len(self)))
+
+    # --- queries ---
+
+    def like(self, recipe_id: str, k: int = 5, metric: str = 'cosine',
+             meal_type: Union[str, Sequence[str], None] = None) -> List[Tuple[str, float]]:
+        """The k most similar recipes, optionally only those served at the given meal(s)."""
+        import numpy as np
+
+        from recipe_store import meal_types
+
+        i = self.index.get(recipe_id)
+        if i is None:
+            raise KeyError(recipe_id)
+        allowed = meal_types(meal_type)
+        if allowed is None and k <= self.top[metric].shape[1]:
+            candidates = self.top[metric][i][:k]
+        else:
+            row = self.sims[metric][i]
+            pool = np.array([j for j, meal in enumerate(self.meal_types)
+                             if j != i and (not allowed or meal in allowed)], dtype=np.int64)
+            candidates = pool[np.argsort(-row[pool], kind='stable')[:k]] if len(pool) else pool
+        sims = self.sims[metric][i]
+        return [(self.ids[j], round(float(sims[j]), 4)) for j in candidates if sims[j] > 0]
+
+    def save(self, index_file=INDEX_FILE) -> None:
+        index_file.parent.mkdir(parents=True, exist_ok=True)
+        state = {name: getattr(self, name) for name in
+                 ('columns', 'digest', 'ids', 'names', 'meal_types', 'vectors', 'stamps',
+                  'weighted', 'binary', 'sims', 'top')}
+        _atomic_pickle(index_file, (INDEX_VERSION, state))
+
+    @classmethod
+    def restore(cls, state: Dict) -> 'RecipeNeighbors':
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        index.index = {recipe_id: i for i, recipe_id in enumerate(index.ids)}
+        return index
+
+
+def _read_index(index_file) -> Optional[RecipeNeighbors]:
+    try:
+        with open(index_file, 'rb') as f:
+            version, state = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError, TypeError):
+        return None
+    return RecipeNeighbors.restore(state) if version == INDEX_VERSION else None
+
+
+def sync(index: RecipeNeighbors, store, recipes_dir=None) -> Tuple[int, int]:
+    """Bring the index up to date with the recipe files; (updated, removed)."""
+    from recipe_store import RECIPES_DIR, load_recipe, recipe_stamps
+
+    recipes_dir = recipes_dir or RECIPES_DIR
+    current = recipe_stamps(recipes_dir)
+    updated = removed = 0
+    for name in sorted(index.stamps.keys() - current.keys()):
+        index.remove(index.stamps.pop(name)[2])
+        removed += 1
+    for name, stamp in sorted(current.items()):
+        old = index.stamps.get(name)
+        if old is not None and old[:2] == stamp:
+            continue
+        try:
+            recipe = load_recipe(recipes_dir / name, store)
+        except (OSError, ValueError) as e:
+            print(f'recipe neighbours: skipping {name}: {e}', file=sys.stderr)
+            continue
+        if old is not None and old[2] != recipe.id:
+            index.remove(old[2])
+        index.update(recipe, store)
+        index.stamps[name] = (*stamp, recipe.id)
+        updated += 1
+    return updated, removed
+
+
+_loaded: Optional[RecipeNeighbors] = None
+
+
+def load_recipe_neighbors(rebuild: bool = False, index_file=INDEX_FILE) -> RecipeNeighbors:
+    """The stored index, synced with data/recipes once per process."""
+    global _loaded
+    if _loaded is not None and not rebuild:
+        return _loaded
+
+    from alias_index import load_alias_index
+    from food_store import load_food_store
+
+    store = load_food_store()
+    columns = feature_space(store)
+    digest = _source_digest(columns, store, load_alias_index().hash)
+
+    index = None if rebuild else _read_index(index_file)
+    if index is None or index.digest != digest:
+        index = RecipeNeighbors(columns, digest)
+    updated, removed = sync(index, store)
+    if updated or removed:
+        index.save(index_file)
+        print(f'recipe neighbours: {updated} recipes indexed, {removed} removed, '
+              f'{len(index)} total -> {index_file}', file=sys.stderr)
+    _loaded = index
+    return _loaded
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Nearest-neighbour index over recipes')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='build (or sync) the stored index')
+    build.add_argument('--rebuild', action='store_true')
+    build.add_argument('--benchmark', action='store_true', help='time a full build against a one-recipe update')
+    like = sub.add_parser('like', help='recipes similar to one recipe')
+    like.add_argument('recipe')
+    like.add_argument('--meal', action='append', help='only recipes served at this meal (repeatable)')
+    like.add_argument('-k', type=int, default=5)
+    like.add_argument('--metric', choices=METRICS, default='cosine')
+    args = parser.parse_args(argv)
+
+    try:
+        index = load_recipe_neighbors(rebuild=getattr(args, 'rebuild', False))
+    except ImportError as e:
+        print(f'Error: {e} (the recipe neighbour index needs NumPy)', file=sys.stderr)
+        return 1
+    if args.command == 'build':
+        print(f'{len(index)} recipes, {len(index.columns)} features, top {TOP_K} per metric')
+        if args.benchmark:
+            from food_store import load_food_store
+            from recipe_store import load_recipes
+
+            store = load_food_store()
+            recipes = load_recipes()
+            start = time.perf_counter()
+            RecipeNeighbors(index.columns, index.digest).build(recipes, store)
+            print(f'full build: {(time.perf_counter() - start) * 1000:.1f} ms (recipe files already parsed)')
+            start = time.perf_counter()
+            index.update(recipes[len(recipes) // 2], store)
+            print(f'one-recipe update: {(time.perf_counter() - start) * 1000:.2f} ms')
+        return 0
+
+    if args.recipe not in index.index:
+        sys.exit(f'Unknown recipe: {args.recipe}')
+    i = index.index[args.recipe]
+    print(f'{args.recipe}: {index.names[i]} ({index.meal_types[i] or "-"})')
+    for recipe_id, score in index.like(args.recipe, args.k, args.metric, args.meal):
+        j = index.index[recipe_id]
+        print(f'  {score:.3f}  {recipe_id}  {index.names[j]} ({index.meal_types[j] or "-"})')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
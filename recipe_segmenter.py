@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Streaming recipe segmenter for the recipe chapters (pages 120-386).
+
+Replaces the per-page title + MAKES: regex with its blind 4000-character
+window (the old find_recipes() in extract_all_recipes_120_200.py) and the
+in_ingredients / in_instructions heuristic (the old parse_recipes_from_text()
+in parse_recipes_201_270.py); both scripts now segment through
+recipe_build.build_recipes().
+Pages are consumed in order, one line at a time, by a small state machine:
+
+    title          ALL-CAPS line directly above a MAKES: line - also when the
+                   title sits at the bottom of the previous page
+    description    prose between MAKES: and the first ingredient
+    ingredients    quantity lines and short unpunctuated lines; ALL-CAPS
+                   lines here are group headers ("DRESSING", "TO SERVE")
+    instructions   from the first sentence-like line onwards
+    notes          "* ..." footnotes, Hint/Tip/Variation lines and headed
+                   sidebars after the method
+
+A recipe ends where the next title starts, at a section boundary from the
+section map (chapter openers, Cooking Charts, ...) or at the end of input.
+Lines continuing across a page break (lowercase start, previous line not
+finished) are joined onto the previous item. Each RecipeSpan records exact
+(page, offset) start and end positions in the normalized text and, when the
+pages are normalize.Normalized objects, in the raw text as well.
+
+Work is one pass over the lines and only the pages of the open recipe are
+held, so time and memory grow linearly with the corpus.
+
+Usage:
+    from recipe_segmenter import segment_book
+
+    for recipe in segment_book():          # pages 120-386 of the corpus
+        recipe.name, recipe.start, recipe.end, recipe.ingredients
+
+    python recipe_segmenter.py [--start 120 --end 386] [--json]
+    python recipe_segmenter.py --benchmark
+"""
+import re
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+# === CONFIGURATION ===
+FIRST_RECIPE_PAGE = 120
+LAST_RECIPE_PAGE = 386
+
+MAKES_RE = re.compile(r'^MAKES:\s*(?P<makes>.*?)\s*DIFFICULTY:\s*(?P<difficulty>\w+)', re.IGNORECASE)
+SERVINGS_RE = re.compile(r'^(\d+)(?:\s*(?:to|-)\s*(\d+))?\s+servings?\b', re.IGNORECASE)
+QUANTITY_RE = re.compile(r'^(?:\d|1/|[½⅓⅔¼¾⅛⅜⅝⅞])')
+NOTE_RE = re.compile(r'^(?:\*|Hint\b|Tip\b|Note\b|For Variation\b|Variation\b)', re.IGNORECASE)
+# "FOR THE DRESSING: In a blender ..." / "TO SERVE: Spread ..."
+STEP_HEADER_RE = re.compile(r"^[A-Z][A-Z '&-]+:\s")
+
+LINE_RE = re.compile(r'[^\n]+')
+
+# Unpunctuated lines longer than this are wrapped prose rather than ingredients
+PROSE_LENGTH = 90
+
+Pos = Tuple[int, int]  # (page, offset)
+
+
+class RecipeSpan:
+    """One recipe: its parts and exact (page, offset) span in the page texts."""
+
+    __slots__ = ('name', 'start', 'end', 'raw_start', 'raw_end', 'makes', 'servings', 'difficulty',
+                 'description', 'ingredients', 'groups', 'instructions', 'notes', 'text')
+
+    def __init__(self, name: str, start: Pos, makes: str, difficulty: str):
+        self.name = name
+        self.start = start
+        self.end = start
+        self.raw_start: Optional[Pos] = None
+        self.raw_end: Optional[Pos] = None
+        self.makes = makes
+        match = SERVINGS_RE.match(makes)
+        self.servings = (int(match.group(1)), int(match.group(2) or match.group(1))) if match else None
+        self.difficulty = difficulty.capitalize()
+        self.description: List[str] = []
+        self.ingredients: List[str] = []
+        # (group header, index of its first ingredient)
+        self.groups: List[Tuple[str, int]] = []
+        self.instructions: List[str] = []
+        self.notes: List[str] = []
+        self.text = ''
+
+    @property
+    def page(self) -> int:
+        return self.start[0]
+
+    @property
+    def pages(self) -> range:
+        return range(self.start[0], self.end[0] + 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'page': self.page,
+            'start': list(self.start),
+            'end': list(self.end),
+            'raw_start': list(self.raw_start) if self.raw_start else None,
+            'raw_end': list(self.raw_end) if self.raw_end else None,
+            'makes': self.makes,
+            'servings': list(self.servings) if self.servings else None,
+            'difficulty': self.difficulty,
+            'description': ' '.join(self.description),
+            'ingredients': self.ingredients,
+            'groups': [list(g) for g in self.groups],
+            'instructions': self.instructions,
+            'notes': self.notes,
+        }
+
+
+def _is_caps(line: str) -> bool:
+    return line.isupper() and not MAKES_RE.match(line)
+
+
+def _finished(line: str) -> bool:
+    return line.rstrip().endswith(('.', '!', '?', ':'))
+
+
+def _is_instruction(line: str) -> bool:
+    if STEP_HEADER_RE.match(line):
+        return True
+    if QUANTITY_RE.match(line):
+        return False
+    # Sentences; or a paragraph cut mid-sentence where reflow could not join it
+    return _finished(line) or (len(line) > PROSE_LENGTH and '. ' in line)
+
+
+class _Segmenter:
+    def __init__(self, boundaries: Set[int]):
+        self.boundaries = boundaries
+        self.pages: Dict[int, object] = {}   # pages held for the open recipe
+        self.current: Optional[RecipeSpan] = None
+        self.state = None
+        self.last: Optional[List[str]] = None  # list the previous line went into
+        self.pending: Optional[Tuple[str, Pos, Pos]] = None  # caps line that may be a title
+
+    # --- emission ---
+    def _text(self, page) -> str:
+        return page.text if hasattr(page, 'text') else page
+
+    def _raw(self, pos: Pos, exclusive: bool = False) -> Optional[Pos]:
+        page = self.pages.get(pos[0])
+        if page is None or not hasattr(page, 'raw_offset'):
+            return None
+        if exclusive:
+            return pos[0], page.raw_offset(pos[1] - 1) + 1 if pos[1] else 0
+        return pos[0], page.raw_offset(pos[1])
+
+    def _close(self) -> Optional[RecipeSpan]:
+        recipe, self.current = self.current, None
+        self.state = self.last = None
+        if recipe is None:
+            return None
+        (first_page, start), (last_page, end) = recipe.start, recipe.end
+        parts = []
+        for page_num in range(first_page, last_page + 1):
+            if page_num in self.pages:
+                text = self._text(self.pages[page_num])
+                parts.append(text[start if page_num == first_page else 0:end if page_num == last_page else len(text)])
+        recipe.text = '\n'.join(parts)
+        recipe.raw_start, recipe.raw_end = self._raw(recipe.start), self._raw(recipe.end, exclusive=True)
+        return recipe
+
+    def _prune(self, keep_from: int):
+        for page_num in [p for p in self.pages if p < keep_from]:
+            del self.pages[page_num]
+
+    # --- line handling ---
+    def _add(self, target: List[str], line: str, new_page: bool):
+        # Continuation across a page break: join onto the previous item
+        if new_page and target is self.last and target and not _finished(target[-1]) and line[:1].islower():
+            target[-1] = f'{target[-1]} {line}'
+        else:
+            target.append(line)
+        self.last = target
+
+    def _body_line(self, line: str, new_page: bool):
+        recipe = self.current
+        if NOTE_RE.match(line):
+            self._add(recipe.notes, line, new_page)
+            return
+        if new_page and self.last is not None and self.last and not _finished(self.last[-1]) and line[:1].islower():
+            self._add(self.last, line, new_page)
+            return
+
+        if self.state in ('description', 'ingredients') and _is_caps(line):
+            recipe.groups.append((line, len(recipe.ingredients)))
+            self.state = 'ingredients'
+            self.last = None
+        elif self.state == 'description':
+            if QUANTITY_RE.match(line):
+                self.state = 'ingredients'
+                self._add(recipe.ingredients, line, new_page)
+            elif recipe.description and not _finished(recipe.description[-1]):
+                # Wrapped sentence whose next line starts with a capital
+                recipe.description[-1] = f'{recipe.description[-1]} {line}'
+            elif _finished(line) or len(line) > PROSE_LENGTH or not recipe.ingredients:
+                self._add(recipe.description, line, new_page)
+            else:
+                self.state = 'ingredients'
+                self._add(recipe.ingredients, line, new_page)
+        elif self.state == 'ingredients':
+            if _is_instruction(line):
+                self.state = 'instructions'
+                self._add(recipe.instructions, line, new_page)
+            else:
+                self._add(recipe.ingredients, line, new_page)
+        elif self.state == 'instructions' and _is_caps(line):
+            # A headed sidebar ("GARLIC FOR CANCER ...") after the method
+            self.state = 'sidebar'
+            self._add(recipe.notes, line, new_page)
+        elif self.state == 'sidebar':
+            self._add(recipe.notes, line, new_page)
+        elif recipe.instructions and not _finished(recipe.instructions[-1]):
+            recipe.instructions[-1] = f'{recipe.instructions[-1]} {line}'
+        else:
+            self._add(recipe.instructions, line, new_page)
+
+    def _flush_pending(self, new_page: bool = False):
+        if self.pending is None:
+            return
+        line, _, end = self.pending
+        self.pending = None
+        if self.current is not None:
+            self._body_line(line, new_page)
+            self.current.end = end
+
+    def feed(self, page_num: int, page) -> Iterator[RecipeSpan]:
+        if page_num in self.boundaries:
+            self._flush_pending()
+            recipe = self._close()
+            if recipe:
+                yield recipe
+            self._prune(page_num)
+
+        self.pages[page_num] = page
+        new_page = True
+        for m in LINE_RE.finditer(self._text(page)):
+            line = m.group().strip()
+            if not line:
+                continue
+            start, end = (page_num, m.start()), (page_num, m.end())
+
+            makes = MAKES_RE.match(line)
+            if makes and self.pending is not None:
+                title, title_start, _ = self.pending
+                self.pending = None
+                recipe = self._close()
+                if recipe:
+                    yield recipe
+                self._prune(title_start[0])
+                self.current = RecipeSpan(title, title_start, makes.group('makes'), makes.group('difficulty'))
+                self.current.end = end
+                self.state = 'description'
+            elif _is_caps(line):
+                self._flush_pending(new_page)
+                self.pending = (line, start, end)
+            else:
+                self._flush_pending(new_page)
+                if self.current is not None:
+                    self._body_line(line, new_page)
+                    self.current.end = end
+            new_page = False
+
+        if self.current is None and self.pending is None:
+            self._prune(page_num + 1)
+
+    def finish(self) -> Iterator[RecipeSpan]:
+        self._flush_pending()
+        recipe = self._close()
+        if recipe:
+            yield recipe
+
+
+def section_boundaries(first: int = FIRST_RECIPE_PAGE, last: int = LAST_RECIPE_PAGE) -> Set[int]:
+    """Pages on which a section of the section map starts."""
+    from section_map import load_section_map
+
+    return {s.start for s in load_section_map() if first <= s.start <= last}
+
+
+def segment(pages: Iterable[Tuple[int, Union[str, object]]],
+            boundaries: Optional[Set[int]] = None) -> Iterator[RecipeSpan]:
+    """Stream RecipeSpans from (page, text or Normalized) pairs in page order."""
+    segmenter = _Segmenter(section_boundaries() if boundaries is None else boundaries)
+    for page_num, page in pages:
+        yield from segmenter.feed(page_num, page)
+    yield from segmenter.finish()
+
+
+def segment_book(start: int = FIRST_RECIPE_PAGE, end: int = LAST_RECIPE_PAGE) -> Iterator[RecipeSpan]:
+    """Recipes on normalized corpus pages start..end."""
+    from normalize import normalized_pages
+
+    pages = normalized_pages(range(start, end + 1))
+    return segment(sorted(pages.items()), section_boundaries(start, end))
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Segment the recipe chapters into recipes')
+    parser.add_argument('--start', type=int, default=FIRST_RECIPE_PAGE)
+    parser.add_argument('--end', type=int, default=LAST_RECIPE_PAGE)
+    parser.add_argument('--json', action='store_true', help='print recipes as JSON')
+    parser.add_argument('--benchmark', action='store_true', help='time the segmenter on 1x, 2x and 4x the corpus')
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        from normalize import normalized_pages
+
+        pages = sorted(normalized_pages(range(args.start, args.end + 1)).items())
+        boundaries = section_boundaries(args.start, args.end)
+        span = args.end + 1
+        for copies in (1, 2, 4):
+            # Repeat the book under shifted page numbers to grow the input
+            stream = [(p + k * span, page) for k in range(copies) for p, page in pages]
+            bounds = {b + k * span for k in range(copies) for b in boundaries}
+            t0 = time.perf_counter()
+            count = sum(1 for _ in segment(stream, bounds))
+            elapsed = time.perf_counter() - t0
+            print(f'{len(stream):5d} pages  {count:4d} recipes  {elapsed * 1000:7.1f} ms  '
+                  f'({elapsed / len(stream) * 1e6:.0f} µs/page)')
+        return
+
+    recipes = list(segment_book(args.start, args.end))
+    if args.json:
+        print(json.dumps([r.to_dict() for r in recipes], indent=2, ensure_ascii=False))
+        return
+    for r in recipes:
+        print(f'{r.start[0]:3d}:{r.start[1]:<5d} - {r.end[0]:3d}:{r.end[1]:<5d} {r.name[:55]:55s} '
+              f'{len(r.ingredients):2d} ingredients, {len(r.instructions):2d} steps')
+    print(f'{len(recipes)} recipes', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
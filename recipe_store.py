@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Recipes from data/recipes, normalized for the Python tooling.
+
+The recipe files come from several extraction passes and do not share a
+schema: recipes 001-012 list foods under `foods`, 030+ under `foods_used`;
+meal types are 'dinner' or 'Main Dish' or 'Breakfast'; some food entries are
+not food IDs at all ('parsley', 'white-beans', 'mushrooms-white'). Each
+Recipe here has one shape:
+
+    id, name, page, meal_type    meal type lowercased
+    foods                        food IDs, resolved through the food store
+                                 (ID, display name or alias), in file order
+    unresolved                   entries that name no known food
+    data                         the file's JSON, untouched
+
+Meal filters go through meal_types(): names are lowercased and a meal time
+expands to the meal types served then (MEAL_GROUPS, also the menu slots),
+so 'Dinner' matches 'main dish' recipes too. recipes_digest() hashes the
+files' names, mtimes and sizes for the indexes built from them.
+
+Usage:
+    from recipe_store import load_recipes
+
+    for recipe in load_recipes():
+        recipe.foods        # ('chickpeas', 'cauliflower', ...)
+
+    meal_types(['Dinner'])  # frozenset({'dinner', 'main dish', 'lunch'})
+
+    python recipe_store.py            # summary, with unresolved food entries
+"""
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from page_cache import BASE_DIR
+
+# === CONFIGURATION ===
+RECIPES_DIR = BASE_DIR / 'data' / 'recipes'
+FOOD_FIELDS = ('foods', 'foods_used')
+# Meal time -> recipe meal types served then
+MEAL_GROUPS = {
+    'breakfast': ('breakfast',),
+    'lunch': ('lunch', 'dinner', 'main dish'),
+    'dinner': ('dinner', 'main dish', 'lunch'),
+    'snacks': ('dessert', 'snack'),
+}
+
+
+class Recipe:
+    __slots__ = ('id', 'name', 'page', 'meal_type', 'foods', 'unresolved', 'data')
+
+    def __init__(self, data: Dict, foods: Tuple[str, ...], unresolved: Tuple[str, ...]):
+        self.id = data['id']
+        self.name = ' '.join(str(data.get('name', '')).split())
+        self.page = data.get('page')
+        self.meal_type = str(data.get('meal_type', '')).strip().lower()
+        self.foods = foods
+        self.unresolved = unresolved
+        self.data = data
+
+    def __repr__(self) -> str:
+        return f'Recipe(id={self.id!r}, name={self.name!r})'
+
+
+def food_entries(data: Dict) -> List[str]:
+    """The recipe's raw food list, whichever field it is under."""
+    for field in FOOD_FIELDS:
+        if isinstance(data.get(field), list):
+            return [entry for entry in data[field] if isinstance(entry, str)]
+    return []
+
+
+def resolve_foods(entries: List[str], store) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """(food IDs in order, deduplicated; entries that resolve to nothing)."""
+    foods, unresolved = [], []
+    for entry in entries:
+        food = store.lookup(entry)
+        if food is None:
+            unresolved.append(entry)
+        elif food.id not in foods:
+            foods.append(food.id)
+    return tuple(foods), tuple(unresolved)
+
+
+def load_recipe(path: Path, store=None) -> Recipe:
+    if store is None:
+        from food_store import load_food_store
+
+        store = load_food_store()
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    data.setdefault('id', path.stem)
+    return Recipe(data, *resolve_foods(food_entries(data), store))
+
+
+def load_recipes(recipes_dir: Path = RECIPES_DIR) -> List[Recipe]:
+    """Every recipe file, in ID order; unreadable files are reported and skipped."""
+    from food_store import load_food_store
+
+    store = load_food_store()
+    recipes = []
+    for path in sorted(recipes_dir.glob('recipe-*.json')):
+        try:
+            recipes.append(load_recipe(path, store))
+        except (OSError, ValueError) as e:
+            print(f'recipe store: skipping {path.name}: {e}', file=sys.stderr)
+    return recipes
+
+
+def meal_types(meals: Union[str, Iterable[str], None]) -> Optional[FrozenSet[str]]:
+    """Recipe meal types a meal filter accepts; None for no filter.
+
+    Each name is lowercased and kept, plus its MEAL_GROUPS entry ('snack'
+    and 'snacks' both name the snacks group).
+    """
+    if isinstance(meals, str):
+        meals = [meals]
+    accepted = set()
+    for meal in meals or ():
+        meal = ' '.join(meal.lower().split())
+        if meal:
+            accepted.add(meal)
+            accepted.update(MEAL_GROUPS.get(meal) or MEAL_GROUPS.get(f'{meal}s', ()))
+    return frozenset(accepted) or None
+
+
+def recipe_stamps(recipes_dir: Path = RECIPES_DIR) -> Dict[str, Tuple[int, int]]:
+    """{file name: (mtime_ns, size)} for every recipe file."""
+    stamps = {}
+    for entry in os.scandir(recipes_dir):
+        if entry.name.startswith('recipe-') and entry.name.endswith('.json'):
+            stat = entry.stat()
+            stamps[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def recipes_digest(recipes_dir: Path = RECIPES_DIR) -> str:
+    """SHA-256 over every recipe file's (name, mtime, size); changes when any file does."""
+    digest = hashlib.sha256()
+    for name, (mtime_ns, size) in sorted(recipe_stamps(recipes_dir).items()):
+        digest.update(f'{name}\0{mtime_ns}\0{size}\n'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Normalized view of data/recipes')
+    parser.parse_args(argv)
+
+    recipes = load_recipes()
+    meal_types: Dict[str, int] = {}
+    unresolved: Dict[str, int] = {}
+    for recipe in recipes:
+        meal_types[recipe.meal_type] = meal_types.get(recipe.meal_type, 0) + 1
+        for entry in recipe.unresolved:
+            unresolved[entry] = unresolved.get(entry, 0) + 1
+    foods = sum(len(r.foods) for r in recipes)
+    print(f'{len(recipes)} recipes, {foods} resolved food entries')
+    print('meal types: ' + ', '.join(f'{k or "-"} {v}' for k, v in sorted(meal_types.items())))
+    if unresolved:
+        print('unresolved: ' + ', '.join(f'{k} x{v}' for k, v in sorted(unresolved.items(), key=lambda i: -i[1])))
+
+
+if __name__ == '__main__':
+    main()
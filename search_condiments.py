@@ -1,13 +1,5 @@
 #!/usr/bin/env python3
-import PyPDF2
-import json
-import re
-
-# PDF path
-import glob
-pdf_files = glob.glob("*Cookbook*.pdf")
-pdf_path = [f for f in pdf_files if 'Cookbook' in f and not f.startswith('.')][0]
-print(f"Using PDF: {pdf_path}")
+from inverted_index import load_index
 
 # Search terms
 search_terms = [
@@ -17,35 +9,33 @@ search_terms = [
     'date sugar', 'molasses', 'tahini', 'nutritional yeast'
 ]
 
-results = {}
-for term in search_terms:
-    results[term] = {'pages': [], 'contexts': []}
 
-with open(pdf_path, 'rb') as file:
-    pdf_reader = PyPDF2.PdfReader(file)
-    total_pages = len(pdf_reader.pages)
+def line_context(text, offset, length, width=100):
+    """Up to `width` chars either side of a hit, without crossing line breaks."""
+    start = max(text.rfind('\n', 0, offset) + 1, offset - width)
+    line_end = text.find('\n', offset + length)
+    end = min(line_end if line_end != -1 else len(text), offset + length + width)
+    return text[start:end]
 
-    print(f"Searching {total_pages} pages...")
 
-    for page_num in range(total_pages):
-        page = pdf_reader.pages[page_num]
-        text = page.extract_text()
-        text_lower = text.lower()
+index = load_index()
+print(f"Searching {len(index.texts)} indexed pages...")
 
-        for term in search_terms:
-            if term.lower() in text_lower:
-                page_number = page_num + 1
-                if page_number not in results[term]['pages']:
-                    results[term]['pages'].append(page_number)
+results = {}
+for term in search_terms:
+    results[term] = {'pages': [], 'contexts': []}
 
-                    # Try to get context around the term
-                    pattern = re.compile(r'.{0,100}' + re.escape(term) + r'.{0,100}', re.IGNORECASE)
-                    matches = pattern.findall(text)
-                    if matches and len(results[term]['contexts']) < 3:
-                        results[term]['contexts'].append({
-                            'page': page_number,
-                            'text': matches[0].strip()
-                        })
+    for page_number, offset in index.search(term, prefix=True):
+        if page_number in results[term]['pages']:
+            continue
+        results[term]['pages'].append(page_number)
+
+        # Context around the first hit on the page
+        if len(results[term]['contexts']) < 3:
+            results[term]['contexts'].append({
+                'page': page_number,
+                'text': line_context(index.texts[page_number], offset, len(term)).strip()
+            })
 
 # Print results
 print("\n" + "="*80)
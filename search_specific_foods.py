@@ -1,14 +1,9 @@
 #!/usr/bin/env python3
 import sys
-import glob
-import re
 
-pdf_files = glob.glob('/Users/dragan/Documents/how-not-to-diet/*.pdf')
-pdf_path = pdf_files[0] if pdf_files else None
-
-if not pdf_path:
-    print("No PDF found!", file=sys.stderr)
-    sys.exit(1)
+from multi_term import Automaton, scan_pages
+from page_cache import find_pdf
+from page_stream import DEFAULT_MAX_RSS_MB, PageStream
 
 # Foods we're looking for that might not be extracted yet
 target_foods = [
@@ -45,57 +40,31 @@ target_foods = [
     'yacon', 'jicama', 'artichoke', 'jerusalem artichoke'
 ]
 
-try:
-    import PyPDF2
-
-    with open(pdf_path, 'rb') as file:
-        pdf = PyPDF2.PdfReader(file)
-        total_pages = len(pdf.pages)
-        print(f'Total pages: {total_pages}', file=sys.stderr)
 
-        for i in range(total_pages):
-            text = pdf.pages[i].extract_text()
-            text_lower = text.lower()
+def main():
+    pdf_path = find_pdf()
 
-            # Check if any target food is mentioned
-            found_foods = []
-            for food in target_foods:
-                if food in text_lower:
-                    found_foods.append(food)
+    if not pdf_path:
+        print("No PDF found!", file=sys.stderr)
+        sys.exit(1)
 
-            if found_foods:
-                print(f'\n{"="*80}')
-                print(f'PAGE {i+1} - Found: {", ".join(set(found_foods))}')
-                print("="*80)
-                print(text)
+    # One compiled automaton finds every target food in a single pass per page
+    automaton = Automaton(target_foods)
 
-except ImportError:
     try:
-        import pdfplumber
-
-        with pdfplumber.open(pdf_path) as pdf:
-            total_pages = len(pdf.pages)
-            print(f'Total pages: {total_pages}', file=sys.stderr)
+        stream = PageStream(pdf_path, max_rss_mb=DEFAULT_MAX_RSS_MB)
+        print(f'Total pages: {stream.page_count}', file=sys.stderr)
 
-            for i in range(total_pages):
-                text = pdf.pages[i].extract_text()
-                if not text:
-                    continue
+        for page_num, text, found in scan_pages(stream, automaton):
+            print(f'\n{"="*80}')
+            print(f'PAGE {page_num} - Found: {", ".join(found)}')
+            print("="*80)
+            print(text)
 
-                text_lower = text.lower()
-
-                # Check if any target food is mentioned
-                found_foods = []
-                for food in target_foods:
-                    if food in text_lower:
-                        found_foods.append(food)
+    except ImportError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-                if found_foods:
-                    print(f'\n{"="*80}')
-                    print(f'PAGE {i+1} - Found: {", ".join(set(found_foods))}')
-                    print("="*80)
-                    print(text)
 
-    except ImportError:
-        print("Error: Neither PyPDF2 nor pdfplumber is installed", file=sys.stderr)
-        sys.exit(1)
+if __name__ == '__main__':
+    main()
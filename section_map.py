@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Section map of the cookbook: named sections with 1-indexed page spans.
+
+Scripts used to find parts of the book by scanning the first 80-100 pages for
+phrases like 'low glycemic', or by hardcoding ranges like range(15, 35). The
+map here is built once per PDF and saved to .cache/index/sections.json, keyed
+by the PDF hash, so callers ask for a section by name and decode only its pages.
+
+Section starts come from, in order of preference:
+    1. the PDF outline (top-level bookmarks)
+    2. headings found in the page text - numbered chapter openers ("5" over
+       "BEANS") and the fixed front/back-matter headings in KNOWN_HEADINGS
+    3. DEFAULT_SECTIONS, the spans documented in the extraction reports
+
+Each section runs until the page before the next section starts.
+
+Usage:
+    from section_map import section_pages
+
+    for page_num, text in PageStream(pdf_path, pages=section_pages('21 tweaks')):
+        ...
+
+    load_section_map().get('kitchen staples')   # Section('kitchen-staples', 331, 349, ...)
+
+CLI:
+    python section_map.py build            # rebuild from the PDF
+    python section_map.py show             # list sections and spans
+    python section_map.py pages "soups"    # print the page numbers of one section
+"""
+import json
+import re
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from page_cache import BASE_DIR, PageCache, _atomic_write, find_pdf, pdf_hash
+from pdf_backend import open_book
+
+# === CONFIGURATION ===
+SECTIONS_FILE = BASE_DIR / '.cache' / 'index' / 'sections.json'
+SECTIONS_VERSION = 1
+DEFAULT_PAGE_COUNT = 386
+
+# Fixed headings outside the numbered chapters: (section name, line pattern).
+# The first page with a matching line starts the section.
+KNOWN_HEADINGS = [
+    ('daily-dozen', re.compile(r'^THE DAILY DOZEN\b')),
+    ('21-tweaks', re.compile(r'^TWENTY-ONE TWEAKS\b')),
+    ('cooking-charts', re.compile(r'^COOKING CHARTS\b')),
+    ('references', re.compile(r'^REFERENCES$')),
+    ('index', re.compile(r'^INDEX$')),
+]
+
+# Spans from EXTRACTION_REPORT*.md and the page dumps; used when a section is
+# neither in the outline nor found as a heading. (name, title, first page, chapter)
+DEFAULT_SECTIONS = [
+    ('introduction', 'Introduction', 1, None),
+    ('daily-dozen', 'The Daily Dozen Diet', 14, None),
+    ('21-tweaks', 'Twenty-One Tweaks to Accelerate Weight Loss', 19, None),
+    ('soups', 'Soups', 29, 1),
+    ('salads', 'Salads', 78, 2),
+    ('pasta', 'Pasta', 126, 3),
+    ('mainly-vegetables', 'Mainly Vegetables', 159, 4),
+    ('beans', 'Beans', 210, 5),
+    ('grains', 'Grains', 245, 6),
+    ('breakfast', 'Breakfast', 285, 7),
+    ('fruit', 'Fruit', 311, 8),
+    ('kitchen-staples', 'Kitchen Staples', 331, 9),
+    ('cooking-charts', 'Cooking Charts: Legumes and Grains', 350, None),
+    ('references', 'References', 357, None),
+    ('index', 'Index', 368, None),
+]
+
+# Other names people use for a section
+ALIASES = {
+    'twenty-one-tweaks': '21-tweaks',
+    'tweaks': '21-tweaks',
+    'staples': 'kitchen-staples',
+    'charts': 'cooking-charts',
+    'vegetables': 'mainly-vegetables',
+    'intro': 'introduction',
+}
+
+# A chapter opener starts with the chapter number alone on a line
+_CHAPTER_NUMBER_RE = re.compile(r'^\d{1,2}$')
+# Letter-spaced headings ("MAIN-L Y VEGETABLES") lose their tracking in extraction
+_SPACED_LETTERS_RE = re.compile(r'(?<=\b[A-Za-z]) (?=[A-Za-z]\b)')
+# ...and the word can come out hyphenated before its last letters ("main-ly")
+_BROKEN_HYPHEN_RE = re.compile(r'-(?=[a-z]{1,2}\b)')
+
+
+class Section(NamedTuple):
+    name: str
+    title: str
+    start: int          # first page, 1-indexed
+    end: int            # last page, inclusive
+    source: str         # 'outline', 'heading' or 'default'
+    chapter: Optional[int] = None
+
+    @property
+    def pages(self) -> range:
+        return range(self.start, self.end + 1)
+
+
+def slugify(title: str) -> str:
+    """'MAIN-L Y VEGETABLES' -> 'mainly-vegetables', '21 Tweaks' -> '21-tweaks'."""
+    title = _BROKEN_HYPHEN_RE.sub('', _SPACED_LETTERS_RE.sub('', title).lower())
+    return re.sub(r'[^0-9a-z]+', '-', title).strip('-')
+
+
+def _clean_title(title: str) -> str:
+    title = _BROKEN_HYPHEN_RE.sub('', _SPACED_LETTERS_RE.sub('', title).lower())
+    return ' '.join(title.split()).title()
+
+
+def canonical_name(title: str) -> str:
+    """Section name for a heading or bookmark title, honouring KNOWN_HEADINGS and ALIASES."""
+    upper = ' '.join(title.upper().split())
+    for name, pattern in KNOWN_HEADINGS:
+        if pattern.match(upper):
+            return name
+    name = slugify(title)
+    return ALIASES.get(name, name)
+
+
+def _lines(text: str) -> List[str]:
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+def find_headings(pages: Iterable[Tuple[int, str]]) -> List[Tuple[str, str, int, Optional[int]]]:
+    """(name, title, page, chapter) for every chapter opener and known heading."""
+    found = []
+    seen = set()
+    for page_num, text in pages:
+        lines = _lines(text or '')
+        if len(lines) >= 2 and _CHAPTER_NUMBER_RE.match(lines[0]) and lines[1].isupper():
+            title = _clean_title(lines[1])
+            name = canonical_name(title)
+            if name not in seen:
+                seen.add(name)
+                found.append((name, title, page_num, int(lines[0])))
+            continue
+
+        for name, pattern in KNOWN_HEADINGS:
+            if name in seen:
+                continue
+            for i, line in enumerate(lines):
+                if pattern.match(line):
+                    # Headings wrap onto a second all-caps line ("... TO" / "ACCELERATE ...")
+                    title = line
+                    if i + 1 < len(lines) and lines[i + 1].isupper():
+                        title = f'{title} {lines[i + 1]}'
+                    seen.add(name)
+                    found.append((name, _clean_title(title), page_num, None))
+                    break
+    return found
+
+
+def outline_sections(outline: List[Tuple[str, int]]) -> List[Tuple[str, str, int, Optional[int]]]:
+    """(name, title, page, chapter) for each top-level bookmark."""
+    sections = []
+    for title, index in outline:
+        match = re.match(r'^(?:chapter\s+)?(\d{1,2})[.:]?\s+(.+)$', title.strip(), re.IGNORECASE)
+        chapter, title = (int(match.group(1)), match.group(2)) if match else (None, title.strip())
+        sections.append((canonical_name(title), _clean_title(title), index + 1, chapter))
+    return sections
+
+
+def merge_sections(page_count: int, outline: List[Tuple] = (), headings: List[Tuple] = (),
+                   defaults: List[Tuple] = DEFAULT_SECTIONS) -> List[Section]:
+    """Combine starts (outline > headings > defaults) into contiguous spans."""
+    starts: Dict[str, Tuple[str, int, Optional[int], str]] = {}
+    for source, entries in (('default', defaults), ('heading', headings), ('outline', outline)):
+        for name, title, page, chapter in entries:
+            if 1 <= page <= page_count:
+                if chapter is None and name in starts:
+                    chapter = starts[name][2]
+                starts[name] = (title, page, chapter, source)
+
+    ordered = sorted(starts.items(), key=lambda item: item[1][1])
+    sections = []
+    for i, (name, (title, start, chapter, source)) in enumerate(ordered):
+        # Runs up to the page before the next section that starts on a later page
+        end = page_count
+        for _, (_, next_start, _, _) in ordered[i + 1:]:
+            if next_start > start:
+                end = next_start - 1
+                break
+        sections.append(Section(name, title, start, end, source, chapter))
+    return sections
+
+
+class SectionMap:
+    """Named sections of one PDF, looked up case-insensitively by name or alias."""
+
+    def __init__(self, sections: List[Section], page_count: int = DEFAULT_PAGE_COUNT):
+        self.sections = sections
+        self.page_count = page_count
+        self._by_name = {s.name: s for s in sections}
+
+    def __iter__(self):
+        return iter(self.sections)
+
+    def names(self) -> List[str]:
+        return [s.name for s in self.sections]
+
+    def chapters(self) -> List[Section]:
+        """The numbered recipe chapters, in book order."""
+        return [s for s in self.sections if s.chapter is not None]
+
+    def get(self, name: str) -> Section:
+        """Section by name, alias, or unique prefix ('Kitchen Staples', 'tweaks', 'soup')."""
+        key = slugify(name)
+        key = ALIASES.get(key, key)
+        if key in self._by_name:
+            return self._by_name[key]
+        if key == 'recipes':
+            chapters = self.chapters()
+            if chapters:
+                return Section('recipes', 'Recipes', chapters[0].start, chapters[-1].end, 'derived')
+
+        candidates = [s for s in self.sections if s.name.startswith(key) or key in s.name]
+        if len(candidates) == 1:
+            return candidates[0]
+        hint = ', '.join(s.name for s in candidates) if candidates else ', '.join(self.names())
+        raise KeyError(f'Unknown section {name!r} (expected one of: {hint})')
+
+    def pages(self, *names: str) -> List[int]:
+        """Sorted 1-indexed pages covered by one or more sections."""
+        return sorted({p for name in names for p in self.get(name).pages})
+
+    def to_json(self) -> Dict:
+        return {'version': SECTIONS_VERSION, 'page_count': self.page_count,
+                'sections': [s._asdict() for s in self.sections]}
+
+    @classmethod
+    def from_json(cls, data: Dict) -> 'SectionMap':
+        return cls([Section(**s) for s in data['sections']], data['page_count'])
+
+
+def default_section_map(page_count: int = DEFAULT_PAGE_COUNT) -> SectionMap:
+    return SectionMap(merge_sections(page_count), page_count)
+
+
+def build_section_map(pdf_path, backend: Optional[str] = None) -> SectionMap:
+    """Scan the outline and every page's headings once (page text via the page cache)."""
+    with PageCache(pdf_path, backend) as cache:
+        page_count = cache.page_count()
+        headings = find_headings((i + 1, text) for i, text in cache.texts(range(page_count)))
+    with open_book(pdf_path) as book:
+        outline = outline_sections(book.outline())
+    return SectionMap(merge_sections(page_count, outline, headings), page_count)
+
+
+def _read_store() -> Dict:
+    if SECTIONS_FILE.exists():
+        try:
+            with open(SECTIONS_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+    return {}
+
+
+def save_section_map(pdf_path, section_map: SectionMap):
+    store = _read_store()
+    store[pdf_hash(pdf_path)] = section_map.to_json()
+    SECTIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    _atomic_write(SECTIONS_FILE, json.dumps(store, indent=2))
+
+
+def load_section_map(pdf_path=None, rebuild: bool = False) -> SectionMap:
+    """Section map for the PDF, built and saved on first use.
+
+    Falls back to the documented default spans when no PDF is available.
+    """
+    pdf_path = pdf_path or find_pdf()
+    if not pdf_path:
+        return default_section_map()
+
+    if not rebuild:
+        entry = _read_store().get(pdf_hash(pdf_path))
+        if entry and entry.get('version') == SECTIONS_VERSION:
+            return SectionMap.from_json(entry)
+
+    section_map = build_section_map(pdf_path)
+    save_section_map(pdf_path, section_map)
+    return section_map
+
+
+def section_pages(*names: str, pdf_path=None) -> List[int]:
+    """1-indexed pages of the named section(s), e.g. section_pages('21 tweaks')."""
+    return load_section_map(pdf_path).pages(*names)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Named page spans of the cookbook')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('build', help='rebuild the section map from the PDF')
+    sub.add_parser('show', help='list sections and their page spans')
+    pages = sub.add_parser('pages', help='print the pages of one or more sections')
+    pages.add_argument('names', nargs='+')
+    args = parser.parse_args(argv)
+
+    pdf_path = find_pdf()
+    if not pdf_path:
+        print('No PDF found - using default spans', file=sys.stderr)
+
+    section_map = load_section_map(pdf_path, rebuild=args.command == 'build')
+    if args.command == 'pages':
+        try:
+            print(' '.join(str(p) for p in section_map.pages(*args.names)))
+        except KeyError as e:
+            print(e.args[0], file=sys.stderr)
+            sys.exit(1)
+        return
+
+    for s in section_map:
+        chapter = f'ch {s.chapter}' if s.chapter is not None else ''
+        print(f'{s.name:20s} {s.start:4d}-{s.end:<4d} {chapter:6s} {s.source:8s} {s.title}')
+
+
+if __name__ == '__main__':
+    main()
@@ -36,12 +36,25 @@ export type RecipeCategory =
   | 'dessert'
   | 'beverage';
 
-export interface DayMenu {
+/**
+ * A menu slot as stored in data/weekly-menus.json (menu_optimizer.py --write):
+ * the recipe's ID and name, not the recipe itself
+ */
+export interface RecipeRef {
+  id: string;
+  name: string;
+}
+
+/**
+ * Menus built in memory hold full recipes; menus loaded from
+ * data/weekly-menus.json hold RecipeRefs (DayMenu<RecipeRef>)
+ */
+export interface DayMenu<R extends RecipeRef = Recipe> {
   day: Weekday;
-  breakfast?: Recipe;
-  lunch?: Recipe;
-  dinner?: Recipe;
-  snacks?: Recipe[];
+  breakfast?: R;
+  lunch?: R;
+  dinner?: R;
+  snacks?: R[];
 }
 
 export type Weekday =
@@ -53,12 +66,12 @@ export type Weekday =
   | 'saturday'
   | 'sunday';
 
-export interface WeeklyMenu {
+export interface WeeklyMenu<R extends RecipeRef = Recipe> {
   id: string;
   name: string;
   week: number;
   year: number;
-  days: DayMenu[];
+  days: DayMenu<R>[];
 }
 
 export interface ShoppingListItem {
@@ -1,4 +1,4 @@
-import type { Recipe, WeeklyMenu, Food, FoodCategory, MealTiming } from '../types/index';
+import type { Recipe, RecipeRef, WeeklyMenu, Weekday, Food, FoodCategory, MealTiming } from '../types/index';
 
 /**
  * Raw extracted food data structure from JSON file
@@ -66,13 +66,44 @@ export async function searchRecipes(query: string): Promise<Recipe[]> {
 // Weekly Menu Data Loaders
 // ============================================================================
 
+/**
+ * One day of data/weekly-menus.json: empty slots are null
+ */
+interface WeeklyMenuFileDay {
+  day: string;
+  breakfast?: RecipeRef | null;
+  lunch?: RecipeRef | null;
+  dinner?: RecipeRef | null;
+  snacks?: RecipeRef[];
+}
+
+interface WeeklyMenuFile {
+  id: string;
+  name: string;
+  week: number;
+  year: number;
+  days: WeeklyMenuFileDay[];
+}
+
 /**
  * Load weekly menus from JSON file
+ *
+ * Slots are RecipeRefs ({ id, name }), not full recipes: look the IDs up
+ * before handing a day to code that reads ingredients (e.g. scoreWeeklyMenu).
  */
-export async function loadWeeklyMenus(): Promise<WeeklyMenu[]> {
+export async function loadWeeklyMenus(): Promise<WeeklyMenu<RecipeRef>[]> {
   try {
     const menusModule = await import('@data/weekly-menus.json');
-    return menusModule.default as unknown as WeeklyMenu[];
+    return (menusModule.default as WeeklyMenuFile[]).map(menu => ({
+      ...menu,
+      days: menu.days.map(day => ({
+        day: day.day as Weekday,
+        breakfast: day.breakfast ?? undefined,
+        lunch: day.lunch ?? undefined,
+        dinner: day.dinner ?? undefined,
+        snacks: day.snacks ?? [],
+      })),
+    }));
   } catch (error) {
     console.error('Error loading weekly menus:', error);
     return [];
@@ -82,7 +113,7 @@ export async function loadWeeklyMenus(): Promise<WeeklyMenu[]> {
 /**
  * Load a specific weekly menu by ID
  */
-export async function loadWeeklyMenuById(id: string): Promise<WeeklyMenu | null> {
+export async function loadWeeklyMenuById(id: string): Promise<WeeklyMenu<RecipeRef> | null> {
   const menus = await loadWeeklyMenus();
   return menus.find(menu => menu.id === id) || null;
 }
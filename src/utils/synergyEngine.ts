@@ -7,6 +7,7 @@ import type {
   RecipeCategory,
 } from '../types/index';
 import { loadFoods } from './dataLoader';
+import { loadSynergyMatrix } from './synergyMatrix';
 
 /**
  * Calculate synergy score between two foods
@@ -118,13 +119,15 @@ export async function analyzeMealSynergies(recipe: Recipe): Promise<MealSynergyA
   const foods = await loadFoods();
   const foodNames = extractFoodNamesFromRecipe(recipe, foods);
   const foodObjects = foods.filter(f => foodNames.includes(f.name));
+  const matrix = await loadSynergyMatrix(foods);
 
   const synergyPairs: FoodSynergyScore[] = [];
   let totalScore = 0;
 
-  // Calculate all pairwise synergies
+  // Calculate all pairwise synergies (the precomputed matrix rules out zero-score pairs)
   for (let i = 0; i < foodObjects.length; i++) {
     for (let j = i + 1; j < foodObjects.length; j++) {
+      if (matrix && matrix.score(foodObjects[i].id, foodObjects[j].id) === 0) continue;
       const synergy = calculateFoodSynergy(foodObjects[i], foodObjects[j]);
       if (synergy.score > 0) {
         synergyPairs.push(synergy);
@@ -206,13 +209,15 @@ export async function analyzeDaySynergies(
   }
 
   const foodObjects = foods.filter(f => allFoodNames.has(f.name));
+  const matrix = await loadSynergyMatrix(foods);
 
   const synergyPairs: FoodSynergyScore[] = [];
   let totalScore = 0;
 
-  // Calculate all pairwise synergies across the day
+  // Calculate all pairwise synergies across the day (the precomputed matrix rules out zero-score pairs)
   for (let i = 0; i < foodObjects.length; i++) {
     for (let j = i + 1; j < foodObjects.length; j++) {
+      if (matrix && matrix.score(foodObjects[i].id, foodObjects[j].id) === 0) continue;
       const synergy = calculateFoodSynergy(foodObjects[i], foodObjects[j]);
       if (synergy.score > 0) {
         synergyPairs.push(synergy);
@@ -0,0 +1,105 @@
+/**
+ * Precomputed food synergy scores
+ *
+ * Reads the sidecar written by `python synergy_matrix.py build` next to
+ * foods-bundle.json:
+ *
+ *   foods-synergy.json  food IDs in row order, dtypes and byte offsets
+ *   foods-synergy.bin   N x N scores (row-major), then N x K best partners per row
+ *
+ * Scores are the same as calculateFoodSynergy(a, b).score in synergyEngine.ts,
+ * so lookups are a single array index and top-k suggestions come straight
+ * from the precomputed row orderings. The matrix is only used when its row
+ * IDs match the loaded foods; a sidecar built from another bundle yields
+ * null and callers fall back to calculateFoodSynergy().
+ */
+
+import type { Food } from '../types/index';
+import { getAssetPath } from './paths';
+
+interface SynergyMatrixMeta {
+  version: number;
+  source: string;
+  ids: string[];
+  n: number;
+  matrix: { dtype: 'uint8' | 'uint16'; offset: number; length: number; max: number };
+  topK: { dtype: 'uint16'; offset: number; k: number };
+}
+
+export interface SynergyMatrix {
+  ids: string[];
+  /** calculateFoodSynergy(food1, food2).score, or 0 for unknown IDs */
+  score(foodId1: string, foodId2: string): number;
+  /** Best partners for a food, highest score first (at most the precomputed k) */
+  topPartners(foodId: string, k?: number): Array<{ id: string; score: number }>;
+}
+
+/**
+ * Build a matrix reader from the sidecar's metadata and bytes
+ *
+ * Returns null unless the sidecar's row IDs are exactly `foods`' IDs in order.
+ */
+export function createSynergyMatrix(
+  meta: SynergyMatrixMeta,
+  buffer: ArrayBuffer,
+  foods: Pick<Food, 'id'>[]
+): SynergyMatrix | null {
+  const { n } = meta;
+  if (n !== meta.ids.length || n !== foods.length || foods.some((food, i) => food.id !== meta.ids[i])) {
+    return null;
+  }
+  const scores =
+    meta.matrix.dtype === 'uint8'
+      ? new Uint8Array(buffer, meta.matrix.offset, n * n)
+      : new Uint16Array(buffer, meta.matrix.offset, n * n);
+  const ranked = new Uint16Array(buffer, meta.topK.offset, n * meta.topK.k);
+  const index = new Map(meta.ids.map((id, i) => [id, i]));
+
+  return {
+    ids: meta.ids,
+
+    score(foodId1: string, foodId2: string): number {
+      const i = index.get(foodId1);
+      const j = index.get(foodId2);
+      if (i === undefined || j === undefined) return 0;
+      return scores[i * n + j];
+    },
+
+    topPartners(foodId: string, k: number = meta.topK.k): Array<{ id: string; score: number }> {
+      const i = index.get(foodId);
+      if (i === undefined) return [];
+      const start = i * meta.topK.k;
+      const row = ranked.subarray(start, start + Math.min(k, meta.topK.k));
+      return Array.from(row, j => ({ id: meta.ids[j], score: scores[i * n + j] }));
+    },
+  };
+}
+
+let cached: Promise<{ meta: SynergyMatrixMeta; buffer: ArrayBuffer } | null> | null = null;
+
+/**
+ * Load the precomputed synergy matrix for `foods` (sidecar fetched once per page)
+ *
+ * Resolves to null when the sidecar is missing or was built from a different
+ * foods list, so callers can fall back to calculateFoodSynergy().
+ */
+export async function loadSynergyMatrix(foods: Pick<Food, 'id'>[]): Promise<SynergyMatrix | null> {
+  if (!cached) {
+    cached = (async () => {
+      try {
+        const [metaResponse, binResponse] = await Promise.all([
+          fetch(getAssetPath('foods-synergy.json')),
+          fetch(getAssetPath('foods-synergy.bin')),
+        ]);
+        if (!metaResponse.ok || !binResponse.ok) return null;
+        const meta: SynergyMatrixMeta = await metaResponse.json();
+        return { meta, buffer: await binResponse.arrayBuffer() };
+      } catch (error) {
+        console.error('Failed to load synergy matrix:', error);
+        return null;
+      }
+    })();
+  }
+  const sidecar = await cached;
+  return sidecar ? createSynergyMatrix(sidecar.meta, sidecar.buffer, foods) : null;
+}
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Food synergy / conflict graph, resolved to food IDs once.
+
+Each food file lists `synergies` and `conflicts` as free text: sometimes a
+food ('black-pepper', 'raspberries'), sometimes a category ('whole-grains',
+'legumes'), sometimes a sentence ('Pairs with ginger in Szechuan-style
+stir-fries'), sometimes neither ('meals-in-general', 'regular-bedtime').
+parse_recipes_201_270.extract_synergies() re-normalized every string and
+substring-compared it with every other food's name, for every recipe.
+
+The build step here resolves every string once, first rule that applies:
+
+    food ID or alias   'black-pepper', 'tomatoes'         -> that food, plus foods named
+                                                             with it ('Cherry Tomatoes')
+    food category      'whole-grains', 'legumes'          -> concept 'category:whole-grains'
+    mentions foods     'Works with ginger and garlic ...' -> every food the food matcher finds
+    anything else      'meals-in-general'                 -> concept 'concept:meals-in-general'
+
+and stores the result as CSR adjacency (compressed sparse rows): for food
+index i, its synergy targets are targets[offsets[i]:offsets[i + 1]], food
+indexes in array('H'). Conflicts and concept tags are stored the same way.
+The graph is pickled to .cache/index/synergy_graph.pkl and rebuilt when the
+food data, the alias index or the food matcher (food_matcher.matcher_fingerprint)
+changes.
+
+A recipe's synergies are then, per food, the intersection of its target row
+with the recipe's food set.
+
+Usage:
+    from synergy_graph import load_synergy_graph
+
+    graph = load_synergy_graph()
+    graph.synergies('turmeric')             # ['black-pepper', ...]
+    graph.concepts('kale')                  # ['category:whole-grains', ...]
+    graph.pairs(['turmeric', 'black-pepper', 'kale'])   # [('turmeric', 'black-pepper'), ...]
+
+    python synergy_graph.py build [--rebuild]
+    python synergy_graph.py show turmeric
+    python synergy_graph.py unresolved      # concept tags, most common first
+"""
+import hashlib
+import json
+import pickle
+import sys
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from page_cache import _atomic_pickle
+from page_store import STORE_DIR
+
+# === CONFIGURATION ===
+GRAPH_FILE = STORE_DIR / 'synergy_graph.pkl'
+GRAPH_VERSION = 1
+RELATIONS = ('synergies', 'conflicts')
+
+
+def _csr(rows: Sequence[Sequence[int]], typecode: str = 'H') -> Tuple[array, array]:
+    """(offsets, targets) for a list of target-index rows."""
+    offsets, targets = array('I', [0]), array(typecode)
+    for row in rows:
+        targets.extend(row)
+        offsets.append(len(targets))
+    return offsets, targets
+
+
+def _folded_words(text: str) -> Tuple[str, ...]:
+    from food_matcher import tokens
+
+    return tuple(token for token, _, _ in tokens(text.replace('-', ' ')))
+
+
+class Resolver:
+    """Maps one synergy/conflict string to food IDs or a concept tag."""
+
+    def __init__(self, names: Dict[str, str], categories: Iterable[str], aliases, matcher):
+        """`names`: {food_id: display name}."""
+        self.food_ids = set(names)
+        self.categories = {c.lower() for c in categories}
+        self.aliases = aliases
+        self.matcher = matcher
+        self.name_words = {food_id: _folded_words(name) for food_id, name in names.items()}
+
+    def narrower(self, words: Tuple[str, ...]) -> List[str]:
+        """Foods whose name contains `words` as a phrase ('tomatoes' -> 'Cherry Tomatoes')."""
+        n = len(words)
+        return [food_id for food_id, name in self.name_words.items()
+                if any(name[i:i + n] == words for i in range(len(name) - n + 1))]
+
+    def resolve(self, term: str) -> Tuple[List[str], Optional[str]]:
+        """(food IDs, concept tag); exactly one of the two is non-empty."""
+        food_id = term if term in self.food_ids else self.aliases.lookup(term)
+        if food_id in self.food_ids:
+            return list(dict.fromkeys([food_id] + self.narrower(_folded_words(term)))), None
+        slug = '-'.join(term.lower().split())
+        if slug in self.categories:
+            return [], f'category:{slug}'
+        foods = [f for f in self.matcher.foods(term) if f in self.food_ids]
+        if foods:
+            return foods, None
+        return [], f'concept:{slug}'
+
+
+class SynergyGraph:
+    """CSR adjacency over food indexes for synergies and conflicts, plus concept tags."""
+
+    def __init__(self, ids: List[str], concepts: List[str], rows: Dict[str, Tuple[array, array]],
+                 concept_rows: Dict[str, Tuple[array, array]], digest: str = ''):
+        self.ids = ids
+        self.index = {food_id: i for i, food_id in enumerate(ids)}
+        self.concept_names = concepts
+        self.rows = rows
+        self.concept_rows = concept_rows
+        self.digest = digest
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _row(self, relation: str, food_id: str) -> array:
+        i = self.index.get(food_id)
+        if i is None:
+            return array('H')
+        offsets, targets = self.rows[relation]
+        return targets[offsets[i]:offsets[i + 1]]
+
+    def synergies(self, food_id: str) -> List[str]:
+        return [self.ids[j] for j in self._row('synergies', food_id)]
+
+    def conflicts(self, food_id: str) -> List[str]:
+        return [self.ids[j] for j in self._row('conflicts', food_id)]
+
+    def concepts(self, food_id: str, relation: str = 'synergies') -> List[str]:
+        i = self.index.get(food_id)
+        if i is None:
+            return []
+        offsets, targets = self.concept_rows[relation]
+        return [self.concept_names[j] for j in targets[offsets[i]:offsets[i + 1]]]
+
+    def pairs(self, food_ids: Iterable[str], relation: str = 'synergies') -> List[Tuple[str, str]]:
+        """(food, partner) for every edge between foods of one recipe, in recipe order."""
+        index, ids = self.index, self.ids
+        present = [index[f] for f in dict.fromkeys(food_ids) if f in index]
+        members = set(present)
+        offsets, targets = self.rows[relation]
+        found = []
+        for i in present:
+            row = targets[offsets[i]:offsets[i + 1]]
+            if members.intersection(row):
+                # Keep the food file's order for the partners
+                found.extend((ids[i], ids[j]) for j in row if j in members)
+        return found
+
+    def save(self, graph_file=GRAPH_FILE):
+        graph_file.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_pickle(graph_file, (GRAPH_VERSION, self.digest, self.ids, self.concept_names, self.rows,
+                                    self.concept_rows))
+
+
+def _source_digest(store, alias_hash: str) -> str:
+    """Hash of everything the graph is built from."""
+    from food_matcher import matcher_fingerprint
+
+    digest = hashlib.sha256((alias_hash + matcher_fingerprint()).encode('ascii'))
+    for food_id, food in sorted(store.items()):
+        digest.update(json.dumps([food_id, food.categories, food.synergies, food.conflicts]).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def build_synergy_graph(store, alias_index, matcher, digest: str = '') -> SynergyGraph:
+    """Resolve every food's synergies and conflicts into a SynergyGraph."""
+    ids = sorted(store)
+    categories = {c for food in store.values() for c in food.categories}
+    resolver = Resolver({food_id: store[food_id].name for food_id in ids}, categories, alias_index, matcher)
+    index = {food_id: i for i, food_id in enumerate(ids)}
+
+    concepts: Dict[str, int] = {}
+    resolved: Dict[str, Tuple[List[str], Optional[str]]] = {}
+    rows, concept_rows = {}, {}
+    for relation in RELATIONS:
+        food_rows, tag_rows = [], []
+        for food_id in ids:
+            targets, tags = [], []
+            for term in getattr(store[food_id], relation):
+                if term not in resolved:
+                    resolved[term] = resolver.resolve(term)
+                foods, tag = resolved[term]
+                targets.extend(index[f] for f in foods if f != food_id)
+                if tag:
+                    tags.append(concepts.setdefault(tag, len(concepts)))
+            food_rows.append(list(dict.fromkeys(targets)))
+            tag_rows.append(list(dict.fromkeys(tags)))
+        rows[relation] = _csr(food_rows)
+        concept_rows[relation] = _csr(tag_rows)
+    return SynergyGraph(ids, list(concepts), rows, concept_rows, digest)
+
+
+_loaded: Optional[SynergyGraph] = None
+
+
+def load_synergy_graph(rebuild: bool = False, graph_file=GRAPH_FILE) -> SynergyGraph:
+    """The stored graph, checked against the food data and alias index once per process."""
+    global _loaded
+    if _loaded is not None and not rebuild:
+        return _loaded
+
+    from alias_index import load_alias_index
+    from food_store import load_food_store
+
+    store, aliases = load_food_store(), load_alias_index()
+    digest = _source_digest(store, aliases.hash)
+
+    if not rebuild and graph_file.exists():
+        try:
+            with open(graph_file, 'rb') as f:
+                version, stored_digest, *state = pickle.load(f)
+            if version == GRAPH_VERSION and stored_digest == digest:
+                _loaded = SynergyGraph(*state, digest=digest)
+                return _loaded
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass
+
+    from food_matcher import default_matcher
+
+    _loaded = build_synergy_graph(store, aliases, default_matcher(), digest)
+    _loaded.save(graph_file)
+    edges = {relation: len(_loaded.rows[relation][1]) for relation in RELATIONS}
+    print(f'synergy graph: {len(_loaded)} foods, {edges["synergies"]} synergy / {edges["conflicts"]} conflict edges, '
+          f'{len(_loaded.concept_names)} concepts -> {graph_file}', file=sys.stderr)
+    return _loaded
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Food synergy/conflict graph resolved to food IDs')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='build (or verify) the stored graph')
+    build.add_argument('--rebuild', action='store_true')
+    show = sub.add_parser('show', help="a food's resolved edges")
+    show.add_argument('food')
+    sub.add_parser('unresolved', help='concept tags, most common first')
+    args = parser.parse_args(argv)
+
+    graph = load_synergy_graph(rebuild=getattr(args, 'rebuild', False))
+    if args.command == 'build':
+        print(f'{len(graph)} foods, {len(graph.concept_names)} concept tags')
+    elif args.command == 'show':
+        for relation in RELATIONS:
+            print(f'{relation}: {", ".join(getattr(graph, relation)(args.food)) or "-"}')
+            print(f'  concepts: {", ".join(graph.concepts(args.food, relation)) or "-"}')
+    else:
+        counts: Dict[str, int] = {}
+        for relation in RELATIONS:
+            for j in graph.concept_rows[relation][1]:
+                name = graph.concept_names[j]
+                counts[name] = counts.get(name, 0) + 1
+        for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0])):
+            print(f'{count:4d}  {name}')
+
+
+if __name__ == '__main__':
+    # Run through the importable module so the pickle never references __main__
+    import synergy_graph
+    synergy_graph.main()
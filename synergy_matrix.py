@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Precomputed pairwise food synergy scores, shipped next to the foods bundle.
+
+src/utils/synergyEngine.ts calculateFoodSynergy() scores a pair of foods at
+runtime: +10 for each direction in which one food's synergies name the other
+(string `includes` both ways), +3 per shared category, +5 per complementary
+category pair, +2 per shared timing other than 'any-meal'. Every comparison
+lowercases and scans string lists again.
+
+This build stage scores all 209 x 209 pairs at once with NumPy using the same
+rules and weights (the constants below mirror the TypeScript):
+
+    explicit       E[i, j] = 1 when a synergy string of i and the name of j contain one another
+                   score += 10 * (E + E.T)
+    categories     C = foods x categories counts, P = (C > 0);  score += 3 * (C @ P.T)
+    complementary  per pair (a, b): score += 5 * (outer(P[:, a], P[:, b]) | outer(P[:, b], P[:, a]))
+    timing         same as categories over timings other than 'any-meal', weight 2
+
+Like the TypeScript, a food listing a category twice makes score(a, b) and
+score(b, a) differ, so the full matrix is stored. The diagonal is zeroed.
+The result goes to public/foods-synergy.bin:
+
+    offset 0                 N x N scores, uint8, row-major in bundle order
+    offset (aligned to 2)    N x TOP_K partner indexes, uint16, each row best first
+                             (score descending, then bundle order)
+
+with public/foods-synergy.json describing it (food IDs in row order, dtypes,
+offsets and the SHA-256 of the bundle's foods array it was built from; the
+rest of the bundle, build_timestamp included, does not affect the scores).
+The client reads a score with one index, scores[i * n + j], and takes
+suggestions from the precomputed row orderings (src/utils/synergyMatrix.ts),
+after checking the row IDs against the foods it loaded.
+
+Usage:
+    python synergy_matrix.py build [--force]
+    python synergy_matrix.py show food-2 [-k 10]
+    python synergy_matrix.py check           # every pair against a port of calculateFoodSynergy()
+"""
+import hashlib
+import json
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from page_cache import BASE_DIR, _atomic_write, _atomic_write_bytes
+
+# === CONFIGURATION ===
+BUNDLE_FILE = BASE_DIR / 'public' / 'foods-bundle.json'
+MATRIX_FILE = BASE_DIR / 'public' / 'foods-synergy.bin'
+META_FILE = BASE_DIR / 'public' / 'foods-synergy.json'
+MATRIX_VERSION = 1
+TOP_K = 20
+
+# Same weights and pairs as calculateFoodSynergy() in src/utils/synergyEngine.ts
+EXPLICIT_WEIGHT = 10
+SHARED_CATEGORY_WEIGHT = 3
+COMPLEMENTARY_WEIGHT = 5
+SHARED_TIMING_WEIGHT = 2
+IGNORED_TIMING = 'any-meal'
+COMPLEMENTARY_PAIRS = [
+    ('greens', 'rich-in-legumes'),
+    ('greens', 'rich-in-whole-grains'),
+    ('rich-in-legumes', 'rich-in-vegetables'),
+    ('high-fiber', 'anti-inflammatory'),
+    ('low-glycemic', 'high-fiber'),
+    ('herbs-and-spices', 'rich-in-vegetables'),
+    ('appetite-suppression', 'high-fiber'),
+]
+
+
+def load_bundle(bundle_file=BUNDLE_FILE) -> Tuple[List[Dict], str]:
+    """(foods in bundle order, SHA-256 of the foods array).
+
+    Only the foods are hashed: a rebuild of the bundle that only moves
+    build_metadata.build_timestamp leaves the matrix current.
+    """
+    foods = json.loads(bundle_file.read_bytes())['foods']
+    canonical = json.dumps(foods, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return foods, hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def reference_score(food1: Dict, food2: Dict) -> int:
+    """calculateFoodSynergy(food1, food2).score, line for line."""
+    score = 0
+    name1, name2 = food1['name'].lower(), food2['name'].lower()
+    if any(s in name2 or name2 in s for s in (s.lower() for s in food1['synergies'])):
+        score += EXPLICIT_WEIGHT
+    if any(s in name1 or name1 in s for s in (s.lower() for s in food2['synergies'])):
+        score += EXPLICIT_WEIGHT
+    score += SHARED_CATEGORY_WEIGHT * sum(1 for c in food1['categories'] if c in food2['categories'])
+    for a, b in COMPLEMENTARY_PAIRS:
+        if (a in food1['categories'] and b in food2['categories']) or \
+                (b in food1['categories'] and a in food2['categories']):
+            score += COMPLEMENTARY_WEIGHT
+    score += SHARED_TIMING_WEIGHT * sum(1 for t in food1['timing'] if t in food2['timing'] and t != IGNORED_TIMING)
+    return score
+
+
+def _incidence(rows: List[List[str]], np):
+    """Count matrix (items x distinct values; a repeated value counts twice) and {value: column}."""
+    columns: Dict[str, int] = {}
+    for values in rows:
+        for value in values:
+            columns.setdefault(value, len(columns))
+    matrix = np.zeros((len(rows), max(len(columns), 1)), dtype=np.int32)
+    for i, values in enumerate(rows):
+        for value in values:
+            matrix[i, columns[value]] += 1
+    return matrix, columns
+
+
+def score_matrix(foods: List[Dict]):
+    """N x N int32 score matrix, diagonal zero."""
+    import numpy as np
+
+    n = len(foods)
+    names = [food['name'].lower() for food in foods]
+
+    # Explicit: for each distinct synergy string, which names it contains / is contained in
+    explicit = np.zeros((n, n), dtype=bool)
+    hits: Dict[str, np.ndarray] = {}
+    for i, food in enumerate(foods):
+        for synergy in food['synergies']:
+            s = synergy.lower()
+            if s not in hits:
+                hits[s] = np.fromiter((s in name or name in s for name in names), dtype=bool, count=n)
+            explicit[i] |= hits[s]
+    explicit = explicit.astype(np.int32)
+    scores = EXPLICIT_WEIGHT * (explicit + explicit.T)
+
+    # The TS filters count every entry of food1's list found in food2's, so a
+    # category listed twice counts twice for that food in the row direction only:
+    # shared[i, j] = counts[i] . present[j]
+    counts, columns = _incidence([food['categories'] for food in foods], np)
+    present = np.minimum(counts, 1)
+    scores += SHARED_CATEGORY_WEIGHT * (counts @ present.T)
+
+    for a, b in COMPLEMENTARY_PAIRS:
+        if a in columns and b in columns:
+            has_a, has_b = present[:, columns[a]], present[:, columns[b]]
+            scores += COMPLEMENTARY_WEIGHT * (np.outer(has_a, has_b) | np.outer(has_b, has_a))
+
+    timing, _ = _incidence([[t for t in food['timing'] if t != IGNORED_TIMING] for food in foods], np)
+    scores += SHARED_TIMING_WEIGHT * (timing @ np.minimum(timing, 1).T)
+
+    np.fill_diagonal(scores, 0)
+    return scores
+
+
+def top_k(scores, k: int):
+    """N x k partner indexes per row: score descending, ties in bundle order, self excluded."""
+    import numpy as np
+
+    n = scores.shape[0]
+    k = min(k, n - 1)
+    keyed = scores.astype(np.int64)
+    np.fill_diagonal(keyed, -1)
+    # Stable sort on the negated score keeps equal scores in index order
+    order = np.argsort(-keyed, axis=1, kind='stable')
+    return order[:, :k].astype(np.uint16)
+
+
+def build(force: bool = False) -> Optional[Dict]:
+    """Write the sidecar; returns its metadata, or None when it is already current."""
+    import numpy as np
+
+    foods, source = load_bundle()
+    if not force and META_FILE.exists() and MATRIX_FILE.exists():
+        try:
+            meta = json.loads(META_FILE.read_text(encoding='utf-8'))
+            if meta.get('version') == MATRIX_VERSION and meta.get('source') == source and meta.get('topK', {}).get('k') == TOP_K:
+                return None
+        except ValueError:
+            pass
+
+    start = time.perf_counter()
+    scores = score_matrix(foods)
+    ranked = top_k(scores, TOP_K)
+    elapsed = time.perf_counter() - start
+
+    n = len(foods)
+    peak = int(scores.max()) if n else 0
+    dtype = np.uint8 if peak <= np.iinfo(np.uint8).max else np.uint16
+    matrix_bytes = scores.astype(dtype).astype(np.dtype(dtype).newbyteorder('<')).tobytes()
+    padding = b'\0' * (len(matrix_bytes) % 2)
+    ranked_bytes = ranked.astype('<u2').tobytes()
+
+    meta = {
+        'version': MATRIX_VERSION,
+        'source': source,
+        'ids': [food['id'] for food in foods],
+        'n': n,
+        'matrix': {'dtype': np.dtype(dtype).name, 'offset': 0, 'length': n * n, 'max': peak},
+        'topK': {'dtype': 'uint16', 'offset': len(matrix_bytes) + len(padding), 'k': ranked.shape[1]},
+        'weights': {'explicit': EXPLICIT_WEIGHT, 'sharedCategory': SHARED_CATEGORY_WEIGHT,
+                    'complementary': COMPLEMENTARY_WEIGHT, 'sharedTiming': SHARED_TIMING_WEIGHT},
+    }
+    _atomic_write_bytes(MATRIX_FILE, matrix_bytes + padding + ranked_bytes)
+    _atomic_write(META_FILE, json.dumps(meta, indent=1))
+    print(f'synergy matrix: {n} x {n} scored in {elapsed * 1000:.1f} ms, max {peak}, '
+          f'{MATRIX_FILE.stat().st_size / 1024:.0f} KB -> {MATRIX_FILE}', file=sys.stderr)
+    return meta
+
+
+class SynergyMatrix:
+    """Reader for the sidecar, for checks and Python callers."""
+
+    def __init__(self):
+        meta = json.loads(META_FILE.read_text(encoding='utf-8'))
+        data = MATRIX_FILE.read_bytes()
+        self.meta = meta
+        self.ids: List[str] = meta['ids']
+        self.index = {food_id: i for i, food_id in enumerate(self.ids)}
+        self.n = meta['n']
+        from array import array
+
+        self.scores = array('B' if meta['matrix']['dtype'] == 'uint8' else 'H')
+        width = self.scores.itemsize
+        self.scores.frombytes(data[:self.n * self.n * width])
+        self.ranked = array('H')
+        self.ranked.frombytes(data[meta['topK']['offset']:meta['topK']['offset'] + self.n * meta['topK']['k'] * 2])
+        if sys.byteorder != 'little':
+            self.scores.byteswap()
+            self.ranked.byteswap()
+
+    def score(self, id1: str, id2: str) -> int:
+        return self.scores[self.index[id1] * self.n + self.index[id2]]
+
+    def top(self, food_id: str, k: int = 10) -> List[Tuple[str, int]]:
+        i, width = self.index[food_id], self.meta['topK']['k']
+        row = self.ranked[i * width:i * width + min(k, width)]
+        return [(self.ids[j], self.scores[i * self.n + j]) for j in row]
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Precompute the pairwise food synergy matrix')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build_cmd = sub.add_parser('build', help='write public/foods-synergy.{bin,json}')
+    build_cmd.add_argument('--force', action='store_true', help='rebuild even if the bundle is unchanged')
+    show = sub.add_parser('show', help='top partners for one food (bundle ID, e.g. food-2)')
+    show.add_argument('food')
+    show.add_argument('-k', type=int, default=10)
+    sub.add_parser('check', help='compare every pair with calculateFoodSynergy()')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        try:
+            meta = build(args.force)
+        except ImportError as e:
+            print(f'Error: {e} (the synergy matrix build needs NumPy)', file=sys.stderr)
+            return 1
+        if meta is None:
+            print(f'{MATRIX_FILE.name} is up to date with {BUNDLE_FILE.name}', file=sys.stderr)
+        return 0
+
+    matrix = SynergyMatrix()
+    if args.command == 'show':
+        for food_id, score in matrix.top(args.food, args.k):
+            print(f'{score:4d}  {food_id}')
+        return 0
+
+    foods, source = load_bundle()
+    if source != matrix.meta['source']:
+        print(f'{MATRIX_FILE.name} is stale; run `python synergy_matrix.py build`', file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    mismatches = [(a['id'], b['id']) for i, a in enumerate(foods) for j, b in enumerate(foods)
+                  if i != j and reference_score(a, b) != matrix.scores[i * matrix.n + j]]
+    elapsed = time.perf_counter() - start
+    print(f'{matrix.n * (matrix.n - 1)} pairs checked against the reference in {elapsed:.1f}s: '
+          f'{len(mismatches)} mismatches')
+    for pair in mismatches[:10]:
+        print('  ', *pair)
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())